@@ -1,19 +1,25 @@
 from __future__ import annotations
 
 import json
+import os
 from pathlib import Path
+from typing import Any
 
 import typer
 from rich.console import Console
 
 from core.config import load_config
-from core.types import RunTrace
-from eval.runner import run_scenarios
+from core.types import RunEvent, RunTrace
+from eval.runner import llm_stub_overrides, run_scenarios
+from execution.events import NdjsonEventWriter
 from execution.tool_registry import ToolRegistry
-from main import run_orchestration
+from main import resume_orchestration, run_orchestration
+from memory.jobs import job_queue_from_config
+from service.job_worker import serve_job_workers
+from service.workers import RunRequest, WorkerPool
 from memory.long_term import LongTermMemory
 
-from .render import render_eval_summary, render_trace
+from .render import render_batch_summary, render_eval_summary, render_event, render_trace
 
 
 def register_commands(app: typer.Typer) -> None:
@@ -25,6 +31,10 @@ def register_commands(app: typer.Typer) -> None:
         request_file: str = typer.Option("", help="Path to JSON file with {'request': '...'}"),
         context_json: str = typer.Option("", help="Optional context JSON object"),
         no_export_trace: bool = typer.Option(False, help="Disable trace export"),
+        stream: bool = typer.Option(False, help="Print step events live as the run progresses"),
+        events_ndjson: str = typer.Option("", help="Append run events as NDJSON to this path"),
+        deadline_s: float = typer.Option(0.0, help="Stop the run after this many seconds (0 uses MAOO_RUN_DEADLINE_S)"),
+        run_cache: bool = typer.Option(False, help="Reuse a prior completed run with the same goal, context and config"),
     ) -> None:
         if request_file:
             payload = json.loads(Path(request_file).read_text(encoding="utf-8"))
@@ -37,9 +47,99 @@ def register_commands(app: typer.Typer) -> None:
             context.update(json.loads(context_json))
         if not request_text:
             raise typer.BadParameter("Provide --request or --request-file")
-        trace, _ = run_orchestration(request_text, context=context, export_trace=not no_export_trace)
+        sinks: list[Any] = []
+        if stream:
+            sinks.append(lambda event: render_event(event, console=console))
+        if events_ndjson:
+            sinks.append(NdjsonEventWriter(events_ndjson))
+
+        def on_event(event: RunEvent) -> None:
+            for sink in sinks:
+                sink(event)
+
+        trace, _ = run_orchestration(
+            request_text,
+            context=context,
+            export_trace=not no_export_trace,
+            config_overrides={"run_deadline_s": deadline_s} if deadline_s > 0 else None,
+            on_event=on_event if sinks else None,
+            use_cache=True if run_cache else None,
+        )
+        render_trace(trace, console=console)
+
+    @app.command()
+    def resume(
+        run_id: str = typer.Argument(..., help="Run id of an interrupted run"),
+        no_export_trace: bool = typer.Option(False, help="Disable trace export"),
+        stream: bool = typer.Option(False, help="Print step events live as the run progresses"),
+        reexecute_unsafe: bool = typer.Option(False, help="Repeat a non-idempotent step that was in flight when the run died"),
+    ) -> None:
+        trace, _ = resume_orchestration(
+            run_id,
+            export_trace=not no_export_trace,
+            on_event=(lambda event: render_event(event, console=console)) if stream else None,
+            reexecute_unsafe=reexecute_unsafe,
+        )
+        if trace is None:
+            raise typer.BadParameter(f"No checkpoint or stored trace for run {run_id}")
         render_trace(trace, console=console)
 
+    @app.command()
+    def batch(
+        requests_file: str = typer.Argument(..., help="JSON list of {'request': '...', 'context': {...}}"),
+        workers: int = typer.Option(0, help="Worker processes (0 uses MAOO_SERVICE_WORKERS, then one per CPU)"),
+        no_export_trace: bool = typer.Option(False, help="Disable trace export"),
+    ) -> None:
+        items = json.loads(Path(requests_file).read_text(encoding="utf-8"))
+        requests = [
+            RunRequest(
+                raw_goal=item.get("request") or item.get("raw_goal") or "",
+                context=item.get("context", {}),
+                export_trace=not no_export_trace,
+                deadline_s=item.get("deadline_s"),
+            )
+            for item in items
+        ]
+        config = load_config()
+        if workers > 0:
+            config = config.model_copy(update={"service_workers": workers})
+        with WorkerPool.from_config(config) as pool:
+            traces = pool.map(requests)
+        render_batch_summary(traces, console=console)
+
+    @app.command()
+    def submit(
+        request: str = typer.Option(..., help="Raw user request"),
+        context_json: str = typer.Option("", help="Optional context JSON object"),
+        priority: int = typer.Option(0, help="Lower runs first"),
+        deadline_s: float = typer.Option(0.0, help="Per-attempt run deadline in seconds (0 uses MAOO_RUN_DEADLINE_S)"),
+    ) -> None:
+        config = load_config()
+        queue = job_queue_from_config(config, LongTermMemory(config.sqlite_path, schema_path=Path("sql/schema.sql")))
+        payload: dict[str, Any] = {"raw_goal": request, "context": json.loads(context_json) if context_json else {}}
+        if deadline_s > 0:
+            payload["deadline_s"] = deadline_s
+        job = queue.enqueue(payload, priority=priority)
+        console.print_json(json.dumps({"job_id": job.job_id, "run_id": job.run_id, "status": job.status.value}))
+
+    @app.command("job-status")
+    def job_status(job_id: str = typer.Argument(..., help="Job id returned by submit")) -> None:
+        config = load_config()
+        queue = job_queue_from_config(config, LongTermMemory(config.sqlite_path, schema_path=Path("sql/schema.sql")))
+        job = queue.get(job_id)
+        if job is None:
+            raise typer.BadParameter(f"Unknown job: {job_id}")
+        console.print_json(job.model_dump_json())
+
+    @app.command()
+    def worker(
+        processes: int = typer.Option(0, help="Job worker processes (0 uses MAOO_SERVICE_WORKERS, then one per CPU)"),
+    ) -> None:
+        config = load_config()
+        count = processes or config.service_workers or (os.cpu_count() or 1)
+        console.print(f"Serving jobs with {count} worker process(es); Ctrl+C to stop")
+        serve_job_workers(count, start_method=config.service_start_method, max_restarts=config.service_max_worker_restarts)
+
     @app.command()
     def demo(name: str = typer.Argument("happy")) -> None:
         demos = {
@@ -56,8 +156,18 @@ def register_commands(app: typer.Typer) -> None:
     def eval(
         scenarios_path: str = typer.Option("eval/scenarios.json", help="Path to eval scenarios JSON"),
         export_dir: str = typer.Option("runtime/traces", help="Directory to export eval traces"),
+        llm_stub_url: str = typer.Option("", help="Run in LLM mode against a local stub, e.g. http://127.0.0.1:8002"),
+        tool_replay: str = typer.Option("off", help="Tool record/replay mode: off, record or replay"),
+        cassette_dir: str = typer.Option("runtime/cassettes", help="Per-scenario cassettes (or exported eval traces)"),
     ) -> None:
-        summary = run_scenarios(scenarios_path, export_dir)
+        overrides = llm_stub_overrides(llm_stub_url) if llm_stub_url else None
+        summary = run_scenarios(
+            scenarios_path,
+            export_dir,
+            config_overrides=overrides,
+            tool_replay_mode=tool_replay,
+            cassette_dir=cassette_dir,
+        )
         render_eval_summary(summary, console=console)
 
     @app.command("show-trace")
@@ -4,7 +4,7 @@ from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 
-from core.types import EvalSummary, RunTrace
+from core.types import EvalSummary, RunEvent, RunEventType, RunTrace
 from .formatters import pretty_json
 
 
@@ -40,3 +40,38 @@ def render_eval_summary(summary: EvalSummary, console: Console | None = None) ->
     console.print(table)
     console.print(f"Passed {summary.passed}/{summary.total}")
 
+
+
+def render_batch_summary(traces: list[RunTrace], console: Console | None = None) -> None:
+    console = console or Console()
+    table = Table(title="Batch Runs")
+    table.add_column("Trace")
+    table.add_column("Status")
+    table.add_column("Stop Reason")
+    table.add_column("Request")
+    for trace in traces:
+        table.add_row(trace.trace_id, trace.status.value, trace.stop_reason.type.value, str(trace.request.get("raw_goal", "")))
+    console.print(table)
+
+
+def render_event(event: RunEvent, console: Console | None = None) -> None:
+    console = console or Console()
+    data = event.data
+    step = event.step_id or "-"
+    if event.type == RunEventType.STEP_START:
+        line = f"{data.get('tool_name')} attempt={data.get('attempt')} {data.get('objective', '')}"
+    elif event.type == RunEventType.TOOL_CALL:
+        call = data.get("call", {})
+        line = f"{call.get('tool_name')} {call.get('status')} {call.get('latency_ms')}ms {call.get('error') or ''}"
+    elif event.type == RunEventType.FAILURE_SIGNAL:
+        line = ", ".join(f"{s.get('failure_type')}: {s.get('message')}" for s in data.get("signals", []))
+    elif event.type == RunEventType.REFINEMENT:
+        decision = data.get("decision", {})
+        line = f"{decision.get('action')} ({decision.get('reason')})"
+    elif event.type == RunEventType.STEP:
+        line = str(data.get("event", {}).get("message", ""))
+    elif event.type == RunEventType.STOP:
+        line = f"status={data.get('status')} stop_reason={data.get('stop_reason', {}).get('type')}"
+    else:
+        line = pretty_json(data) if data else ""
+    console.print(f"[dim]#{event.seq:03d}[/dim] [bold]{event.type.value:<14}[/bold] {step:<6} {line}", markup=True, highlight=False)
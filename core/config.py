@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import os
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
@@ -50,19 +50,74 @@ class Config(BaseModel):
     openai_base_url: str | None = None
     openai_api_key: str | None = None
     openai_model: str = "gpt-4o-mini"
+    llm_stream: bool = True
+    llm_pool_max_connections: int = 10
+    llm_max_concurrency: int = 4
+    llm_tokens_per_minute: int = 0
+    llm_max_rate_limit_retries: int = 3
+    llm_default_completion_tokens: int = 256
+    llm_priority: Literal["interactive", "batch"] = "interactive"
+    llm_cache_enabled: bool = True
+    llm_cache_ttl_s: float = 86_400.0
+    llm_cache_max_entries: int = 512
+    summarize_chunk_chars: int = 4000
+    summarize_max_workers: int = 4
+    summarize_chunk_max_tokens: int = 256
 
     enable_real_http: bool = False
     allowed_http_hosts: list[str] = Field(default_factory=lambda: ["localhost", "127.0.0.1", "mock-api"])
     mock_api_base_url: str = "http://127.0.0.1:8001"
+    http_max_body_bytes: int = 1_048_576
+    http_spill_retention_s: float = 3600.0
+    http_pool_max_connections: int = 20
+    http_batch_max_concurrency: int = 8
 
     default_http_timeout_s: float = 2.0
+    adaptive_timeouts: bool = True
+    adaptive_timeout_quantile: float = 0.99
+    adaptive_timeout_multiplier: float = 2.0
+    adaptive_timeout_min_samples: int = 20
+    adaptive_timeout_floor_s: float = 0.25
+    adaptive_timeout_ceiling_s: float = 10.0
+    adaptive_timeout_persist_every: int = 25
     default_max_steps: int = 12
     default_max_retries_per_step: int = 2
     default_budget_units: int = 50
     non_progress_threshold: int = 3
+    run_deadline_s: float = 0.0
+    run_checkpoints: bool = True
+    run_cache_enabled: bool = False
+    run_cache_ttl_s: float = 3600.0
     random_seed: int = 42
+    tool_replay_mode: Literal["off", "record", "replay"] = "off"
+    tool_cassette_path: Path = Path("runtime/cassettes/tools.json")
+    tool_replay_latency: bool = False
+    tool_replay_strict: bool = False
+    tool_memo_max_entries: int = 256
+    plan_cache_max_entries: int = 256
+
+    service_workers: int = 0
+    service_start_method: Literal["spawn", "forkserver", "fork"] = "spawn"
+    service_max_worker_restarts: int = 16
+    service_port: int = 8080
+    service_max_in_flight: int = 4
+    service_max_queue: int = 32
+    service_sync_timeout_s: float = 30.0
+    service_max_live_runs: int = 256
+    job_lease_s: float = 60.0
+    job_max_attempts: int = 3
+    job_retry_backoff_s: float = 2.0
+    job_batch_size: int = 4
+    job_poll_interval_s: float = 0.5
 
     enable_db_writes: bool = False
+    db_read_pool_size: int = 4
+    db_query_timeout_s: float = 2.0
+    db_query_max_vm_steps: int = 50_000_000
+    db_query_max_rows: int = 1000
+    db_query_max_bytes: int = 1_048_576
+    db_query_cache_max_entries: int = 256
+    db_query_cache_max_bytes: int = 8_388_608
 
     @classmethod
     def from_env(cls, overrides: dict[str, Any] | None = None) -> "Config":
@@ -86,23 +141,86 @@ class Config(BaseModel):
             "openai_base_url": os.getenv("MAOO_OPENAI_BASE_URL") or None,
             "openai_api_key": os.getenv("MAOO_OPENAI_API_KEY") or None,
             "openai_model": os.getenv("MAOO_OPENAI_MODEL", "gpt-4o-mini"),
+            "llm_stream": _parse_bool(os.getenv("MAOO_LLM_STREAM"), True),
+            "llm_pool_max_connections": _parse_int(os.getenv("MAOO_LLM_POOL_MAX_CONNECTIONS"), 10),
+            "llm_max_concurrency": _parse_int(os.getenv("MAOO_LLM_MAX_CONCURRENCY"), 4),
+            "llm_tokens_per_minute": _parse_int(os.getenv("MAOO_LLM_TOKENS_PER_MINUTE"), 0),
+            "llm_max_rate_limit_retries": _parse_int(os.getenv("MAOO_LLM_MAX_RATE_LIMIT_RETRIES"), 3),
+            "llm_default_completion_tokens": _parse_int(os.getenv("MAOO_LLM_DEFAULT_COMPLETION_TOKENS"), 256),
+            "llm_priority": os.getenv("MAOO_LLM_PRIORITY", "interactive"),
+            "llm_cache_enabled": _parse_bool(os.getenv("MAOO_LLM_CACHE_ENABLED"), True),
+            "llm_cache_ttl_s": _parse_float(os.getenv("MAOO_LLM_CACHE_TTL_S"), 86_400.0),
+            "llm_cache_max_entries": _parse_int(os.getenv("MAOO_LLM_CACHE_MAX_ENTRIES"), 512),
+            "summarize_chunk_chars": _parse_int(os.getenv("MAOO_SUMMARIZE_CHUNK_CHARS"), 4000),
+            "summarize_max_workers": _parse_int(os.getenv("MAOO_SUMMARIZE_MAX_WORKERS"), 4),
+            "summarize_chunk_max_tokens": _parse_int(os.getenv("MAOO_SUMMARIZE_CHUNK_MAX_TOKENS"), 256),
             "enable_real_http": _parse_bool(os.getenv("MAOO_ENABLE_REAL_HTTP"), False),
             "allowed_http_hosts": _parse_list(
                 os.getenv("MAOO_ALLOWED_HTTP_HOSTS"),
                 ["localhost", "127.0.0.1", "mock-api"],
             ),
             "mock_api_base_url": os.getenv("MAOO_MOCK_API_BASE_URL", "http://127.0.0.1:8001"),
+            "http_max_body_bytes": _parse_int(os.getenv("MAOO_HTTP_MAX_BODY_BYTES"), 1_048_576),
+            "http_spill_retention_s": _parse_float(os.getenv("MAOO_HTTP_SPILL_RETENTION_S"), 3600.0),
+            "http_pool_max_connections": _parse_int(os.getenv("MAOO_HTTP_POOL_MAX_CONNECTIONS"), 20),
+            "http_batch_max_concurrency": _parse_int(os.getenv("MAOO_HTTP_BATCH_MAX_CONCURRENCY"), 8),
             "default_http_timeout_s": _parse_float(os.getenv("MAOO_DEFAULT_HTTP_TIMEOUT_S"), 2.0),
+            "adaptive_timeouts": _parse_bool(os.getenv("MAOO_ADAPTIVE_TIMEOUTS"), True),
+            "adaptive_timeout_quantile": _parse_float(os.getenv("MAOO_ADAPTIVE_TIMEOUT_QUANTILE"), 0.99),
+            "adaptive_timeout_multiplier": _parse_float(os.getenv("MAOO_ADAPTIVE_TIMEOUT_MULTIPLIER"), 2.0),
+            "adaptive_timeout_min_samples": _parse_int(os.getenv("MAOO_ADAPTIVE_TIMEOUT_MIN_SAMPLES"), 20),
+            "adaptive_timeout_floor_s": _parse_float(os.getenv("MAOO_ADAPTIVE_TIMEOUT_FLOOR_S"), 0.25),
+            "adaptive_timeout_ceiling_s": _parse_float(os.getenv("MAOO_ADAPTIVE_TIMEOUT_CEILING_S"), 10.0),
+            "adaptive_timeout_persist_every": _parse_int(os.getenv("MAOO_ADAPTIVE_TIMEOUT_PERSIST_EVERY"), 25),
             "default_max_steps": _parse_int(os.getenv("MAOO_DEFAULT_MAX_STEPS"), 12),
             "default_max_retries_per_step": _parse_int(os.getenv("MAOO_DEFAULT_MAX_RETRIES_PER_STEP"), 2),
             "default_budget_units": _parse_int(os.getenv("MAOO_DEFAULT_BUDGET_UNITS"), 50),
             "non_progress_threshold": _parse_int(os.getenv("MAOO_NON_PROGRESS_THRESHOLD"), 3),
+            "run_deadline_s": _parse_float(os.getenv("MAOO_RUN_DEADLINE_S"), 0.0),
+            "run_checkpoints": _parse_bool(os.getenv("MAOO_RUN_CHECKPOINTS"), True),
+            "run_cache_enabled": _parse_bool(os.getenv("MAOO_RUN_CACHE_ENABLED"), False),
+            "run_cache_ttl_s": _parse_float(os.getenv("MAOO_RUN_CACHE_TTL_S"), 3600.0),
             "random_seed": _parse_int(os.getenv("MAOO_RANDOM_SEED"), 42),
+            "tool_replay_mode": os.getenv("MAOO_TOOL_REPLAY_MODE", "off"),
+            "tool_cassette_path": Path(os.getenv("MAOO_TOOL_CASSETTE_PATH", str(runtime_dir / "cassettes" / "tools.json"))),
+            "tool_replay_latency": _parse_bool(os.getenv("MAOO_TOOL_REPLAY_LATENCY"), False),
+            "tool_replay_strict": _parse_bool(os.getenv("MAOO_TOOL_REPLAY_STRICT"), False),
+            "tool_memo_max_entries": _parse_int(os.getenv("MAOO_TOOL_MEMO_MAX_ENTRIES"), 256),
+            "plan_cache_max_entries": _parse_int(os.getenv("MAOO_PLAN_CACHE_MAX_ENTRIES"), 256),
+            "service_workers": _parse_int(os.getenv("MAOO_SERVICE_WORKERS"), 0),
+            "service_start_method": os.getenv("MAOO_SERVICE_START_METHOD", "spawn"),
+            "service_max_worker_restarts": _parse_int(os.getenv("MAOO_SERVICE_MAX_WORKER_RESTARTS"), 16),
+            "service_port": _parse_int(os.getenv("MAOO_SERVICE_PORT"), 8080),
+            "service_max_in_flight": _parse_int(os.getenv("MAOO_SERVICE_MAX_IN_FLIGHT"), 4),
+            "service_max_queue": _parse_int(os.getenv("MAOO_SERVICE_MAX_QUEUE"), 32),
+            "service_sync_timeout_s": _parse_float(os.getenv("MAOO_SERVICE_SYNC_TIMEOUT_S"), 30.0),
+            "service_max_live_runs": _parse_int(os.getenv("MAOO_SERVICE_MAX_LIVE_RUNS"), 256),
+            "job_lease_s": _parse_float(os.getenv("MAOO_JOB_LEASE_S"), 60.0),
+            "job_max_attempts": _parse_int(os.getenv("MAOO_JOB_MAX_ATTEMPTS"), 3),
+            "job_retry_backoff_s": _parse_float(os.getenv("MAOO_JOB_RETRY_BACKOFF_S"), 2.0),
+            "job_batch_size": _parse_int(os.getenv("MAOO_JOB_BATCH_SIZE"), 4),
+            "job_poll_interval_s": _parse_float(os.getenv("MAOO_JOB_POLL_INTERVAL_S"), 0.5),
             "enable_db_writes": _parse_bool(os.getenv("MAOO_ENABLE_DB_WRITES"), False),
+            "db_read_pool_size": _parse_int(os.getenv("MAOO_DB_READ_POOL_SIZE"), 4),
+            "db_query_timeout_s": _parse_float(os.getenv("MAOO_DB_QUERY_TIMEOUT_S"), 2.0),
+            "db_query_max_vm_steps": _parse_int(os.getenv("MAOO_DB_QUERY_MAX_VM_STEPS"), 50_000_000),
+            "db_query_max_rows": _parse_int(os.getenv("MAOO_DB_QUERY_MAX_ROWS"), 1000),
+            "db_query_max_bytes": _parse_int(os.getenv("MAOO_DB_QUERY_MAX_BYTES"), 1_048_576),
+            "db_query_cache_max_entries": _parse_int(os.getenv("MAOO_DB_QUERY_CACHE_MAX_ENTRIES"), 256),
+            "db_query_cache_max_bytes": _parse_int(os.getenv("MAOO_DB_QUERY_CACHE_MAX_BYTES"), 8_388_608),
         }
         if overrides:
             for key, value in overrides.items():
-                if key in {"sqlite_path", "runtime_dir", "logs_dir", "traces_dir", "workspace_dir", "sqlite_dir", "file_workspace_root"}:
+                if key in {
+                    "sqlite_path",
+                    "runtime_dir",
+                    "logs_dir",
+                    "traces_dir",
+                    "workspace_dir",
+                    "sqlite_dir",
+                    "file_workspace_root",
+                    "tool_cassette_path",
+                }:
                     data[key] = Path(value)
                 else:
                     data[key] = value
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from threading import Event
+from typing import Any
+
+from .exceptions import RunInterruptedError
+from .types import FailureType, StopReason, StopReasonType
+
+# Below this a tool cannot do useful work; the call is refused instead of issued with a near-zero timeout.
+MIN_TOOL_TIMEOUT_S = 0.05
+
+
+class CancellationToken:
+    def __init__(self) -> None:
+        self._event = Event()
+        self.reason = ""
+
+    def cancel(self, reason: str = "cancelled by caller") -> None:
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, timeout_s: float | None = None) -> bool:
+        return self._event.wait(timeout_s)
+
+
+class Deadline:
+    def __init__(
+        self,
+        timeout_s: float | None = None,
+        token: CancellationToken | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._clock = clock
+        self.timeout_s = timeout_s if timeout_s and timeout_s > 0 else None
+        self.expires_at = clock() + self.timeout_s if self.timeout_s is not None else None
+        self.token = token or CancellationToken()
+
+    def remaining(self) -> float | None:
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0.0
+
+    def stop_reason(self) -> StopReason | None:
+        if self.token.cancelled:
+            return StopReason(type=StopReasonType.CANCELLED, message=self.token.reason)
+        if self.expired:
+            return StopReason(type=StopReasonType.DEADLINE_EXCEEDED, message=f"run deadline of {self.timeout_s}s exceeded")
+        return None
+
+    def check(self, what: str) -> None:
+        if self.token.cancelled:
+            raise RunInterruptedError(f"{what} cancelled: {self.token.reason}", FailureType.CANCELLED)
+        remaining = self.remaining()
+        if remaining is not None and remaining < MIN_TOOL_TIMEOUT_S:
+            raise RunInterruptedError(
+                f"{what} not started: run deadline exceeded",
+                FailureType.TIMEOUT,
+                diagnostics={"deadline_s": self.timeout_s, "remaining_s": round(remaining, 3)},
+            )
+
+    def clamp(self, timeout_s: float | None) -> float | None:
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout_s
+        if timeout_s is None:
+            return max(MIN_TOOL_TIMEOUT_S, remaining)
+        return max(MIN_TOOL_TIMEOUT_S, min(float(timeout_s), remaining))
+
+
+def clamp_timeout(ctx: Any, timeout_s: float | None) -> float | None:
+    deadline = getattr(ctx, "deadline", None)
+    return deadline.clamp(timeout_s) if deadline is not None else timeout_s
+
+
+def check_deadline(ctx: Any, what: str) -> None:
+    deadline = getattr(ctx, "deadline", None)
+    if deadline is not None:
+        deadline.check(what)
@@ -23,6 +23,10 @@ class ToolExecutionError(MAOOError):
         self.diagnostics = diagnostics or {}
 
 
+class RunInterruptedError(ToolExecutionError):
+    pass
+
+
 class PlanValidationError(MAOOError):
     def __init__(self, message: str, diagnostics: dict[str, Any] | None = None) -> None:
         super().__init__(message)
@@ -30,6 +34,21 @@ class PlanValidationError(MAOOError):
         self.diagnostics = diagnostics or {}
 
 
+class QueryBudgetExceeded(MAOOError):
+    def __init__(self, message: str, budget: str, diagnostics: dict[str, Any] | None = None) -> None:
+        super().__init__(message)
+        self.failure_type = FailureType.BUDGET_EXCEEDED
+        self.budget = budget
+        self.diagnostics = diagnostics or {}
+
+
+class WorkerCrashedError(MAOOError):
+    def __init__(self, message: str, diagnostics: dict[str, Any] | None = None) -> None:
+        super().__init__(message)
+        self.failure_type = FailureType.UNKNOWN
+        self.diagnostics = diagnostics or {}
+
+
 class StopConditionTriggered(MAOOError):
     def __init__(self, message: str, reason: str) -> None:
         super().__init__(message)
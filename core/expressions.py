@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import ast
+import operator
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+try:  # optional: vectorized batch evaluation
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when numpy is not installed
+    np = None
+
+_BIN_OPS: dict[type[ast.operator], Callable[[Any, Any], Any]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_UNARY_OPS: dict[type[ast.unaryop], Callable[[Any], Any]] = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+_FLOAT_SAFE_OPS = frozenset({ast.Add, ast.Sub, ast.Mult, ast.Div, ast.UAdd, ast.USub})
+
+Evaluator = Callable[[Mapping[str, Any]], Any]
+
+
+class UnsafeExpressionError(ValueError):
+    def __init__(self, expression: str, node: str) -> None:
+        super().__init__(f"Unsafe calc expression node: {node}")
+        self.expression = expression
+        self.node = node
+
+
+@dataclass(frozen=True)
+class CompiledExpression:
+    source: str
+    variables: tuple[str, ...]
+    evaluator: Evaluator
+    operators: frozenset[type[ast.AST]] = frozenset()
+
+    def evaluate(self, bindings: Mapping[str, Any] | None = None) -> Any:
+        env = bindings or {}
+        missing = [name for name in self.variables if name not in env]
+        if missing:
+            raise NameError(f"unbound variables: {', '.join(missing)}")
+        return self.evaluator(env)
+
+    def _evaluate_rows(self, columns: Mapping[str, Sequence[Any]], rows: int) -> list[Any]:
+        return [self.evaluator({name: columns[name][i] for name in self.variables}) for i in range(rows)]
+
+    def evaluate_batch(self, columns: Mapping[str, Sequence[Any]]) -> list[Any]:
+        missing = [name for name in self.variables if name not in columns]
+        if missing:
+            raise NameError(f"unbound variables: {', '.join(missing)}")
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("batch columns must have equal length")
+        rows = lengths.pop() if lengths else 1
+        if rows == 0:
+            return []
+        if not self.variables:
+            return [self.evaluator({})] * rows
+        integral = all(type(v) is int for name in self.variables for v in columns[name])
+        if np is None or (integral and not self.operators <= _FLOAT_SAFE_OPS):
+            # //, % and ** on ints have no exact vectorized equivalent, so those rows run one by one.
+            return self._evaluate_rows(columns, rows)
+        arrays = {name: np.asarray(columns[name], dtype=float) for name in self.variables}
+        with np.errstate(divide="raise", invalid="raise", over="raise"):
+            try:
+                out = self.evaluator(arrays)
+            except FloatingPointError as exc:
+                raise ArithmeticError(str(exc)) from exc
+        if integral and ast.Div not in self.operators:
+            # The scalar path would return ints. int64 arithmetic wraps, but +, - and * wrap consistently,
+            # so the result is exact whenever it fits, which the float pass tells us.
+            if np.max(np.abs(out)) >= 2**62:
+                return self._evaluate_rows(columns, rows)
+            with np.errstate(over="ignore"):
+                out = self.evaluator({name: np.asarray(columns[name], dtype=np.int64) for name in self.variables})
+        return np.broadcast_to(out, (rows,)).tolist()
+
+
+def _compile(node: ast.AST, expression: str, names: set[str], ops: set[type[ast.AST]]) -> Evaluator:
+    if isinstance(node, ast.Expression):
+        return _compile(node.body, expression, names, ops)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        value = node.value
+        return lambda env: value
+    if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+        name = node.id
+        names.add(name)
+        return lambda env: env[name]
+    if isinstance(node, ast.BinOp) and type(node.op) in _BIN_OPS:
+        op = _BIN_OPS[type(node.op)]
+        ops.add(type(node.op))
+        left = _compile(node.left, expression, names, ops)
+        right = _compile(node.right, expression, names, ops)
+        return lambda env: op(left(env), right(env))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+        unary = _UNARY_OPS[type(node.op)]
+        ops.add(type(node.op))
+        operand = _compile(node.operand, expression, names, ops)
+        return lambda env: unary(operand(env))
+    raise UnsafeExpressionError(expression, type(node).__name__)
+
+
+@lru_cache(maxsize=512)
+def compile_expression(expression: str) -> CompiledExpression:
+    tree = ast.parse(expression, mode="eval")
+    names: set[str] = set()
+    ops: set[type[ast.AST]] = set()
+    evaluator = _compile(tree, expression, names, ops)
+    return CompiledExpression(
+        source=expression, variables=tuple(sorted(names)), evaluator=evaluator, operators=frozenset(ops)
+    )
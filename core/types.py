@@ -3,6 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from enum import Enum
+from threading import Lock
 from typing import Any
 
 from pydantic import BaseModel, ConfigDict, Field
@@ -35,6 +36,13 @@ class RunStatus(str, Enum):
     FAILED = "FAILED"
 
 
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    LEASED = "leased"
+    DONE = "done"
+    DEAD = "dead"
+
+
 class StepStatus(str, Enum):
     PENDING = "PENDING"
     RUNNING = "RUNNING"
@@ -53,6 +61,7 @@ class FailureType(str, Enum):
     VALIDATION_ERROR = "validation_error"
     BUDGET_EXCEEDED = "budget_exceeded"
     NON_PROGRESS = "non_progress"
+    CANCELLED = "cancelled"
     UNKNOWN = "unknown"
 
 
@@ -73,6 +82,8 @@ class StopReasonType(str, Enum):
     FAILED = "failed"
     POLICY_BLOCKED = "policy_blocked"
     VALIDATION_FAILED = "validation_failed"
+    DEADLINE_EXCEEDED = "deadline_exceeded"
+    CANCELLED = "cancelled"
     NONE = "none"
 
 
@@ -90,10 +101,52 @@ class Severity(str, Enum):
     HIGH = "high"
 
 
+_USAGE_LOCK = Lock()
+
+
+class ResourceUsage(BaseModel):
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    bytes_transferred: int = 0
+    rows_scanned: int = 0
+    cost_units: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def charge(self, **amounts: int) -> None:
+        # Tools may charge from worker threads (http_get_many, chunked summarize).
+        with _USAGE_LOCK:
+            for name, value in amounts.items():
+                setattr(self, name, getattr(self, name) + int(value or 0))
+
+    def add(self, other: "ResourceUsage") -> None:
+        self.charge(**other.model_dump())
+
+
 class BudgetGuard(BaseModel):
     max_cost_units: int = 50
     max_tokens: int | None = None
     cost_per_step: int = 1
+    tokens_per_cost_unit: int = 1000
+    bytes_per_cost_unit: int = 1_048_576
+    rows_per_cost_unit: int = 1000
+
+    def cost_of(self, usage: ResourceUsage) -> int:
+        return (
+            self.cost_per_step
+            + usage.total_tokens // max(1, self.tokens_per_cost_unit)
+            + usage.bytes_transferred // max(1, self.bytes_per_cost_unit)
+            + usage.rows_scanned // max(1, self.rows_per_cost_unit)
+        )
+
+    def remaining(self, usage: ResourceUsage) -> dict[str, int | None]:
+        return {
+            "cost_units": self.max_cost_units - usage.cost_units,
+            "tokens": self.max_tokens - usage.total_tokens if self.max_tokens is not None else None,
+            "retry_cost": self.cost_per_step,
+        }
 
 
 class PerceptionResult(BaseModel):
@@ -122,6 +175,13 @@ class Plan(BaseModel):
     planner_notes: list[str] = Field(default_factory=list)
 
 
+class PlanDelta(BaseModel):
+    # Replacement for the failed step onward; steps not listed in rebuilt_step_ids are the caller's own objects.
+    steps: list[PlanStep] = Field(default_factory=list)
+    rebuilt_step_ids: list[str] = Field(default_factory=list)
+    notes: list[str] = Field(default_factory=list)
+
+
 class ValidatedPlan(BaseModel):
     plan: Plan
     warnings: list[str] = Field(default_factory=list)
@@ -147,6 +207,7 @@ class RefinementDecision(BaseModel):
     action: RefinementActionType
     patched_args: dict[str, Any] | None = None
     replanned_steps: list[PlanStep] | None = None
+    rebuilt_step_ids: list[str] | None = None
     reason: str
 
 
@@ -161,9 +222,38 @@ class ToolCallRecord(BaseModel):
     result: dict[str, Any] | None = None
     error: str | None = None
     raw_response: Any = None
+    usage: ResourceUsage | None = None
+    from_cache: bool = False
     ts: str = Field(default_factory=utc_now_iso)
 
 
+class CassetteEntry(BaseModel):
+    tool_name: str
+    args: dict[str, Any] = Field(default_factory=dict)
+    status: ToolCallStatus
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    failure_type: FailureType | None = None
+    diagnostics: dict[str, Any] = Field(default_factory=dict)
+    latency_ms: int = 0
+    usage: ResourceUsage | None = None
+
+
+class JobRecord(BaseModel):
+    job_id: str
+    queue: str = "default"
+    status: JobStatus
+    priority: int = 0
+    payload: dict[str, Any] = Field(default_factory=dict)
+    run_id: str
+    attempts: int = 0
+    max_attempts: int = 3
+    available_at: float = 0.0
+    lease_owner: str | None = None
+    lease_expires_at: float | None = None
+    last_error: str | None = None
+
+
 class StepEvent(BaseModel):
     step_id: str
     attempt: int
@@ -175,6 +265,50 @@ class StepEvent(BaseModel):
     ts: str = Field(default_factory=utc_now_iso)
 
 
+class RunCheckpoint(BaseModel):
+    run_id: str
+    trace_id: str
+    seq: int = 0
+    request: dict[str, Any] = Field(default_factory=dict)
+    started_at: str = Field(default_factory=utc_now_iso)
+    perception: PerceptionResult
+    plan: Plan
+    steps: list[PlanStep] = Field(default_factory=list)
+    step_index: int = 0
+    completed_steps: int = 0
+    state: dict[str, Any] = Field(default_factory=dict)
+    observations: list[dict[str, Any]] = Field(default_factory=list)
+    retries: dict[str, int] = Field(default_factory=dict)
+    stm_refinements: list[dict[str, Any]] = Field(default_factory=list)
+    signatures: dict[str, int] = Field(default_factory=dict)
+    step_events: list[StepEvent] = Field(default_factory=list)
+    tool_calls: list[ToolCallRecord] = Field(default_factory=list)
+    monitor_signals: list[FailureSignal] = Field(default_factory=list)
+    refinements: list[RefinementDecision] = Field(default_factory=list)
+    usage: ResourceUsage = Field(default_factory=ResourceUsage)
+    pending_call: dict[str, Any] | None = None
+
+
+class RunEventType(str, Enum):
+    RUN_START = "run_start"
+    STEP_START = "step_start"
+    TOOL_CALL = "tool_call"
+    FAILURE_SIGNAL = "failure_signal"
+    REFINEMENT = "refinement"
+    STEP = "step"
+    STOP = "stop"
+
+
+class RunEvent(BaseModel):
+    seq: int
+    type: RunEventType
+    trace_id: str
+    run_id: str
+    step_id: str | None = None
+    data: dict[str, Any] = Field(default_factory=dict)
+    ts: str = Field(default_factory=utc_now_iso)
+
+
 class StopReason(BaseModel):
     type: StopReasonType = StopReasonType.NONE
     message: str = ""
@@ -193,6 +327,7 @@ class RunTrace(BaseModel):
     refinements: list[RefinementDecision] = Field(default_factory=list)
     final_output: dict[str, Any] = Field(default_factory=dict)
     metrics_snapshot: dict[str, int] = Field(default_factory=dict)
+    usage: ResourceUsage = Field(default_factory=ResourceUsage)
     stop_reason: StopReason = Field(default_factory=StopReason)
     started_at: str = Field(default_factory=utc_now_iso)
     finished_at: str | None = None
@@ -244,6 +379,16 @@ class ToolExecutionContext:
     short_term_memory: Any
     long_term_memory: Any
     metrics: Any
+    usage: ResourceUsage | None = None
+    deadline: Any = None
+    reuse: dict[str, Any] | None = None
+    from_cache: bool = False
+
+
+def charge_usage(ctx: Any, **amounts: int) -> None:
+    usage = getattr(ctx, "usage", None)
+    if usage is not None:
+        usage.charge(**amounts)
 
 
 @dataclass
@@ -259,6 +404,11 @@ class RunContext:
     planner: Any
     monitors: Any
     refinement: Any
+    timeouts: Any = None
+    events: Any = None
+    deadline: Any = None
+    checkpoints: Any = None
+    reuse: dict[str, Any] | None = None
 
 
 class PromptRequest(BaseModel):
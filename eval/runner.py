@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
+from typing import Any
 
 from core.config import load_config
 from core.types import EvalScenario, EvalSummary
@@ -17,17 +18,38 @@ def _load_scenarios(scenarios_path: str | Path) -> list[EvalScenario]:
     return [EvalScenario.model_validate(item) for item in data]
 
 
-def run_scenarios(scenarios_path: str | Path, export_dir: str | Path) -> EvalSummary:
+def llm_stub_overrides(base_url: str) -> dict[str, Any]:
+    return {"no_llm_mode": False, "openai_base_url": base_url, "openai_api_key": "stub", "llm_cache_enabled": False}
+
+
+def scenario_cassette_path(cassette_dir: str | Path, scenario_id: str) -> Path:
+    path = Path(cassette_dir) / f"{scenario_id}.json"
+    trace_path = Path(cassette_dir) / f"{scenario_id}.trace.json"
+    # A directory of exported eval traces can be replayed without re-recording.
+    return trace_path if not path.exists() and trace_path.exists() else path
+
+
+def run_scenarios(
+    scenarios_path: str | Path,
+    export_dir: str | Path,
+    config_overrides: dict[str, Any] | None = None,
+    tool_replay_mode: str = "off",
+    cassette_dir: str | Path = "runtime/cassettes",
+) -> EvalSummary:
     scenarios = _load_scenarios(scenarios_path)
     results = []
-    cfg = load_config()
+    cfg = load_config(config_overrides) if config_overrides else load_config()
     long_term = LongTermMemory(cfg.sqlite_path, schema_path=Path("sql/schema.sql"), seed_path=Path("sql/seed_data.sql"))
 
     for scenario in scenarios:
+        overrides: dict[str, Any] = {"llm_priority": "batch", **(config_overrides or {})}
+        if tool_replay_mode != "off":
+            overrides["tool_replay_mode"] = tool_replay_mode
+            overrides["tool_cassette_path"] = scenario_cassette_path(cassette_dir, scenario.id)
         trace, _ = run_orchestration(
             raw_goal=scenario.request,
             context=scenario.context,
-            config_overrides=scenario.config_overrides,
+            config_overrides={**overrides, **scenario.config_overrides},
             export_trace=False,
             trace_prefix=f"eval_{scenario.id}",
         )
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from collections import defaultdict
+from pathlib import Path
+from threading import Lock
+from typing import Any, Literal
+
+from pydantic import BaseModel
+
+from core.exceptions import PolicyViolationError, ToolExecutionError
+from core.types import CassetteEntry, FailureType, ToolCallRecord, ToolCallStatus, charge_usage
+
+ReplayMode = Literal["off", "record", "replay"]
+
+# Adaptive timeouts rewrite timeout_s between runs; it must not change which recording a call matches.
+_VOLATILE_ARGS = frozenset({"timeout_s"})
+
+_STATUS_FAILURES = {
+    ToolCallStatus.TIMEOUT: FailureType.TIMEOUT,
+    ToolCallStatus.SCHEMA_ERROR: FailureType.SCHEMA_ERROR,
+    ToolCallStatus.POLICY_BLOCKED: FailureType.POLICY_VIOLATION,
+    ToolCallStatus.ERROR: FailureType.TOOL_ERROR,
+}
+
+
+def _stable(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _stable(v) for k, v in value.items() if k not in _VOLATILE_ARGS}
+    if isinstance(value, list):
+        return [_stable(v) for v in value]
+    return value
+
+
+def cassette_key(tool_name: str, args: dict[str, Any]) -> str:
+    key = json.dumps({"tool_name": tool_name, "tool_args": _stable(args)}, sort_keys=True, default=str)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def _status_for(failure_type: FailureType) -> ToolCallStatus:
+    for status, mapped in _STATUS_FAILURES.items():
+        if mapped == failure_type:
+            return status
+    return ToolCallStatus.ERROR
+
+
+def entry_from_record(record: ToolCallRecord) -> CassetteEntry:
+    raw = record.raw_response if isinstance(record.raw_response, dict) else {}
+    failure_type = None
+    if record.status != ToolCallStatus.SUCCESS:
+        failure_type = FailureType(raw["failure_type"]) if raw.get("failure_type") else _STATUS_FAILURES[record.status]
+    return CassetteEntry(
+        tool_name=record.tool_name,
+        args=record.validated_args or record.tool_args,
+        status=record.status,
+        result=record.result,
+        error=record.error,
+        failure_type=failure_type,
+        diagnostics=raw.get("diagnostics") or {},
+        latency_ms=record.latency_ms,
+        usage=record.usage,
+    )
+
+
+class CassetteMiss(ToolExecutionError):
+    def __init__(self, tool_name: str, key: str) -> None:
+        super().__init__(
+            f"No recorded outcome for {tool_name} in replay cassette",
+            FailureType.TOOL_ERROR,
+            {"replay_miss": True, "cassette_key": key},
+        )
+
+
+class ToolCassette:
+    def __init__(self, path: str | Path, mode: ReplayMode, replay_latency: bool = False, strict: bool = False) -> None:
+        self.path = Path(path)
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self.strict = strict
+        self._entries: dict[str, list[CassetteEntry]] = defaultdict(list)
+        self._cursors: dict[str, int] = defaultdict(int)
+        self._lock = Lock()
+        self.stats = {"recorded": 0, "replayed": 0, "missed": 0}
+        if mode == "replay":
+            self.load()
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._entries.values())
+
+    def load(self) -> None:
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        if "tool_calls" in data:
+            # An exported RunTrace replays as-is.
+            for item in data["tool_calls"]:
+                self.add(entry_from_record(ToolCallRecord.model_validate(item)))
+            return
+        for key, items in data.get("entries", {}).items():
+            self._entries[key].extend(CassetteEntry.model_validate(item) for item in items)
+
+    def save(self) -> Path:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            payload = {
+                "version": 1,
+                "entries": {key: [e.model_dump(mode="json") for e in items] for key, items in self._entries.items()},
+            }
+        self.path.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+        return self.path
+
+    def add(self, entry: CassetteEntry) -> None:
+        with self._lock:
+            self._entries[cassette_key(entry.tool_name, entry.args)].append(entry)
+
+    def _next(self, key: str) -> CassetteEntry | None:
+        with self._lock:
+            items = self._entries.get(key)
+            if not items:
+                self.stats["missed"] += 1
+                return None
+            # Retries of the same call replay successive recordings; the last one repeats once exhausted.
+            index = min(self._cursors[key], len(items) - 1)
+            self._cursors[key] += 1
+            self.stats["replayed"] += 1
+            return items[index]
+
+    def invoke(self, tool_name: str, result_model: type[BaseModel], handler: Any, args_model: BaseModel, ctx: Any) -> BaseModel:
+        args = args_model.model_dump()
+        if self.mode == "replay":
+            entry = self._next(cassette_key(tool_name, args))
+            if entry is not None:
+                return self._replay(entry, result_model, ctx)
+            if self.strict:
+                raise CassetteMiss(tool_name, cassette_key(tool_name, args))
+            # Inputs built from run-local state (e.g. summarize over retrieved memory) may not match;
+            # lenient replay runs those calls live.
+            return handler(args_model, ctx)
+        if self.mode != "record":
+            return handler(args_model, ctx)
+        started = time.perf_counter()
+        entry = CassetteEntry(tool_name=tool_name, args=args, status=ToolCallStatus.SUCCESS)
+        try:
+            result = handler(args_model, ctx)
+            entry.result = result.model_dump()
+            return result
+        except (PolicyViolationError, ToolExecutionError) as exc:
+            entry.status = _status_for(exc.failure_type)
+            entry.failure_type = exc.failure_type
+            entry.error = str(exc)
+            entry.diagnostics = exc.diagnostics
+            raise
+        except Exception as exc:
+            entry.status = ToolCallStatus.ERROR
+            entry.failure_type = FailureType.TOOL_ERROR
+            entry.error = f"unexpected error: {exc}"
+            raise
+        finally:
+            entry.latency_ms = int((time.perf_counter() - started) * 1000)
+            usage = getattr(ctx, "usage", None)
+            entry.usage = usage.model_copy() if usage is not None else None
+            self.add(entry)
+            with self._lock:
+                self.stats["recorded"] += 1
+
+    def _replay(self, entry: CassetteEntry, result_model: type[BaseModel], ctx: Any) -> BaseModel:
+        if self.replay_latency and entry.latency_ms:
+            time.sleep(entry.latency_ms / 1000.0)
+        if entry.usage is not None:
+            charge_usage(ctx, **entry.usage.model_dump(exclude={"cost_units"}))
+        if entry.status == ToolCallStatus.SUCCESS:
+            return result_model.model_validate(entry.result or {})
+        if entry.status == ToolCallStatus.POLICY_BLOCKED and entry.failure_type in (None, FailureType.POLICY_VIOLATION):
+            raise PolicyViolationError(entry.error or "policy violation", entry.diagnostics)
+        raise ToolExecutionError(
+            entry.error or "replayed tool failure",
+            entry.failure_type or _STATUS_FAILURES.get(entry.status, FailureType.TOOL_ERROR),
+            entry.diagnostics,
+        )
+
+
+def cassette_from_config(config: Any) -> ToolCassette | None:
+    if config.tool_replay_mode == "off":
+        return None
+    return ToolCassette(
+        config.tool_cassette_path,
+        config.tool_replay_mode,
+        replay_latency=config.tool_replay_latency,
+        strict=config.tool_replay_strict,
+    )
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import itertools
+from collections import deque
+from collections.abc import Callable
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+from core.types import RunEvent, RunEventType
+
+Subscriber = Callable[[RunEvent], None]
+
+
+class EventBus:
+    def __init__(self, trace_id: str, run_id: str, history: int = 1000) -> None:
+        self.trace_id = trace_id
+        self.run_id = run_id
+        self._seq = itertools.count(1)
+        self._subscribers: list[Subscriber] = []
+        self._history: deque[RunEvent] = deque(maxlen=history)
+        self._lock = Lock()
+        self.closed = False
+
+    def subscribe(self, callback: Subscriber, replay: bool = False) -> Callable[[], None]:
+        # With replay, a late subscriber (e.g. an SSE client) first receives what it missed, in order.
+        with self._lock:
+            backlog = list(self._history) if replay else []
+            self._subscribers.append(callback)
+            for event in backlog:
+                callback(event)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def emit(self, event_type: RunEventType, step_id: str | None = None, **data: Any) -> RunEvent:
+        with self._lock:
+            event = RunEvent(
+                seq=next(self._seq),
+                type=event_type,
+                trace_id=self.trace_id,
+                run_id=self.run_id,
+                step_id=step_id,
+                data=data,
+            )
+            self._history.append(event)
+            if event_type == RunEventType.STOP:
+                self.closed = True
+            subscribers = list(self._subscribers)
+            # Delivery stays under the lock so every subscriber sees events in seq order.
+            for callback in subscribers:
+                try:
+                    callback(event)
+                except Exception:  # pragma: no cover - a broken consumer must not fail the run
+                    pass
+        return event
+
+
+def emit(run_ctx: Any, event_type: RunEventType, step_id: str | None = None, **data: Any) -> None:
+    bus = getattr(run_ctx, "events", None)
+    if bus is not None:
+        bus.emit(event_type, step_id=step_id, **data)
+
+
+class NdjsonEventWriter:
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def __call__(self, event: RunEvent) -> None:
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.write(event.model_dump_json() + "\n")
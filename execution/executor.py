@@ -7,6 +7,7 @@ from typing import Any
 from core.exceptions import PolicyViolationError, ToolExecutionError
 from core.tracing import new_step_attempt_id, utc_now_iso
 from core.types import (
+    BudgetGuard,
     ExecutionResult,
     FailureSignal,
     FailureType,
@@ -14,6 +15,9 @@ from core.types import (
     Plan,
     PlanStep,
     RefinementActionType,
+    ResourceUsage,
+    RunCheckpoint,
+    RunEventType,
     RunContext,
     RunStatus,
     StepEvent,
@@ -24,30 +28,45 @@ from core.types import (
     ToolCallStatus,
     ToolExecutionContext,
 )
+from execution.events import emit
 
 
 class Executor:
-    def run(self, plan: Plan, perception: PerceptionResult, run_ctx: RunContext) -> ExecutionResult:
+    def run(
+        self,
+        plan: Plan,
+        perception: PerceptionResult,
+        run_ctx: RunContext,
+        resume: RunCheckpoint | None = None,
+    ) -> ExecutionResult:
         trace = run_ctx.trace
         trace.status = RunStatus.EXECUTING
-        steps: list[PlanStep] = [PlanStep.model_validate(s.model_dump()) for s in plan.steps]
+        source_steps = resume.steps if resume is not None else plan.steps
+        steps: list[PlanStep] = [PlanStep.model_validate(s.model_dump()) for s in source_steps]
         stm = run_ctx.short_term_memory
+        checkpoints = run_ctx.checkpoints
         metrics = run_ctx.metrics
         logger = run_ctx.logger.child(component="execution", trace_id=trace.trace_id, run_id=trace.run_id)
 
-        completed_steps = 0
-        cost_units = 0
-        step_index = 0
+        completed_steps = resume.completed_steps if resume is not None else 0
+        guard = plan.budget_guard
+        step_index = resume.step_index if resume is not None else 0
         final_output = {
             "message": "Execution started",
             "step_outputs": {},
             "observations": [],
         }
 
+        if checkpoints is not None and resume is None:
+            checkpoints.begin(trace, perception, plan, stm)
+
         metrics.inc("runs_started_total")
+        emit(run_ctx, RunEventType.RUN_START, steps=len(steps), max_steps=plan.max_steps, resumed_at=step_index if resume else None)
 
         while step_index < len(steps):
             trace.status = RunStatus.EXECUTING
+            if checkpoints is not None:
+                checkpoints.step(steps, step_index, completed_steps, stm, trace)
             success_met = self._success_criteria_met(perception.success_criteria, stm)
             if success_met:
                 trace.status = RunStatus.STOPPED
@@ -62,14 +81,22 @@ class Executor:
                 trace.stop_reason = StopReason(type=StopReasonType.MAX_STEPS, message="max_steps reached")
                 break
 
-            if cost_units >= plan.budget_guard.max_cost_units:
+            budget_message = self._budget_exhausted(guard, trace.usage)
+            if budget_message:
                 trace.status = RunStatus.STOPPED
-                trace.stop_reason = StopReason(type=StopReasonType.BUDGET_GUARD, message="Budget guard exceeded")
+                trace.stop_reason = StopReason(type=StopReasonType.BUDGET_GUARD, message=budget_message)
+                break
+
+            interrupted = self._interrupted(run_ctx)
+            if interrupted is not None:
+                trace.status = RunStatus.STOPPED
+                trace.stop_reason = interrupted
                 break
 
             step = steps[step_index]
             attempt = stm.retry_count(step.step_id) + 1
             logger.info("step_start", f"Executing step {step.step_id}", step_id=step.step_id, attempt=attempt, tool=step.tool_name)
+            emit(run_ctx, RunEventType.STEP_START, step.step_id, attempt=attempt, tool_name=step.tool_name, objective=step.objective)
 
             # Improve summarize input with current observations.
             if step.tool_name == "summarize" and step.tool_args.get("text") == "Summarize run observations":
@@ -87,6 +114,9 @@ class Executor:
                 short_term_memory=stm,
                 long_term_memory=run_ctx.long_term_memory,
                 metrics=metrics,
+                usage=ResourceUsage(),
+                deadline=run_ctx.deadline,
+                reuse=run_ctx.reuse,
             )
 
             started = time.perf_counter()
@@ -98,7 +128,9 @@ class Executor:
 
             try:
                 validated_args_model = run_ctx.registry.validate_args(step.tool_name, step.tool_args)
-                result_model = run_ctx.registry.get(step.tool_name).handler(validated_args_model, tool_ctx)
+                if checkpoints is not None and not run_ctx.registry.get(step.tool_name).idempotent:
+                    checkpoints.intent(step.step_id, attempt, step.tool_name)
+                result_model = run_ctx.registry.invoke(step.tool_name, validated_args_model, tool_ctx)
                 result_payload = result_model.model_dump()
                 raw_response = result_payload
             except PolicyViolationError as exc:
@@ -115,15 +147,20 @@ class Executor:
                 else:
                     status = ToolCallStatus.ERROR
                 error_text = str(exc)
-                raw_response = {"diagnostics": getattr(exc, "diagnostics", {})}
+                raw_response = {"failure_type": exc.failure_type.value, "diagnostics": getattr(exc, "diagnostics", {})}
             except Exception as exc:  # pragma: no cover - defensive fallback
                 status = ToolCallStatus.ERROR
                 error_text = f"unexpected error: {exc}"
                 raw_response = {"exception_type": type(exc).__name__}
 
             latency_ms = int((time.perf_counter() - started) * 1000)
-            cost_units += plan.budget_guard.cost_per_step
+            call_usage = tool_ctx.usage
+            call_usage.cost_units = guard.cost_of(call_usage)
+            trace.usage.add(call_usage)
             metrics.inc("tool_calls_total", labels={"tool": step.tool_name, "status": status.value})
+            metrics.inc("cost_units_total", call_usage.cost_units)
+            if call_usage.total_tokens:
+                metrics.inc("llm_tokens_total", call_usage.total_tokens, labels={"source": "tool"})
 
             tool_call_record = ToolCallRecord(
                 step_id=step.step_id,
@@ -136,8 +173,13 @@ class Executor:
                 result=result_payload,
                 error=error_text,
                 raw_response=raw_response,
+                usage=call_usage,
+                from_cache=tool_ctx.from_cache,
             )
             trace.tool_calls.append(tool_call_record)
+            emit(run_ctx, RunEventType.TOOL_CALL, step.step_id, call=tool_call_record.model_dump(mode="json"))
+            if run_ctx.timeouts is not None:
+                run_ctx.timeouts.observe_call(tool_call_record)
             run_ctx.long_term_memory.save_tool_outcome(
                 trace_id=trace.trace_id,
                 step_id=step.step_id,
@@ -147,7 +189,8 @@ class Executor:
                 outcome=result_payload or {"error": error_text},
             )
 
-            if status == ToolCallStatus.SUCCESS and result_payload is not None:
+            partial_signal = run_ctx.monitors.detect_partial_failure(tool_call_record)
+            if status == ToolCallStatus.SUCCESS and result_payload is not None and partial_signal is None:
                 observation = {
                     "tool_name": step.tool_name,
                     "objective": step.objective,
@@ -156,7 +199,8 @@ class Executor:
                 stm.record_observation(step.step_id, observation)
                 self._update_state_for_success(stm, step.tool_name, result_payload)
                 final_output = self._build_final_output(stm)
-                trace.step_events.append(
+                self._append_step(
+                    run_ctx,
                     StepEvent(
                         step_id=step.step_id,
                         attempt=attempt,
@@ -169,7 +213,31 @@ class Executor:
                 step_index += 1
                 continue
 
-            signals = run_ctx.monitors.evaluate_tool_call(tool_call_record)
+            interrupted = self._interrupted(run_ctx)
+            if interrupted is not None:
+                # No retry or replan can finish in time (or is wanted); stop with the failed call recorded.
+                self._append_step(
+                    run_ctx,
+                    StepEvent(
+                        step_id=step.step_id,
+                        attempt=attempt,
+                        status=StepStatus.FAILED,
+                        message=f"Stopping: {interrupted.message}",
+                    )
+                )
+                trace.status = RunStatus.STOPPED
+                trace.stop_reason = interrupted
+                break
+
+            if partial_signal is not None:
+                # Keep the successful batch items visible; a retry only refetches the failed ones.
+                stm.record_observation(
+                    step.step_id,
+                    {"tool_name": step.tool_name, "objective": step.objective, "result": result_payload, "partial": True},
+                )
+                signals = [partial_signal]
+            else:
+                signals = run_ctx.monitors.evaluate_tool_call(tool_call_record)
             if not signals:
                 signals = [
                     FailureSignal(
@@ -191,11 +259,13 @@ class Executor:
                 signals.insert(0, non_progress_signal)
 
             trace.monitor_signals.extend(signals)
+            emit(run_ctx, RunEventType.FAILURE_SIGNAL, step.step_id, signals=[s.model_dump(mode="json") for s in signals])
             failure_signal = signals[0]
 
             if failure_signal.failure_type == FailureType.NON_PROGRESS:
                 metrics.inc("stop_rule_triggers_total", labels={"rule": "non_progress"})
-                trace.step_events.append(
+                self._append_step(
+                    run_ctx,
                     StepEvent(
                         step_id=step.step_id,
                         attempt=attempt,
@@ -210,7 +280,8 @@ class Executor:
 
             if attempt >= plan.max_retries_per_step and failure_signal.retryable:
                 metrics.inc("stop_rule_triggers_total", labels={"rule": "max_retries"})
-                trace.step_events.append(
+                self._append_step(
+                    run_ctx,
                     StepEvent(
                         step_id=step.step_id,
                         attempt=attempt,
@@ -223,6 +294,7 @@ class Executor:
                 trace.stop_reason = StopReason(type=StopReasonType.MAX_RETRIES, message="max_retries_per_step reached")
                 break
 
+            budget_remaining = guard.remaining(trace.usage)
             decision = run_ctx.refinement.decide(
                 step=step,
                 failure_signal=failure_signal,
@@ -233,6 +305,7 @@ class Executor:
                 planner=run_ctx.planner,
                 remaining_steps=steps[step_index:],
                 scratchpad={"failure_context": failure_signal.model_dump()},
+                budget_remaining=budget_remaining,
             )
             metrics.inc("refinement_actions_total", labels={"action": decision.action.value})
             stm.record_refinement(
@@ -244,7 +317,9 @@ class Executor:
                 }
             )
             trace.refinements.append(decision)
-            trace.step_events.append(
+            emit(run_ctx, RunEventType.REFINEMENT, step.step_id, attempt=attempt, decision=decision.model_dump(mode="json"))
+            self._append_step(
+                run_ctx,
                 StepEvent(
                     step_id=step.step_id,
                     attempt=attempt,
@@ -259,13 +334,22 @@ class Executor:
                 trace.status = RunStatus.REFINING
                 if decision.patched_args:
                     step.tool_args.update(decision.patched_args)
+                    if checkpoints is not None:
+                        checkpoints.steps_changed()
                 stm.mark_retry(step.step_id)
                 continue
 
             if decision.action == RefinementActionType.REPLAN_REMAINING:
                 trace.status = RunStatus.REFINING
                 if decision.replanned_steps:
-                    steps = steps[:step_index] + [PlanStep.model_validate(s.model_dump()) for s in decision.replanned_steps]
+                    # Only rebuilt steps are new to this run; reused ones were validated with the original plan.
+                    rebuilt = decision.rebuilt_step_ids
+                    steps = steps[:step_index] + [
+                        PlanStep.model_validate(s.model_dump()) if rebuilt is None or s.step_id in rebuilt else s
+                        for s in decision.replanned_steps
+                    ]
+                    if checkpoints is not None:
+                        checkpoints.steps_changed()
                     # Avoid immediate retry counter carryover for new plan step IDs, but preserve if same ID.
                     continue
                 trace.status = RunStatus.FAILED
@@ -273,7 +357,8 @@ class Executor:
                 break
 
             if decision.action == RefinementActionType.SKIP_STEP:
-                trace.step_events.append(
+                self._append_step(
+                    run_ctx,
                     StepEvent(
                         step_id=step.step_id,
                         attempt=attempt,
@@ -285,7 +370,10 @@ class Executor:
                 continue
 
             # Abort
-            if failure_signal.failure_type == FailureType.POLICY_VIOLATION:
+            if self._budget_exhausted(guard, trace.usage, reserve=guard.cost_per_step):
+                trace.status = RunStatus.STOPPED
+                trace.stop_reason = StopReason(type=StopReasonType.BUDGET_GUARD, message=decision.reason)
+            elif failure_signal.failure_type == FailureType.POLICY_VIOLATION:
                 trace.status = RunStatus.STOPPED
                 trace.stop_reason = StopReason(type=StopReasonType.POLICY_BLOCKED, message=failure_signal.message)
             else:
@@ -293,6 +381,9 @@ class Executor:
                 trace.stop_reason = StopReason(type=StopReasonType.FAILED, message=failure_signal.message)
             break
 
+        if checkpoints is not None:
+            checkpoints.step(steps, step_index, completed_steps, stm, trace)
+
         if trace.status == RunStatus.EXECUTING:
             # Completed all steps normally.
             final_output = self._build_final_output(stm)
@@ -316,6 +407,7 @@ class Executor:
             "runs_completed_total" if trace.status == RunStatus.COMPLETED else "runs_failed_total",
             labels={"status": trace.status.value},
         )
+        emit(run_ctx, RunEventType.STOP, status=trace.status.value, stop_reason=trace.stop_reason.model_dump(mode="json"))
         return ExecutionResult(
             status=trace.status,
             final_output=trace.final_output,
@@ -323,6 +415,28 @@ class Executor:
             completed_steps=completed_steps,
         )
 
+    @staticmethod
+    def _append_step(run_ctx: RunContext, event: StepEvent) -> None:
+        run_ctx.trace.step_events.append(event)
+        emit(run_ctx, RunEventType.STEP, event.step_id, event=event.model_dump(mode="json"))
+
+    @staticmethod
+    def _interrupted(run_ctx: RunContext) -> StopReason | None:
+        if run_ctx.deadline is None:
+            return None
+        reason = run_ctx.deadline.stop_reason()
+        if reason is not None:
+            run_ctx.metrics.inc("stop_rule_triggers_total", labels={"rule": reason.type.value})
+        return reason
+
+    @staticmethod
+    def _budget_exhausted(guard: BudgetGuard, usage: ResourceUsage, reserve: int = 0) -> str | None:
+        if usage.cost_units + reserve > guard.max_cost_units or usage.cost_units >= guard.max_cost_units:
+            return f"Budget guard exceeded: {usage.cost_units}/{guard.max_cost_units} cost units used"
+        if guard.max_tokens is not None and usage.total_tokens >= guard.max_tokens:
+            return f"Token budget exhausted: {usage.total_tokens}/{guard.max_tokens} tokens used"
+        return None
+
     def _build_final_output(self, stm: Any) -> dict[str, Any]:
         return {
             "message": "Execution finished",
@@ -335,7 +449,7 @@ class Executor:
     def _update_state_for_success(self, stm: Any, tool_name: str, result_payload: dict[str, Any]) -> None:
         stm.state["last_tool"] = tool_name
         stm.state["last_result"] = result_payload
-        if tool_name in {"http_get", "http_post"}:
+        if tool_name in {"http_get", "http_post", "http_get_many"}:
             stm.state["http result captured"] = True
         elif tool_name == "db_query":
             stm.state["db result captured"] = True
@@ -30,7 +30,7 @@ class Monitors:
                     severity=Severity.MEDIUM,
                     message=record.error or "Tool timeout",
                     recommended_action="increase_timeout_and_retry",
-                    diagnostics={"tool_name": record.tool_name},
+                    diagnostics={"tool_name": record.tool_name, **self._carried(record)},
                 )
             )
         elif record.status == ToolCallStatus.SCHEMA_ERROR:
@@ -55,6 +55,17 @@ class Monitors:
                     diagnostics={"tool_name": record.tool_name},
                 )
             )
+        elif isinstance(record.raw_response, dict) and record.raw_response.get("failure_type") == FailureType.BUDGET_EXCEEDED.value:
+            signals.append(
+                FailureSignal(
+                    failure_type=FailureType.BUDGET_EXCEEDED,
+                    retryable=False,
+                    severity=Severity.HIGH,
+                    message=record.error or "Tool budget exceeded",
+                    recommended_action="narrow_query_or_abort",
+                    diagnostics={"tool_name": record.tool_name, **record.raw_response.get("diagnostics", {})},
+                )
+            )
         else:
             signals.append(
                 FailureSignal(
@@ -63,11 +74,34 @@ class Monitors:
                     severity=Severity.MEDIUM,
                     message=record.error or "Tool error",
                     recommended_action="retry_or_replan",
-                    diagnostics={"tool_name": record.tool_name},
+                    diagnostics={"tool_name": record.tool_name, **self._carried(record)},
                 )
             )
         return signals
 
+    @staticmethod
+    def _carried(record: ToolCallRecord) -> dict[str, Any]:
+        # A batch where every item failed raises, so its failed_indices arrive in the raw diagnostics.
+        diagnostics = record.raw_response.get("diagnostics", {}) if isinstance(record.raw_response, dict) else {}
+        return {"failed_indices": list(diagnostics["failed_indices"])} if diagnostics.get("failed_indices") else {}
+
+    def detect_partial_failure(self, record: ToolCallRecord) -> FailureSignal | None:
+        if record.status != ToolCallStatus.SUCCESS or not isinstance(record.result, dict):
+            return None
+        failed = record.result.get("failed_indices") or []
+        if not failed:
+            return None
+        items = {item.get("index"): item for item in record.result.get("items", [])}
+        all_timeouts = all((items.get(i) or {}).get("failure_type") == FailureType.TIMEOUT.value for i in failed)
+        return FailureSignal(
+            failure_type=FailureType.TIMEOUT if all_timeouts else FailureType.TOOL_ERROR,
+            retryable=True,
+            severity=Severity.LOW,
+            message=f"{len(failed)} of {len(items)} batch items failed",
+            recommended_action="retry_failed_items",
+            diagnostics={"tool_name": record.tool_name, "failed_indices": list(failed)},
+        )
+
     def detect_non_progress(self, signature_count: int, threshold: int, tool_name: str, step_id: str) -> FailureSignal | None:
         if signature_count > threshold:
             return FailureSignal(
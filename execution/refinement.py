@@ -6,6 +6,9 @@ from core.types import FailureSignal, PerceptionResult, PlanStep, RefinementActi
 
 
 class RefinementEngine:
+    def __init__(self, timeouts: Any = None) -> None:
+        self.timeouts = timeouts
+
     def decide(
         self,
         step: PlanStep,
@@ -17,38 +20,53 @@ class RefinementEngine:
         planner: Any = None,
         remaining_steps: list[PlanStep] | None = None,
         scratchpad: dict[str, Any] | None = None,
+        budget_remaining: dict[str, Any] | None = None,
     ) -> RefinementDecision:
         remaining_steps = remaining_steps or []
         scratchpad = scratchpad or {}
+        budget_remaining = budget_remaining or {}
 
         if failure_signal.failure_type.value == "non_progress":
             return RefinementDecision(action=RefinementActionType.ABORT, reason="Non-progress threshold exceeded")
 
+        cost_left = budget_remaining.get("cost_units")
+        tokens_left = budget_remaining.get("tokens")
+        if (cost_left is not None and cost_left < budget_remaining.get("retry_cost", 1)) or (
+            tokens_left is not None and tokens_left <= 0
+        ):
+            if "skip" in step.fallback_strategy:
+                return RefinementDecision(action=RefinementActionType.SKIP_STEP, reason="Budget too low to retry; skipping")
+            return RefinementDecision(action=RefinementActionType.ABORT, reason="Remaining budget cannot cover another attempt")
+
         prefers_replan = "replan" in step.fallback_strategy or "alternate" in step.fallback_strategy
         if (
             planner is not None
             and failure_signal.failure_type.value in {"schema_error", "bad_response"}
             and prefers_replan
         ):
-            replan_scratchpad = dict(scratchpad)
-            replan_scratchpad["failure_context"] = {
-                "failure_type": failure_signal.failure_type.value,
-                "step_id": step.step_id,
-                "tool_name": step.tool_name,
-            }
-            replanned_steps = planner.replan_remaining(perception, remaining_steps, tool_catalog, scratchpad=replan_scratchpad)
-            if replanned_steps:
-                return RefinementDecision(
-                    action=RefinementActionType.REPLAN_REMAINING,
-                    replanned_steps=replanned_steps,
-                    reason=f"Replanned remaining steps after {failure_signal.failure_type.value}",
-                )
+            decision = self._replan(planner, step, failure_signal, perception, tool_catalog, remaining_steps, scratchpad)
+            if decision is not None:
+                return decision
 
         if failure_signal.retryable and attempt < max_retries_per_step:
             patched_args: dict[str, Any] = {}
-            if failure_signal.failure_type.value == "timeout" and step.tool_name in {"http_get", "http_post"}:
+            if failure_signal.diagnostics.get("failed_indices") and step.tool_name == "http_get_many":
+                failed = list(failure_signal.diagnostics["failed_indices"])
+                patched_args["only_indices"] = failed
+                if failure_signal.failure_type.value == "timeout":
+                    # Items carry their own timeout_s, which wins over the batch default, so both are raised.
+                    default = float(step.tool_args.get("timeout_s", 2.0))
+                    patched_args["timeout_s"] = self._retry_timeout("http_get_many", "", default)
+                    requests = [dict(item) for item in step.tool_args.get("requests") or []]
+                    for index in failed:
+                        if index < len(requests):
+                            item = requests[index]
+                            current = float(item.get("timeout_s") or default)
+                            item["timeout_s"] = self._retry_timeout("http_get_many", str(item.get("url", "")), current)
+                    patched_args["requests"] = requests
+            elif failure_signal.failure_type.value == "timeout" and step.tool_name in {"http_get", "http_post"}:
                 current = float(step.tool_args.get("timeout_s", 2.0))
-                patched_args["timeout_s"] = min(current * 2, 10.0)
+                patched_args["timeout_s"] = self._retry_timeout(step.tool_name, str(step.tool_args.get("url", "")), current)
             elif failure_signal.failure_type.value == "schema_error" and step.tool_name == "http_get":
                 if not prefers_replan:
                     patched_args["allow_malformed"] = True
@@ -71,20 +89,46 @@ class RefinementEngine:
             and (prefers_replan or failure_signal.failure_type.value == "schema_error")
         )
         if can_replan:
-            replan_scratchpad = dict(scratchpad)
-            replan_scratchpad["failure_context"] = {
-                "failure_type": failure_signal.failure_type.value,
-                "step_id": step.step_id,
-                "tool_name": step.tool_name,
-            }
-            replanned_steps = planner.replan_remaining(perception, remaining_steps, tool_catalog, scratchpad=replan_scratchpad)
-            if replanned_steps:
-                return RefinementDecision(
-                    action=RefinementActionType.REPLAN_REMAINING,
-                    replanned_steps=replanned_steps,
-                    reason=f"Replanned remaining steps after {failure_signal.failure_type.value}",
-                )
+            decision = self._replan(planner, step, failure_signal, perception, tool_catalog, remaining_steps, scratchpad)
+            if decision is not None:
+                return decision
 
         if "skip" in step.fallback_strategy:
             return RefinementDecision(action=RefinementActionType.SKIP_STEP, reason="Fallback strategy permits skip")
         return RefinementDecision(action=RefinementActionType.ABORT, reason="No safe refinement action available")
+
+    def _retry_timeout(self, tool_name: str, url: str, current: float) -> float:
+        if self.timeouts is not None:
+            return self.timeouts.retry_timeout(tool_name, url, current)
+        return min(current * 2, 10.0)
+
+    @staticmethod
+    def _replan(
+        planner: Any,
+        step: PlanStep,
+        failure_signal: FailureSignal,
+        perception: PerceptionResult,
+        tool_catalog: list[ToolCatalogEntry],
+        remaining_steps: list[PlanStep],
+        scratchpad: dict[str, Any],
+    ) -> RefinementDecision | None:
+        replan_scratchpad = dict(scratchpad)
+        replan_scratchpad["failure_context"] = {
+            "failure_type": failure_signal.failure_type.value,
+            "step_id": step.step_id,
+            "tool_name": step.tool_name,
+        }
+        reason = f"Replanned remaining steps after {failure_signal.failure_type.value}"
+        # remaining_steps starts at the failed step itself.
+        after = remaining_steps[1:] if remaining_steps and remaining_steps[0] is step else remaining_steps
+        delta = planner.replan_suffix(perception, step, after, tool_catalog, scratchpad=replan_scratchpad)
+        if not delta.steps:
+            return None
+        if delta.notes:
+            reason += ": " + "; ".join(dict.fromkeys(delta.notes))
+        return RefinementDecision(
+            action=RefinementActionType.REPLAN_REMAINING,
+            replanned_steps=delta.steps,
+            rebuilt_step_ids=delta.rebuilt_step_ids,
+            reason=reason,
+        )
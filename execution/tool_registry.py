@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 from dataclasses import dataclass
+from threading import Lock
 from typing import Any, Callable
 
 from pydantic import BaseModel
 
+from core.deadline import check_deadline
 from core.types import ToolCatalogEntry
+from execution.cassette import ToolCassette, cassette_key
+from llm.provider import uses_heuristic_provider
 
 
 @dataclass
@@ -17,14 +22,34 @@ class ToolSpec:
     handler: Callable[[BaseModel, Any], BaseModel]
     safe_by_default: bool = True
     tags: list[str] | None = None
+    idempotent: bool = True
+    cacheable: bool = False
+    pure: bool = False
+    memoize_if: Callable[[BaseModel], bool] | None = None
+    # Config-dependent determinism (e.g. summarize is only deterministic with the heuristic provider); it gates
+    # both the memo and run-cache reuse.
+    deterministic_if: Callable[[Any], bool] | None = None
 
 
 class ToolRegistry:
-    def __init__(self) -> None:
+    def __init__(self, memo_max_entries: int = 256) -> None:
         self._tools: dict[str, ToolSpec] = {}
+        self.version = 0
+        self.cassette: ToolCassette | None = None
+        self.memo_max_entries = memo_max_entries
+        self._memo: dict[str, OrderedDict[str, dict[str, Any]]] = {}
+        self._memo_stats: dict[str, dict[str, int]] = {}
+        self._memo_lock = Lock()
 
     def register(self, spec: ToolSpec) -> None:
         self._tools[spec.name] = spec
+        self.version += 1
+
+    def is_cacheable(self, name: str, config: Any = None) -> bool:
+        spec = self._tools.get(name)
+        if spec is None or not spec.cacheable:
+            return False
+        return spec.deterministic_if is None or config is None or spec.deterministic_if(config)
 
     def has_tool(self, name: str) -> bool:
         return name in self._tools
@@ -35,10 +60,78 @@ class ToolRegistry:
     def validate_args(self, name: str, args: dict[str, Any]) -> BaseModel:
         return self.get(name).args_model.model_validate(args or {})
 
-    def execute(self, name: str, args: dict[str, Any], ctx: Any) -> BaseModel:
+    def use_cassette(self, cassette: ToolCassette | None) -> None:
+        self.cassette = cassette
+
+    def _memoizable(self, spec: ToolSpec, args_model: BaseModel, ctx: Any) -> bool:
+        # A cassette must see every call it records or replays, so memoization steps aside while one is active.
+        if not spec.pure or self.memo_max_entries <= 0 or self.cassette is not None:
+            return False
+        if spec.deterministic_if is not None and not spec.deterministic_if(ctx.config):
+            return False
+        return spec.memoize_if is None or spec.memoize_if(args_model)
+
+    def _memo_get(self, name: str, key: str, ctx: Any) -> dict[str, Any] | None:
+        with self._memo_lock:
+            entries = self._memo.get(name)
+            hit = entries.get(key) if entries is not None else None
+            if hit is not None:
+                entries.move_to_end(key)
+            stats = self._memo_stats.setdefault(name, {"hits": 0, "misses": 0})
+            stats["hits" if hit is not None else "misses"] += 1
+        metrics = getattr(ctx, "metrics", None)
+        if metrics is not None:
+            metrics.inc("tool_memo_total", labels={"tool": name, "result": "hit" if hit is not None else "miss"})
+        return hit
+
+    def _memo_put(self, name: str, key: str, result: BaseModel) -> None:
+        with self._memo_lock:
+            entries = self._memo.setdefault(name, OrderedDict())
+            entries[key] = result.model_dump()
+            entries.move_to_end(key)
+            while len(entries) > self.memo_max_entries:
+                entries.popitem(last=False)
+
+    def memo_stats(self) -> dict[str, dict[str, int]]:
+        with self._memo_lock:
+            return {
+                name: {**stats, "entries": len(self._memo.get(name, ()))} for name, stats in sorted(self._memo_stats.items())
+            }
+
+    def clear_memo(self, name: str | None = None) -> None:
+        with self._memo_lock:
+            if name is None:
+                self._memo.clear()
+            else:
+                self._memo.pop(name, None)
+
+    def invoke(self, name: str, args_model: BaseModel, ctx: Any) -> BaseModel:
         spec = self.get(name)
-        args_model = spec.args_model.model_validate(args or {})
-        return spec.handler(args_model, ctx)
+        check_deadline(ctx, f"tool {name}")
+        reuse = getattr(ctx, "reuse", None)
+        key = cassette_key(name, args_model.model_dump()) if (reuse and spec.cacheable) or spec.pure else None
+        if reuse and spec.cacheable:
+            # Results carried over from a cached run with the same goal; only exact argument matches count.
+            prior = reuse.get(key)
+            if prior is not None:
+                ctx.from_cache = True
+                return spec.result_model.model_validate(prior)
+        memoize = self._memoizable(spec, args_model, ctx)
+        if memoize:
+            hit = self._memo_get(name, key, ctx)
+            if hit is not None:
+                ctx.from_cache = True
+                return spec.result_model.model_validate(hit)
+        if self.cassette is None:
+            result = spec.handler(args_model, ctx)
+        else:
+            result = self.cassette.invoke(spec.name, spec.result_model, spec.handler, args_model, ctx)
+        if memoize and getattr(result, "ok", True):
+            self._memo_put(name, key, result)
+        return result
+
+    def execute(self, name: str, args: dict[str, Any], ctx: Any) -> BaseModel:
+        return self.invoke(name, self.validate_args(name, args), ctx)
 
     def catalog(self) -> list[ToolCatalogEntry]:
         out: list[ToolCatalogEntry] = []
@@ -63,6 +156,8 @@ class ToolRegistry:
             FileWriteArgs,
             FileWriteResult,
             HTTPGetArgs,
+            HTTPGetManyArgs,
+            HTTPGetManyResult,
             HTTPPostArgs,
             HTTPResult,
             SummarizeArgs,
@@ -72,6 +167,7 @@ class ToolRegistry:
             calc_tool,
             db_query_tool,
             file_write_tool,
+            http_get_many_tool,
             http_get_tool,
             http_post_tool,
             summarize_tool,
@@ -88,6 +184,17 @@ class ToolRegistry:
                 ["http", "read"],
             )
         )
+        self.register(
+            ToolSpec(
+                "http_get_many",
+                "Concurrent batch HTTP GET against allowlisted hosts",
+                HTTPGetManyArgs,
+                HTTPGetManyResult,
+                http_get_many_tool,
+                True,
+                ["http", "read", "batch"],
+            )
+        )
         self.register(
             ToolSpec(
                 "http_post",
@@ -97,6 +204,7 @@ class ToolRegistry:
                 http_post_tool,
                 True,
                 ["http", "write"],
+                idempotent=False,
             )
         )
         self.register(
@@ -108,6 +216,7 @@ class ToolRegistry:
                 db_query_tool,
                 True,
                 ["db", "read"],
+                cacheable=True,
             )
         )
         self.register(
@@ -122,7 +231,17 @@ class ToolRegistry:
             )
         )
         self.register(
-            ToolSpec("calc", "Safe arithmetic evaluator", CalcArgs, CalcResult, calc_tool, True, ["math"])
+            ToolSpec(
+                "calc",
+                "Safe arithmetic evaluator",
+                CalcArgs,
+                CalcResult,
+                calc_tool,
+                True,
+                ["math"],
+                cacheable=True,
+                pure=True,
+            )
         )
         self.register(
             ToolSpec(
@@ -133,6 +252,12 @@ class ToolRegistry:
                 summarize_tool,
                 True,
                 ["llm", "text"],
+                cacheable=True,
+                pure=True,
+                # An empty text summarizes the run state instead of the arguments.
+                memoize_if=lambda args: bool(args.text),
+                # Only the heuristic summarizer is deterministic; an LLM summary must not be frozen across runs.
+                deterministic_if=uses_heuristic_provider,
             )
         )
 
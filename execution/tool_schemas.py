@@ -12,6 +12,23 @@ class HTTPGetArgs(BaseModel):
     timeout_s: float = 2.0
     expect_json: bool = True
     allow_malformed: bool = False
+    max_body_bytes: int | None = Field(default=None, gt=0)
+
+
+class HTTPGetManyItem(BaseModel):
+    url: str
+    params: dict[str, Any] = Field(default_factory=dict)
+    headers: dict[str, str] = Field(default_factory=dict)
+    timeout_s: float | None = None
+    expect_json: bool = True
+
+
+class HTTPGetManyArgs(BaseModel):
+    requests: list[HTTPGetManyItem] = Field(min_length=1, max_length=100)
+    timeout_s: float = 2.0
+    max_concurrency: int = Field(default=8, ge=1, le=32)
+    max_body_bytes: int | None = Field(default=None, gt=0)
+    only_indices: list[int] | None = None
 
 
 class HTTPPostArgs(BaseModel):
@@ -21,13 +38,17 @@ class HTTPPostArgs(BaseModel):
     timeout_s: float = 2.0
     expect_json: bool = True
     idempotency_key: str | None = None
+    max_body_bytes: int | None = Field(default=None, gt=0)
 
 
 class DBQueryArgs(BaseModel):
     sql: str
     params: list[Any] = Field(default_factory=list)
     readonly: bool = True
-    limit: int | None = None
+    limit: int | None = Field(default=None, ge=1)
+    cursor: str | None = None
+    keyset_column: str | None = None
+    format: Literal["rows", "columns"] = "rows"
 
 
 class FileWriteArgs(BaseModel):
@@ -39,6 +60,8 @@ class FileWriteArgs(BaseModel):
 
 class CalcArgs(BaseModel):
     expression: str
+    bindings: dict[str, float | int] = Field(default_factory=dict)
+    batch: dict[str, list[float | int]] | None = None
 
     @field_validator("expression", mode="before")
     @classmethod
@@ -47,6 +70,18 @@ class CalcArgs(BaseModel):
             raise TypeError("expression must be a string")
         return value
 
+    @field_validator("batch")
+    @classmethod
+    def check_batch(cls, value: dict[str, list[float | int]] | None) -> dict[str, list[float | int]] | None:
+        if value is None:
+            return value
+        lengths = {len(column) for column in value.values()}
+        if len(lengths) > 1:
+            raise ValueError("batch columns must have equal length")
+        if lengths and lengths.pop() > 10_000:
+            raise ValueError("batch is limited to 10000 rows")
+        return value
+
 
 class SummarizeArgs(BaseModel):
     text: str
@@ -64,12 +99,36 @@ class HTTPResult(ToolResultBase):
     status_code: int = 200
     headers: dict[str, str] = Field(default_factory=dict)
     body: Any = None
+    body_ref: dict[str, Any] | None = None
     malformed: bool = False
 
 
+class HTTPGetManyItemResult(BaseModel):
+    index: int
+    url: str
+    ok: bool
+    status_code: int | None = None
+    body: Any = None
+    body_ref: dict[str, Any] | None = None
+    error: str | None = None
+    failure_type: str | None = None
+    latency_ms: int = 0
+
+
+class HTTPGetManyResult(ToolResultBase):
+    items: list[HTTPGetManyItemResult] = Field(default_factory=list)
+    succeeded: int = 0
+    failed_indices: list[int] = Field(default_factory=list)
+
+
 class DBQueryResult(ToolResultBase):
     rows: list[dict[str, Any]] = Field(default_factory=list)
     row_count: int = 0
+    columns: list[str] = Field(default_factory=list)
+    column_values: list[list[Any]] | None = None
+    has_more: bool = False
+    truncated_by: str | None = None
+    next_cursor: str | None = None
 
 
 class FileWriteResult(ToolResultBase):
@@ -78,7 +137,8 @@ class FileWriteResult(ToolResultBase):
 
 
 class CalcResult(ToolResultBase):
-    result: float | int
+    result: float | int | None = None
+    results: list[float | int] | None = None
 
 
 class SummarizeResult(ToolResultBase):
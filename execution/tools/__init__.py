@@ -1,6 +1,7 @@
 from .calc_tool import calc_tool
 from .db_query_tool import db_query_tool
 from .file_write_tool import file_write_tool
+from .http_get_many_tool import http_get_many_tool
 from .http_get_tool import http_get_tool
 from .http_post_tool import http_post_tool
 from .summarize_tool import summarize_tool
@@ -1,31 +1,138 @@
 from __future__ import annotations
 
+import base64
+import hashlib
+import json
+import re
 from typing import Any
 
-from core.exceptions import ToolExecutionError
-from core.types import FailureType
+from core.deadline import clamp_timeout
+from core.exceptions import QueryBudgetExceeded, ToolExecutionError
+from core.types import FailureType, charge_usage
 from execution.tool_schemas import DBQueryArgs, DBQueryResult
+from memory.sqlite_pool import QueryBudget
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _query_fingerprint(args: DBQueryArgs) -> str:
+    key = json.dumps({"sql": " ".join(args.sql.split()), "params": args.params, "keyset": args.keyset_column}, default=str)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def _encode_cursor(payload: dict[str, Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload, default=str).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(args: DBQueryArgs) -> dict[str, Any]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(args.cursor.encode("ascii")))
+    except Exception as exc:
+        raise ToolExecutionError("db_query cursor is malformed", failure_type=FailureType.TOOL_ERROR) from exc
+    if payload.get("q") != _query_fingerprint(args):
+        raise ToolExecutionError(
+            "db_query cursor does not belong to this query",
+            failure_type=FailureType.TOOL_ERROR,
+            diagnostics={"sql": args.sql},
+        )
+    return payload
+
+
+def _paged_statement(args: DBQueryArgs, cursor: dict[str, Any] | None, page_size: int) -> tuple[str, list[Any]]:
+    # Pagination wraps the query as a subquery, so it only applies to SELECT/WITH statements.
+    sql = args.sql.strip().rstrip(";")
+    params = list(args.params)
+    if args.keyset_column:
+        if cursor is None:
+            return f"SELECT * FROM ({sql}) ORDER BY {args.keyset_column} LIMIT ?", [*params, page_size + 1]
+        # >= plus an offset past the rows already returned at that key, so ties that straddle a page are not skipped.
+        return (
+            f"SELECT * FROM ({sql}) WHERE {args.keyset_column} >= ? ORDER BY {args.keyset_column} LIMIT ? OFFSET ?",
+            [*params, cursor["after"], page_size + 1, int(cursor.get("skip", 0))],
+        )
+    offset = int(cursor["offset"]) if cursor else 0
+    return f"SELECT * FROM ({sql}) LIMIT ? OFFSET ?", [*params, page_size + 1, offset]
 
 
 def db_query_tool(args: DBQueryArgs, ctx: Any) -> DBQueryResult:
     long_term = getattr(ctx, "long_term_memory", None)
     if long_term is None:
         raise ToolExecutionError("Long-term memory DB is not available", failure_type=FailureType.TOOL_ERROR)
+    if args.keyset_column and not _IDENTIFIER.match(args.keyset_column):
+        raise ToolExecutionError(
+            "db_query keyset_column must be a plain column name",
+            failure_type=FailureType.POLICY_VIOLATION,
+            diagnostics={"keyset_column": args.keyset_column},
+        )
+    config = ctx.config
+    max_rows = int(getattr(config, "db_query_max_rows", 1000))
+    page_size = min(args.limit or max_rows, max_rows)
+    budget = QueryBudget(
+        timeout_s=clamp_timeout(ctx, getattr(config, "db_query_timeout_s", None)),
+        max_vm_steps=getattr(config, "db_query_max_vm_steps", None),
+        max_rows=max_rows,
+        max_bytes=getattr(config, "db_query_max_bytes", None),
+    )
+    pageable = args.sql.lstrip().lower().startswith(("select", "with"))
+    cursor = _decode_cursor(args) if args.cursor and pageable else None
+    sql, params = (args.sql, list(args.params))
+    if pageable and (cursor is not None or args.keyset_column):
+        sql, params = _paged_statement(args, cursor, page_size)
     try:
-        rows = long_term.query(args.sql, args.params)
+        page = long_term.query_page(sql, params, max_rows=args.limit, budget=budget, readonly=args.readonly)
+    except QueryBudgetExceeded as exc:
+        raise ToolExecutionError(
+            f"db_query cut off: {exc}",
+            failure_type=FailureType.BUDGET_EXCEEDED,
+            diagnostics={"sql": args.sql, "budget": exc.budget, **exc.diagnostics},
+        ) from exc
     except Exception as exc:
         raise ToolExecutionError(
             f"db_query failed: {exc}",
             failure_type=FailureType.TOOL_ERROR,
             diagnostics={"sql": args.sql},
         ) from exc
-    if args.limit is not None:
-        rows = rows[: args.limit]
-    return DBQueryResult(
+    metrics = getattr(ctx, "metrics", None)
+    if metrics is not None and args.readonly:
+        metrics.inc("db_query_cache_total", labels={"result": "hit" if page.from_cache else "miss"})
+    columns, rows, has_more = page.columns, page.rows, page.has_more
+    charge_usage(ctx, rows_scanned=0 if page.from_cache else len(rows), bytes_transferred=page.bytes_read)
+
+    next_cursor = None
+    if has_more and pageable and rows:
+        if args.keyset_column:
+            if args.keyset_column not in columns:
+                raise ToolExecutionError(
+                    "db_query keyset_column is not in the result set",
+                    failure_type=FailureType.TOOL_ERROR,
+                    diagnostics={"keyset_column": args.keyset_column, "columns": columns},
+                )
+            index = columns.index(args.keyset_column)
+            after = rows[-1][index]
+            skip = 0
+            for row in reversed(rows):
+                if row[index] != after:
+                    break
+                skip += 1
+            if skip == len(rows) and cursor is not None and cursor.get("after") == after:
+                skip += int(cursor.get("skip", 0))
+            state = {"after": after, "skip": skip}
+        else:
+            state = {"offset": (int(cursor["offset"]) if cursor else 0) + len(rows)}
+        next_cursor = _encode_cursor({"q": _query_fingerprint(args), **state})
+
+    result = DBQueryResult(
         ok=True,
         message="db_query completed",
-        data={"sql": args.sql},
-        rows=rows,
+        data={"sql": args.sql, "cached": page.from_cache, "tables": list(page.tables)},
+        columns=columns,
         row_count=len(rows),
+        has_more=has_more,
+        truncated_by=page.truncated_by,
+        next_cursor=next_cursor,
     )
-
+    if args.format == "columns":
+        result.column_values = [list(col) for col in zip(*rows)] if rows else [[] for _ in columns]
+    else:
+        result.rows = [dict(zip(columns, row)) for row in rows]
+    return result
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+_PREVIEW_BYTES = 256
+
+
+@dataclass
+class CapturedBody:
+    content: bytes | None
+    size: int
+    spill: dict[str, Any] | None = None
+
+    def text(self) -> str:
+        return (self.content or b"").decode("utf-8", errors="replace")
+
+    def parse_json(self) -> Any:
+        return json.loads(self.content or b"")
+
+
+def spill_dir(config: Any) -> Path:
+    return Path(getattr(config, "file_workspace_root")) / ".http_spill"
+
+
+def spill_path(ctx: Any, suffix: str = "") -> Path:
+    return spill_dir(ctx.config) / f"{ctx.run_id}_{ctx.step_id}_{ctx.attempt}{suffix}.body"
+
+
+def prune_spills(config: Any, run_id: str, now: float | None = None) -> int:
+    # Spills outlive their run by the retention window so trace body_refs stay readable for a while.
+    root = spill_dir(config)
+    if not root.is_dir():
+        return 0
+    retention = float(getattr(config, "http_spill_retention_s", 3600.0))
+    cutoff = (time.time() if now is None else now) - retention
+    removed = 0
+    for path in root.glob("*.body"):
+        try:
+            expired = path.name.startswith(f"{run_id}_") if retention <= 0 else path.stat().st_mtime < cutoff
+            if expired:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            continue
+    return removed
+
+
+def read_capped_body(resp: httpx.Response, max_bytes: int, target: Path) -> CapturedBody:
+    # Streams the body; once it grows past max_bytes the buffered prefix and the
+    # remainder are written to target so only a reference handle stays in memory.
+    buffer = bytearray()
+    digest = hashlib.sha256()
+    size = 0
+    preview = b""
+    spill_file = None
+    try:
+        for chunk in resp.iter_bytes():
+            if not chunk:
+                continue
+            size += len(chunk)
+            digest.update(chunk)
+            if spill_file is None and size > max_bytes:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                spill_file = target.open("wb")
+                preview = bytes(buffer[:_PREVIEW_BYTES]) or chunk[:_PREVIEW_BYTES]
+                spill_file.write(buffer)
+                buffer = bytearray()
+            if spill_file is not None:
+                spill_file.write(chunk)
+            else:
+                buffer.extend(chunk)
+    finally:
+        if spill_file is not None:
+            spill_file.close()
+    if spill_file is None:
+        return CapturedBody(content=bytes(buffer), size=size)
+    return CapturedBody(
+        content=None,
+        size=size,
+        spill={
+            "path": str(target),
+            "bytes": size,
+            "sha256": digest.hexdigest(),
+            "content_type": resp.headers.get("content-type", ""),
+            "preview": preview.decode("utf-8", errors="replace"),
+        },
+    )
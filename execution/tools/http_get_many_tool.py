@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import httpx
+
+from core.deadline import check_deadline, clamp_timeout
+from core.exceptions import RunInterruptedError, ToolExecutionError
+from core.types import FailureType, charge_usage
+from execution.tool_schemas import HTTPGetManyArgs, HTTPGetManyItem, HTTPGetManyItemResult, HTTPGetManyResult
+
+from .http_body import read_capped_body, spill_path
+from .http_pool import shared_http_client
+
+
+def _fetch_one(client: httpx.Client, index: int, item: HTTPGetManyItem, args: HTTPGetManyArgs, ctx: Any) -> HTTPGetManyItemResult:
+    timeout = clamp_timeout(ctx, float(item.timeout_s or args.timeout_s or getattr(ctx.config, "default_http_timeout_s", 2.0)))
+    max_bytes = int(args.max_body_bytes or getattr(ctx.config, "http_max_body_bytes", 1_048_576))
+    started = time.perf_counter()
+    out = HTTPGetManyItemResult(index=index, url=item.url, ok=False)
+    try:
+        check_deadline(ctx, f"http_get_many item {index}")
+        with client.stream("GET", item.url, params=item.params or None, headers=item.headers or None, timeout=timeout) as resp:
+            captured = read_capped_body(resp, max_bytes, spill_path(ctx, suffix=f"_{index}"))
+        charge_usage(ctx, bytes_transferred=captured.size)
+    except RunInterruptedError as exc:
+        out.failure_type = exc.failure_type.value
+        out.error = str(exc)
+    except httpx.TimeoutException:
+        out.failure_type = FailureType.TIMEOUT.value
+        out.error = f"timeout after {timeout}s"
+    except httpx.HTTPError as exc:
+        out.failure_type = FailureType.TOOL_ERROR.value
+        out.error = f"transport error: {exc}"
+    else:
+        out.status_code = resp.status_code
+        out.body_ref = captured.spill
+        if captured.spill is None:
+            if item.expect_json:
+                try:
+                    out.body = captured.parse_json()
+                except ValueError:
+                    out.failure_type = FailureType.SCHEMA_ERROR.value
+                    out.error = "expected JSON but got malformed body"
+            else:
+                out.body = captured.text()
+        if resp.status_code >= 500:
+            out.failure_type = FailureType.TOOL_ERROR.value
+            out.error = f"server error status={resp.status_code}"
+        out.ok = out.failure_type is None
+    out.latency_ms = int((time.perf_counter() - started) * 1000)
+    return out
+
+
+def _prior_successes(args: HTTPGetManyArgs, ctx: Any) -> dict[int, HTTPGetManyItemResult]:
+    # Retries restricted to only_indices reuse the items that already succeeded in this step.
+    stm = getattr(ctx, "short_term_memory", None)
+    if args.only_indices is None or stm is None:
+        return {}
+    prior = (stm.step_outputs.get(ctx.step_id) or {}).get("result") or {}
+    items = [HTTPGetManyItemResult.model_validate(i) for i in prior.get("items", [])]
+    return {i.index: i for i in items if i.ok and i.index < len(args.requests) and args.requests[i.index].url == i.url}
+
+
+def http_get_many_tool(args: HTTPGetManyArgs, ctx: Any) -> HTTPGetManyResult:
+    reused = _prior_successes(args, ctx)
+    wanted = set(range(len(args.requests))) if args.only_indices is None else set(args.only_indices)
+    pending = [(i, item) for i, item in enumerate(args.requests) if i in wanted or i not in reused]
+    fan_out = max(1, min(args.max_concurrency, int(getattr(ctx.config, "http_batch_max_concurrency", 8)), len(pending) or 1))
+    client = shared_http_client(ctx.config)
+    with ThreadPoolExecutor(max_workers=fan_out, thread_name_prefix="http_get_many") as pool:
+        fetched = list(pool.map(lambda p: _fetch_one(client, p[0], p[1], args, ctx), pending))
+
+    by_index = {**reused, **{item.index: item for item in fetched}}
+    items = [by_index[i] for i in sorted(by_index)]
+    failed = [item.index for item in items if not item.ok]
+    if failed and len(failed) == len(items):
+        all_timeouts = all(item.failure_type == FailureType.TIMEOUT.value for item in items)
+        raise ToolExecutionError(
+            f"http_get_many: all {len(items)} requests failed",
+            failure_type=FailureType.TIMEOUT if all_timeouts else FailureType.TOOL_ERROR,
+            diagnostics={"failed_indices": failed, "errors": {item.index: item.error for item in items}},
+        )
+    return HTTPGetManyResult(
+        ok=True,
+        message="http_get_many completed" if not failed else f"http_get_many completed with {len(failed)}/{len(items)} failures",
+        data={"urls": [item.url for item in args.requests], "reused": sorted(reused)},
+        items=items,
+        succeeded=len(items) - len(failed),
+        failed_indices=failed,
+    )
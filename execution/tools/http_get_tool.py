@@ -4,16 +4,22 @@ from typing import Any
 
 import httpx
 
+from core.deadline import clamp_timeout
 from core.exceptions import ToolExecutionError
-from core.types import FailureType
+from core.types import FailureType, charge_usage
 from execution.tool_schemas import HTTPGetArgs, HTTPResult
 
+from .http_body import read_capped_body, spill_path
+
 
 def http_get_tool(args: HTTPGetArgs, ctx: Any) -> HTTPResult:
-    timeout = float(args.timeout_s or getattr(ctx.config, "default_http_timeout_s", 2.0))
+    timeout = clamp_timeout(ctx, float(args.timeout_s or getattr(ctx.config, "default_http_timeout_s", 2.0)))
+    max_bytes = int(args.max_body_bytes or getattr(ctx.config, "http_max_body_bytes", 1_048_576))
     try:
         with httpx.Client(timeout=timeout) as client:
-            resp = client.get(args.url, params=args.params or None, headers=args.headers or None)
+            with client.stream("GET", args.url, params=args.params or None, headers=args.headers or None) as resp:
+                captured = read_capped_body(resp, max_bytes, spill_path(ctx))
+        charge_usage(ctx, bytes_transferred=captured.size)
     except httpx.TimeoutException as exc:
         raise ToolExecutionError(
             f"http_get timeout for {args.url}",
@@ -28,38 +34,40 @@ def http_get_tool(args: HTTPGetArgs, ctx: Any) -> HTTPResult:
         ) from exc
 
     headers = {k.lower(): v for k, v in resp.headers.items()}
-    body: Any
+    body: Any = None
     malformed = False
-    if args.expect_json:
-        try:
-            body = resp.json()
-        except Exception as exc:
-            if args.allow_malformed:
-                body = resp.text
-                malformed = True
-            else:
-                raise ToolExecutionError(
-                    f"http_get expected JSON but got malformed body from {args.url}",
-                    failure_type=FailureType.SCHEMA_ERROR,
-                    diagnostics={"url": args.url, "status_code": resp.status_code},
-                ) from exc
-    else:
-        body = resp.text
+    if captured.spill is None:
+        if args.expect_json:
+            try:
+                body = captured.parse_json()
+            except Exception as exc:
+                if args.allow_malformed:
+                    body = captured.text()
+                    malformed = True
+                else:
+                    raise ToolExecutionError(
+                        f"http_get expected JSON but got malformed body from {args.url}",
+                        failure_type=FailureType.SCHEMA_ERROR,
+                        diagnostics={"url": args.url, "status_code": resp.status_code},
+                    ) from exc
+        else:
+            body = captured.text()
 
     if resp.status_code >= 500:
+        preview = body if isinstance(body, dict) else str(body if captured.spill is None else captured.spill["preview"])[:200]
         raise ToolExecutionError(
             f"http_get server error status={resp.status_code}",
             failure_type=FailureType.TOOL_ERROR,
-            diagnostics={"url": args.url, "status_code": resp.status_code, "body": body if isinstance(body, dict) else str(body)[:200]},
+            diagnostics={"url": args.url, "status_code": resp.status_code, "body": preview},
         )
 
     return HTTPResult(
         ok=True,
-        message="http_get completed",
-        data={"url": args.url},
+        message="http_get completed" if captured.spill is None else "http_get completed; body spilled to workspace",
+        data={"url": args.url, "body_bytes": captured.size},
         status_code=resp.status_code,
         headers=headers,
         body=body,
+        body_ref=captured.spill,
         malformed=malformed,
     )
-
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from threading import Lock
+from typing import Any
+
+import httpx
+
+_LOCK = Lock()
+_CLIENT: httpx.Client | None = None
+
+
+def shared_http_client(config: Any) -> httpx.Client:
+    global _CLIENT
+    with _LOCK:
+        if _CLIENT is None or _CLIENT.is_closed:
+            max_connections = int(getattr(config, "http_pool_max_connections", 20))
+            _CLIENT = httpx.Client(
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+                timeout=float(getattr(config, "default_http_timeout_s", 2.0)),
+            )
+        return _CLIENT
+
+
+def close_shared_http_client() -> None:
+    global _CLIENT
+    with _LOCK:
+        if _CLIENT is not None:
+            _CLIENT.close()
+            _CLIENT = None
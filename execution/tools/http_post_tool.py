@@ -4,19 +4,25 @@ from typing import Any
 
 import httpx
 
+from core.deadline import clamp_timeout
 from core.exceptions import ToolExecutionError
-from core.types import FailureType
+from core.types import FailureType, charge_usage
 from execution.tool_schemas import HTTPPostArgs, HTTPResult
 
+from .http_body import read_capped_body, spill_path
+
 
 def http_post_tool(args: HTTPPostArgs, ctx: Any) -> HTTPResult:
-    timeout = float(args.timeout_s or getattr(ctx.config, "default_http_timeout_s", 2.0))
+    timeout = clamp_timeout(ctx, float(args.timeout_s or getattr(ctx.config, "default_http_timeout_s", 2.0)))
+    max_bytes = int(args.max_body_bytes or getattr(ctx.config, "http_max_body_bytes", 1_048_576))
     headers = dict(args.headers or {})
     if args.idempotency_key:
         headers.setdefault("Idempotency-Key", args.idempotency_key)
     try:
         with httpx.Client(timeout=timeout) as client:
-            resp = client.post(args.url, json=args.json_body or {}, headers=headers or None)
+            with client.stream("POST", args.url, json=args.json_body or {}, headers=headers or None) as resp:
+                captured = read_capped_body(resp, max_bytes, spill_path(ctx))
+        charge_usage(ctx, bytes_transferred=captured.size)
     except httpx.TimeoutException as exc:
         raise ToolExecutionError(
             f"http_post timeout for {args.url}",
@@ -31,19 +37,20 @@ def http_post_tool(args: HTTPPostArgs, ctx: Any) -> HTTPResult:
         ) from exc
 
     normalized_headers = {k.lower(): v for k, v in resp.headers.items()}
-    body: Any
+    body: Any = None
     malformed = False
-    if args.expect_json:
-        try:
-            body = resp.json()
-        except Exception as exc:
-            raise ToolExecutionError(
-                f"http_post expected JSON but got malformed body from {args.url}",
-                failure_type=FailureType.SCHEMA_ERROR,
-                diagnostics={"url": args.url, "status_code": resp.status_code},
-            ) from exc
-    else:
-        body = resp.text
+    if captured.spill is None:
+        if args.expect_json:
+            try:
+                body = captured.parse_json()
+            except Exception as exc:
+                raise ToolExecutionError(
+                    f"http_post expected JSON but got malformed body from {args.url}",
+                    failure_type=FailureType.SCHEMA_ERROR,
+                    diagnostics={"url": args.url, "status_code": resp.status_code},
+                ) from exc
+        else:
+            body = captured.text()
 
     if resp.status_code >= 500:
         raise ToolExecutionError(
@@ -54,11 +61,12 @@ def http_post_tool(args: HTTPPostArgs, ctx: Any) -> HTTPResult:
 
     return HTTPResult(
         ok=True,
-        message="http_post completed",
-        data={"url": args.url},
+        message="http_post completed" if captured.spill is None else "http_post completed; body spilled to workspace",
+        data={"url": args.url, "body_bytes": captured.size},
         status_code=resp.status_code,
         headers=normalized_headers,
         body=body,
+        body_ref=captured.spill,
         malformed=malformed,
     )
 
@@ -5,14 +5,28 @@ from typing import Any
 
 from execution.tool_schemas import SummarizeArgs, SummarizeResult
 from llm.provider import get_provider
+from llm.summarization import summarize_text
 
 
 def summarize_tool(args: SummarizeArgs, ctx: Any) -> SummarizeResult:
-    provider = get_provider(ctx.config)
+    provider = get_provider(
+        ctx.config,
+        metrics=getattr(ctx, "metrics", None),
+        long_term_memory=getattr(ctx, "long_term_memory", None),
+        usage=getattr(ctx, "usage", None),
+    )
     text = args.text
     if not text and getattr(ctx, "short_term_memory", None):
         text = json.dumps(ctx.short_term_memory.state, sort_keys=True, default=str)
-    summary = provider.generate_text(text, text=text, max_sentences=args.max_sentences)
+    config = ctx.config
+    summary = summarize_text(
+        provider,
+        text,
+        args.max_sentences,
+        chunk_chars=config.summarize_chunk_chars,
+        max_workers=config.summarize_max_workers,
+        chunk_max_tokens=config.summarize_chunk_max_tokens,
+    )
     if args.style == "bullet":
         pieces = [p.strip() for p in summary.split(".") if p.strip()]
         summary = "\n".join(f"- {p}" for p in pieces[: args.max_sentences])
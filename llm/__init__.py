@@ -1,2 +1,5 @@
+from .cache import LLMResponseCache, get_llm_cache
 from .provider import LLMProvider, get_provider
+from .scheduler import LLMScheduler, get_llm_scheduler
 
+from .summarization import summarize_text
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any
+
+
+@dataclass
+class CachedCompletion:
+    text: str
+    total_tokens: int
+    expires_at: float
+
+
+def completion_key(model: str, messages: list[dict[str, Any]], temperature: float, schema: dict[str, Any] | None, max_tokens: int | None) -> str:
+    payload = {"model": model, "messages": messages, "temperature": temperature, "schema": schema, "max_tokens": max_tokens}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    def __init__(self, ttl_s: float, max_entries: int = 512, long_term_memory: Any | None = None) -> None:
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.long_term_memory = long_term_memory
+        self._entries: OrderedDict[str, CachedCompletion] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> CachedCompletion | None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self._entries.move_to_end(key)
+                    return entry
+                del self._entries[key]
+        if self.long_term_memory is None:
+            return None
+        row = self.long_term_memory.get_llm_cache(key, now)
+        if row is None:
+            return None
+        entry = CachedCompletion(text=row["response_text"], total_tokens=int(row["total_tokens"]), expires_at=float(row["expires_at"]))
+        self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, model: str, text: str, total_tokens: int) -> None:
+        entry = CachedCompletion(text=text, total_tokens=total_tokens, expires_at=time.time() + self.ttl_s)
+        self._remember(key, entry)
+        if self.long_term_memory is not None:
+            self.long_term_memory.save_llm_cache(key, model, text, total_tokens, entry.expires_at)
+
+    def _remember(self, key: str, entry: CachedCompletion) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_CACHES: dict[tuple[float, int, str | None], LLMResponseCache] = {}
+_CACHES_LOCK = Lock()
+
+
+def get_llm_cache(ttl_s: float, max_entries: int, long_term_memory: Any | None = None) -> LLMResponseCache:
+    # One memory tier per backing database so short-lived providers (one per summarize call) still share hits.
+    sqlite_path = str(getattr(long_term_memory, "sqlite_path", "")) or None
+    key = (ttl_s, max_entries, sqlite_path)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(key)
+        if cache is None:
+            cache = _CACHES[key] = LLMResponseCache(ttl_s, max_entries=max_entries, long_term_memory=long_term_memory)
+        return cache
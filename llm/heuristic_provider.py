@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-import re
+from itertools import islice
 from typing import Any, Type
 
 from pydantic import BaseModel
@@ -9,18 +9,19 @@ from core.config import Config
 from core.types import PerceptionResult, Plan
 
 from .provider import LLMProvider
+from .summarization import iter_sentences
 
 
 class HeuristicProvider(LLMProvider):
+    extractive = True
+
     def __init__(self, config: Config) -> None:
         self.config = config
 
     def generate_text(self, prompt: str, **kwargs: Any) -> str:
         text = kwargs.get("text") or prompt
         max_sentences = int(kwargs.get("max_sentences", 3))
-        sentences = re.split(r"(?<=[.!?])\s+", str(text).strip())
-        sentences = [s for s in sentences if s]
-        return " ".join(sentences[:max_sentences]) if sentences else ""
+        return " ".join(islice(iter_sentences(str(text)), max(max_sentences, 0)))
 
     def generate_structured(self, prompt: str, schema: Type[BaseModel], **kwargs: Any) -> BaseModel:
         if schema is PerceptionResult:
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+
+class JsonObjectScanner:
+    # Tracks brace depth outside of string literals so a streamed object can be cut off as soon as it closes.
+    def __init__(self) -> None:
+        self._buf: list[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.text: str | None = None
+
+    @property
+    def done(self) -> bool:
+        return self.text is not None
+
+    def feed(self, chunk: str) -> bool:
+        if self.text is not None:
+            return True
+        for ch in chunk:
+            if self._depth == 0:
+                if ch != "{":
+                    continue
+                self._buf = []
+            self._buf.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.text = "".join(self._buf)
+                    return True
+        return False
+
+
+def first_json_object(text: str) -> str | None:
+    scanner = JsonObjectScanner()
+    scanner.feed(text)
+    return scanner.text
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+from threading import Lock
 from typing import Any, Type
 
 import httpx
@@ -8,36 +9,189 @@ from pydantic import BaseModel
 
 from core.config import Config
 
+from .cache import LLMResponseCache, completion_key
+from .json_stream import JsonObjectScanner, first_json_object
 from .provider import LLMProvider
+from .scheduler import LLMScheduler
+
+# Events read after a structured object closes, looking for the usage chunk.
+_USAGE_TAIL_EVENTS = 4
+
+_CLIENTS: dict[str, httpx.Client] = {}
+_CLIENTS_LOCK = Lock()
+
+
+def shared_llm_client(config: Config) -> httpx.Client:
+    base_url = str(config.openai_base_url).rstrip("/")
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(base_url)
+        if client is None or client.is_closed:
+            limits = httpx.Limits(
+                max_connections=config.llm_pool_max_connections,
+                max_keepalive_connections=config.llm_pool_max_connections,
+            )
+            client = _CLIENTS[base_url] = httpx.Client(limits=limits, timeout=30)
+        return client
+
+
+def close_shared_llm_clients() -> None:
+    with _CLIENTS_LOCK:
+        for client in _CLIENTS.values():
+            client.close()
+        _CLIENTS.clear()
 
 
 class OpenAICompatibleProvider(LLMProvider):
-    def __init__(self, config: Config) -> None:
+    def __init__(
+        self,
+        config: Config,
+        cache: LLMResponseCache | None = None,
+        metrics: Any | None = None,
+        client: httpx.Client | None = None,
+        scheduler: LLMScheduler | None = None,
+        usage: Any | None = None,
+    ) -> None:
         self.config = config
+        self.cache = cache
+        self.metrics = metrics
+        self.scheduler = scheduler
+        self.usage = usage
         if not config.openai_base_url or not config.openai_api_key:
             raise ValueError("OpenAI-compatible provider requires base URL and API key")
+        self.client = client or shared_llm_client(config)
 
-    def generate_text(self, prompt: str, **kwargs: Any) -> str:
-        payload = {
+    @staticmethod
+    def _parse(text: str, schema: Type[BaseModel] | None) -> Any:
+        if schema is None:
+            return text
+        try:
+            return schema.model_validate_json(text)
+        except Exception:
+            candidate = first_json_object(text)
+            if candidate is None or candidate == text:
+                raise
+            return schema.model_validate_json(candidate)
+
+    def _complete(self, prompt: str, schema: Type[BaseModel] | None, **kwargs: Any) -> Any:
+        messages = [{"role": "user", "content": prompt}]
+        temperature = kwargs.get("temperature", 0)
+        max_tokens = int(kwargs["max_tokens"]) if kwargs.get("max_tokens") else None
+        json_schema = schema.model_json_schema() if schema is not None else None
+        key = completion_key(self.config.openai_model, messages, temperature, json_schema, max_tokens) if temperature == 0 else None
+        # Only deterministic completions are cacheable.
+        if self.cache is not None and key is not None:
+            hit = self.cache.get(key)
+            if self.metrics is not None:
+                self.metrics.inc("llm_cache_total", labels={"result": "hit" if hit else "miss"})
+            if hit is not None:
+                if self.metrics is not None:
+                    self.metrics.inc("llm_cache_saved_tokens_total", hit.total_tokens)
+                return self._parse(hit.text, schema)
+
+        payload: dict[str, Any] = {
             "model": self.config.openai_model,
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": kwargs.get("temperature", 0),
+            "messages": messages,
+            "temperature": temperature,
         }
+        if max_tokens:
+            payload["max_tokens"] = max_tokens
+        if schema is not None:
+            payload["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": schema.__name__, "schema": json_schema},
+            }
         url = self.config.openai_base_url.rstrip("/") + "/chat/completions"
         headers = {"Authorization": f"Bearer {self.config.openai_api_key}"}
-        with httpx.Client(timeout=kwargs.get("timeout", 30)) as client:
-            resp = client.post(url, json=payload, headers=headers)
+        timeout = kwargs.get("timeout", 30)
+
+        def request() -> tuple[tuple[str, dict[str, Any], bool], int]:
+            if self.config.llm_stream:
+                result = self._stream(url, payload, headers, timeout, stop_on_object=schema is not None)
+            else:
+                resp = self.client.post(url, json=payload, headers=headers, timeout=timeout)
+                resp.raise_for_status()
+                body = resp.json()
+                choice = body["choices"][0]
+                result = (choice["message"]["content"], body.get("usage") or {}, choice.get("finish_reason") != "length")
+            return result, int(result[1].get("total_tokens") or 0)
+
+        if self.scheduler is not None:
+            estimated = len(prompt) // 4 + (max_tokens or self.config.llm_default_completion_tokens)
+            (text, reported, complete), shared = self.scheduler.submit_shared(
+                request,
+                priority=kwargs.get("priority", self.config.llm_priority),
+                estimated_tokens=estimated,
+                coalesce_key=key,
+            )
+        else:
+            (text, reported, complete), _ = request()
+            shared = False
+        if shared:
+            # A coalesced follower: the leader already charged usage and wrote the cache for this call.
+            return self._parse(text, schema)
+        if not reported.get("total_tokens"):
+            # Servers that omit usage (or streams cut short) are charged a chars/4 estimate.
+            reported = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(text) // 4}
+            reported["total_tokens"] = reported["prompt_tokens"] + reported["completion_tokens"]
+        if self.usage is not None:
+            self.usage.charge(
+                prompt_tokens=reported.get("prompt_tokens") or 0,
+                completion_tokens=reported.get("completion_tokens") or 0,
+            )
+        value = self._parse(text, schema)
+        # Truncated or invalid output would otherwise be replayed for the whole TTL.
+        if self.cache is not None and key is not None and complete:
+            self.cache.put(key, self.config.openai_model, text, int(reported.get("total_tokens") or 0))
+        return value
+
+    def _stream(
+        self,
+        url: str,
+        payload: dict[str, Any],
+        headers: dict[str, str],
+        timeout: float,
+        stop_on_object: bool,
+    ) -> tuple[str, dict[str, Any], bool]:
+        parts: list[str] = []
+        usage: dict[str, Any] = {}
+        scanner = JsonObjectScanner() if stop_on_object else None
+        closed: str | None = None
+        tail = 0
+        done = False
+        finish_reason = None
+        body = {**payload, "stream": True, "stream_options": {"include_usage": True}}
+        with self.client.stream("POST", url, json=body, headers=headers, timeout=timeout) as resp:
             resp.raise_for_status()
-            return resp.json()["choices"][0]["message"]["content"]
+            for line in resp.iter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    done = True
+                    break
+                event = json.loads(data)
+                usage = event.get("usage") or usage
+                if closed is None:
+                    for choice in event.get("choices") or []:
+                        finish_reason = choice.get("finish_reason") or finish_reason
+                        piece = (choice.get("delta") or {}).get("content") or ""
+                        parts.append(piece)
+                        if scanner is not None and scanner.feed(piece):
+                            closed = scanner.text
+                            break
+                if closed is not None:
+                    # The usage chunk follows the finish chunk, so a short tail picks it up. Past that, leaving
+                    # the context closes the response and the server stops generating.
+                    tail += 1
+                    if usage or tail > _USAGE_TAIL_EVENTS:
+                        break
+        if closed is not None:
+            return closed, usage, True
+        # Without [DONE] the stream was cut short; with finish_reason "length" the model was.
+        return "".join(parts), usage, done and finish_reason != "length"
 
-    def generate_structured(self, prompt: str, schema: Type[BaseModel], **kwargs: Any) -> BaseModel:
-        text = self.generate_text(prompt, **kwargs)
-        try:
-            return schema.model_validate_json(text)
-        except Exception:
-            start = text.find("{")
-            end = text.rfind("}")
-            if start != -1 and end != -1 and end > start:
-                return schema.model_validate(json.loads(text[start : end + 1]))
-            raise
+    def generate_text(self, prompt: str, **kwargs: Any) -> str:
+        return self._complete(prompt, None, **kwargs)
 
+    def generate_structured(self, prompt: str, schema: Type[BaseModel], **kwargs: Any) -> BaseModel:
+        return self._complete(prompt, schema, **kwargs)
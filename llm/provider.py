@@ -9,6 +9,8 @@ from core.config import Config
 
 
 class LLMProvider(ABC):
+    extractive: bool = False
+
     @abstractmethod
     def generate_text(self, prompt: str, **kwargs: Any) -> str:
         raise NotImplementedError
@@ -18,12 +20,32 @@ class LLMProvider(ABC):
         raise NotImplementedError
 
 
-def get_provider(config: Config) -> LLMProvider:
-    if config.no_llm_mode or not config.openai_api_key:
+def uses_heuristic_provider(config: Config) -> bool:
+    return bool(config.no_llm_mode or not config.openai_api_key)
+
+
+def get_provider(
+    config: Config,
+    metrics: Any | None = None,
+    long_term_memory: Any | None = None,
+    usage: Any | None = None,
+) -> LLMProvider:
+    if uses_heuristic_provider(config):
         from .heuristic_provider import HeuristicProvider
 
         return HeuristicProvider(config=config)
+    from .cache import get_llm_cache
     from .openai_compatible import OpenAICompatibleProvider
-
-    return OpenAICompatibleProvider(config=config)
+    from .scheduler import get_llm_scheduler
+
+    cache = None
+    if config.llm_cache_enabled:
+        cache = get_llm_cache(config.llm_cache_ttl_s, config.llm_cache_max_entries, long_term_memory)
+    return OpenAICompatibleProvider(
+        config=config,
+        cache=cache,
+        metrics=metrics,
+        scheduler=get_llm_scheduler(config),
+        usage=usage,
+    )
 
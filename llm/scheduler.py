@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from threading import Condition, Lock
+from typing import Any, TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+PRIORITIES = {"interactive": 0, "batch": 10}
+
+
+def _retry_after_s(exc: httpx.HTTPStatusError, default: float) -> float:
+    value = exc.response.headers.get("retry-after")
+    try:
+        return max(0.0, float(value)) if value is not None else default
+    except ValueError:
+        return default
+
+
+class LLMScheduler:
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        tokens_per_minute: int = 0,
+        max_rate_limit_retries: int = 3,
+        default_retry_after_s: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.tokens_per_minute = tokens_per_minute
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.default_retry_after_s = default_retry_after_s
+        self._clock = clock
+        self._cond = Condition(Lock())
+        self._waiting: list[tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._tokens = float(tokens_per_minute)
+        self._refilled_at = clock()
+        self._paused_until = 0.0
+        self._coalesced: dict[str, Future[Any]] = {}
+        self.stats = {"admitted": 0, "coalesced": 0, "rate_limited": 0}
+
+    def _refill(self, now: float) -> None:
+        if self.tokens_per_minute <= 0:
+            return
+        self._tokens = min(float(self.tokens_per_minute), self._tokens + (now - self._refilled_at) * self.tokens_per_minute / 60.0)
+        self._refilled_at = now
+
+    def _wait_s(self, ticket: tuple[int, int], tokens: int) -> float | None:
+        # Returns None when the ticket may run now, otherwise how long to sleep before re-checking.
+        now = self._clock()
+        if self._waiting[0] != ticket or self._in_flight >= self.max_concurrency:
+            return 1.0
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self.tokens_per_minute > 0:
+            self._refill(now)
+            need = min(tokens, self.tokens_per_minute)
+            if self._tokens < need:
+                return (need - self._tokens) * 60.0 / self.tokens_per_minute
+            self._tokens -= need
+        return None
+
+    def _acquire(self, priority: int, tokens: int) -> None:
+        with self._cond:
+            ticket = (priority, next(self._seq))
+            heapq.heappush(self._waiting, ticket)
+            while (wait := self._wait_s(ticket, tokens)) is not None:
+                self._cond.wait(timeout=wait)
+            heapq.heappop(self._waiting)
+            self._in_flight += 1
+            self.stats["admitted"] += 1
+            self._cond.notify_all()
+
+    def _release(self, estimated: int, actual: int | None) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            if self.tokens_per_minute > 0 and actual:
+                # _acquire deducted at most one minute's worth, so that is what gets reconciled.
+                deducted = min(estimated, self.tokens_per_minute)
+                self._tokens = min(float(self.tokens_per_minute), self._tokens + deducted - actual)
+            self._cond.notify_all()
+
+    def _pause(self, seconds: float) -> None:
+        with self._cond:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+            self.stats["rate_limited"] += 1
+            self._cond.notify_all()
+
+    def _run(self, fn: Callable[[], tuple[T, int]], priority: int, estimated_tokens: int) -> T:
+        attempt = 0
+        while True:
+            self._acquire(priority, estimated_tokens)
+            actual: int | None = None
+            try:
+                value, actual = fn()
+                return value
+            except httpx.HTTPStatusError as exc:
+                if exc.response.status_code != 429 or attempt >= self.max_rate_limit_retries:
+                    raise
+                attempt += 1
+                # One 429 pauses every queued caller, rather than each retrying on its own.
+                self._pause(_retry_after_s(exc, self.default_retry_after_s))
+            finally:
+                self._release(estimated_tokens, actual)
+
+    def submit(
+        self,
+        fn: Callable[[], tuple[T, int]],
+        priority: str = "interactive",
+        estimated_tokens: int = 0,
+        coalesce_key: str | None = None,
+    ) -> T:
+        return self.submit_shared(fn, priority, estimated_tokens, coalesce_key)[0]
+
+    def submit_shared(
+        self,
+        fn: Callable[[], tuple[T, int]],
+        priority: str = "interactive",
+        estimated_tokens: int = 0,
+        coalesce_key: str | None = None,
+    ) -> tuple[T, bool]:
+        # The flag is True when the value came from another caller's in-flight request, which already
+        # accounted for it.
+        rank = PRIORITIES.get(priority, PRIORITIES["interactive"])
+        if coalesce_key is None:
+            return self._run(fn, rank, estimated_tokens), False
+        with self._cond:
+            leader = self._coalesced.get(coalesce_key)
+            if leader is None:
+                future: Future[Any] = Future()
+                self._coalesced[coalesce_key] = future
+            else:
+                self.stats["coalesced"] += 1
+        if leader is not None:
+            return leader.result(), True
+        try:
+            value = self._run(fn, rank, estimated_tokens)
+            future.set_result(value)
+            return value, False
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self._cond:
+                self._coalesced.pop(coalesce_key, None)
+
+
+_SCHEDULERS: dict[str, LLMScheduler] = {}
+_SCHEDULERS_LOCK = Lock()
+
+
+def get_llm_scheduler(config: Any) -> LLMScheduler:
+    base_url = str(config.openai_base_url or "").rstrip("/")
+    with _SCHEDULERS_LOCK:
+        scheduler = _SCHEDULERS.get(base_url)
+        if scheduler is None:
+            scheduler = _SCHEDULERS[base_url] = LLMScheduler(
+                max_concurrency=config.llm_max_concurrency,
+                tokens_per_minute=config.llm_tokens_per_minute,
+                max_rate_limit_retries=config.llm_max_rate_limit_retries,
+            )
+        return scheduler
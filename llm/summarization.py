@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+from .provider import LLMProvider
+
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+_REDUCE_DEPTH_LIMIT = 4
+
+
+def iter_sentences(text: str) -> Iterator[str]:
+    text = text.strip()
+    start = 0
+    for match in _SENTENCE_BREAK.finditer(text):
+        yield text[start : match.start()]
+        start = match.end()
+    if start < len(text):
+        yield text[start:]
+
+
+def iter_chunks(text: str, max_chars: int) -> Iterator[str]:
+    # Prefer cutting on a sentence break, then on whitespace, so chunks rarely split a sentence.
+    start = 0
+    size = len(text)
+    while start < size:
+        end = start + max_chars
+        if end >= size:
+            yield text[start:]
+            return
+        cut = -1
+        for match in _SENTENCE_BREAK.finditer(text, start, end + 1):
+            cut = match.end()
+        if cut <= start:
+            cut = text.rfind(" ", start, end) + 1
+        if cut <= start:
+            cut = end
+        yield text[start:cut]
+        start = cut
+
+
+def _extractive(provider: LLMProvider, text: str, max_sentences: int, chunk_chars: int) -> str:
+    picked: list[str] = []
+    for chunk in iter_chunks(text, chunk_chars):
+        partial = provider.generate_text(chunk, text=chunk, max_sentences=max_sentences - len(picked))
+        picked.extend(s for s in iter_sentences(partial) if s)
+        if len(picked) >= max_sentences:
+            break
+    return " ".join(picked[:max_sentences])
+
+
+def _prompt(text: str, max_sentences: int) -> str:
+    return f"Summarize the following in at most {max_sentences} sentences.\n\n{text}"
+
+
+def summarize_text(
+    provider: LLMProvider,
+    text: str,
+    max_sentences: int,
+    chunk_chars: int = 4000,
+    max_workers: int = 4,
+    chunk_max_tokens: int | None = None,
+) -> str:
+    if len(text) <= chunk_chars:
+        return provider.generate_text(text, text=text, max_sentences=max_sentences, max_tokens=chunk_max_tokens)
+    if provider.extractive:
+        return _extractive(provider, text, max_sentences, chunk_chars)
+
+    def summarize_chunk(chunk: str) -> str:
+        return provider.generate_text(
+            _prompt(chunk, max_sentences), text=chunk, max_sentences=max_sentences, max_tokens=chunk_max_tokens
+        )
+
+    layer = text
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="summarize") as pool:
+        for _ in range(_REDUCE_DEPTH_LIMIT):
+            partials = list(pool.map(summarize_chunk, iter_chunks(layer, chunk_chars)))
+            layer = "\n".join(p.strip() for p in partials if p.strip())
+            if len(layer) <= chunk_chars:
+                break
+    return provider.generate_text(
+        _prompt(layer, max_sentences), text=layer, max_sentences=max_sentences, max_tokens=chunk_max_tokens
+    )
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 import json
+from collections import OrderedDict
+from collections.abc import Callable
 from pathlib import Path
+from threading import Lock
 from typing import Any
 
 from core.config import Config, load_config
+from core.deadline import CancellationToken, Deadline
 from core.exceptions import PlanValidationError
 from core.logger import get_logger
 from core.metrics import MetricsRegistry
@@ -12,20 +16,31 @@ from core.tracing import new_run_id, new_trace_id, trace_export_path, utc_now_is
 from core.types import (
     PerceptionResult,
     Plan,
+    ResourceUsage,
+    RunCheckpoint,
     RunContext,
+    RunEvent,
+    RunEventType,
     RunStatus,
     RunTrace,
     StopReason,
     StopReasonType,
 )
+from execution.cassette import cassette_from_config, cassette_key
+from execution.events import EventBus
 from execution.executor import Executor
 from execution.monitors import Monitors
 from execution.refinement import RefinementEngine
 from execution.tool_registry import ToolRegistry
+from execution.tools.http_body import prune_spills
 from llm.provider import get_provider
+from memory.latency import AdaptiveTimeoutService
+from memory.checkpoints import RunCheckpointer, clear_checkpoints, load_checkpoint, restore_short_term
 from memory.long_term import LongTermMemory
+from memory.run_cache import RunCache, run_cache_from_config, run_cache_key
 from memory.short_term import ShortTermMemory
 from perception.agent import PerceptionAgent
+from planning.plan_cache import plan_cache_from_config
 from planning.plan_validator import validate_plan
 from planning.planner import PlannerAgent
 from planning.policy import PolicyEngine
@@ -42,75 +57,253 @@ def export_trace_json(trace: RunTrace, export_dir: Path, prefix: str = "trace")
     return path
 
 
-def run_orchestration(
-    raw_goal: str,
-    context: dict[str, Any] | None = None,
-    config_overrides: dict[str, Any] | None = None,
-    export_trace: bool = True,
-    trace_prefix: str = "trace",
-) -> tuple[RunTrace, Config]:
-    config = load_config(config_overrides)
-    metrics = MetricsRegistry()
-    trace_id = new_trace_id()
-    run_id = new_run_id()
-    logger = get_logger(config, component="maoo", trace_id=trace_id, run_id=run_id)
-    logger.info("run_start", "Starting orchestration run", raw_goal=raw_goal)
-
-    root = _project_root()
-    long_term = LongTermMemory(
-        sqlite_path=config.sqlite_path,
-        schema_path=root / "sql" / "schema.sql",
-        seed_path=root / "sql" / "seed_data.sql",
-    )
-    llm_provider = get_provider(config)
-    perception_agent = PerceptionAgent(llm_provider, long_term_memory=long_term)
-    planner = PlannerAgent(config, long_term_memory=long_term)
-    policy = PolicyEngine(config)
-    registry = ToolRegistry()
-    registry.register_defaults()
-    monitors = Monitors()
-    refinement = RefinementEngine()
-    executor = Executor()
-
-    trace = RunTrace(
-        trace_id=trace_id,
-        run_id=run_id,
-        request={"raw_goal": raw_goal, "context": context or {}},
-        status=RunStatus.RECEIVED,
-    )
+class OrchestrationEngine:
+    # Long-lived components for one Config; a worker keeps one warm and reuses it across runs.
+    def __init__(self, config: Config) -> None:
+        self.config = config
+        root = _project_root()
+        self.long_term = LongTermMemory(
+            sqlite_path=config.sqlite_path,
+            schema_path=root / "sql" / "schema.sql",
+            seed_path=root / "sql" / "seed_data.sql",
+            read_pool_size=config.db_read_pool_size,
+            query_cache_entries=config.db_query_cache_max_entries,
+            query_cache_bytes=config.db_query_cache_max_bytes,
+        )
+        # Replayed latencies are not real observations, so replay runs neither learn nor apply adaptive timeouts.
+        adaptive = config.adaptive_timeouts and config.tool_replay_mode != "replay"
+        self.timeouts = AdaptiveTimeoutService(config, self.long_term) if adaptive else None
+        self.planner = PlannerAgent(config, long_term_memory=self.long_term, timeouts=self.timeouts)
+        self.policy = PolicyEngine(config)
+        self.plan_cache = plan_cache_from_config(config)
+        self.registry = ToolRegistry(memo_max_entries=config.tool_memo_max_entries)
+        self.registry.register_defaults()
+        self.cassette = cassette_from_config(config)
+        self.run_cache = run_cache_from_config(config, self.long_term)
+        self.registry.use_cassette(self.cassette)
+        self.monitors = Monitors()
+        self.refinement = RefinementEngine(timeouts=self.timeouts)
+        self.executor = Executor()
 
-    try:
-        trace.status = RunStatus.PERCEIVED
-        perception: PerceptionResult = perception_agent.run(raw_goal, context)
-        trace.perception = perception
-        logger.info("perception_done", "Perception completed", perception=perception.model_dump())
+    def run(
+        self,
+        raw_goal: str,
+        context: dict[str, Any] | None = None,
+        export_trace: bool = True,
+        trace_prefix: str = "trace",
+        run_id: str | None = None,
+        trace_id: str | None = None,
+        on_start: Callable[[RunTrace], None] | None = None,
+        events: EventBus | None = None,
+        deadline_s: float | None = None,
+        cancel: CancellationToken | None = None,
+    ) -> RunTrace:
+        config = self.config
+        long_term = self.long_term
+        registry = self.registry
+        metrics = MetricsRegistry()
 
-        trace.status = RunStatus.PLANNED
-        plan: Plan = planner.build_plan(perception, registry.catalog(), scratchpad={})
-        trace.plan = plan
-        logger.info("planning_done", "Planning completed", plan_steps=len(plan.steps))
+        def cacheable(name: str) -> bool:
+            return registry.is_cacheable(name, config)
 
-        trace.status = RunStatus.VALIDATED
-        validated = validate_plan(plan, registry, policy)
-        trace.plan = validated.plan
-        if validated.warnings:
-            logger.warning("plan_warnings", "Plan validation warnings", warnings=validated.warnings)
+        trace_id = trace_id or new_trace_id()
+        run_id = run_id or new_run_id()
+        logger = get_logger(config, component="maoo", trace_id=trace_id, run_id=run_id)
+        logger.info("run_start", "Starting orchestration run", raw_goal=raw_goal)
+        cache = self.run_cache
+        cache_key = run_cache_key(raw_goal, context, config) if cache is not None else ""
+        cached = cache.get(cache_key) if cache is not None else None
+        prior = long_term.load_trace(cached["run_id"]) if cached else None
+        if prior is not None and cached["reusable"]:
+            metrics.inc("run_cache_total", labels={"result": "hit"})
+            trace = self._from_cached(prior, trace_id, run_id, raw_goal, context)
+            logger.info("run_cache_hit", "Returning cached run result", cached_from=prior.run_id)
+            if on_start is not None:
+                on_start(trace)
+            if events is not None:
+                events.emit(RunEventType.RUN_START, steps=len(trace.plan.steps) if trace.plan else 0, cached_from=prior.run_id)
+            return self._finish(trace, raw_goal, metrics, logger, events, export_trace, trace_prefix)
+        reuse = None
+        if prior is not None:
+            # Some steps were not deterministic: re-run, but serve the deterministic ones from the prior trace.
+            reuse = {
+                cassette_key(c.tool_name, c.validated_args): c.result
+                for c in RunCache.reusable_calls(prior, cacheable)
+            }
+        if cache is not None:
+            metrics.inc("run_cache_total", labels={"result": "partial" if reuse else "miss"})
+        # The clock starts here so perception and planning count against the caller's SLA too.
+        deadline = Deadline(config.run_deadline_s if deadline_s is None else deadline_s, token=cancel)
 
-        short_term = ShortTermMemory(initial_state=perception.initial_state)
+        trace = RunTrace(
+            trace_id=trace_id,
+            run_id=run_id,
+            request={"raw_goal": raw_goal, "context": context or {}},
+            status=RunStatus.RECEIVED,
+        )
+        if on_start is not None:
+            on_start(trace)
+        # Perception/planning LLM tokens are charged to the run; tools charge their own calls.
+        llm_provider = get_provider(config, metrics=metrics, long_term_memory=long_term, usage=trace.usage)
+        perception_agent = PerceptionAgent(llm_provider, long_term_memory=long_term)
+
+        try:
+            trace.status = RunStatus.PERCEIVED
+            perception: PerceptionResult = perception_agent.run(raw_goal, context)
+            trace.perception = perception
+            logger.info("perception_done", "Perception completed", perception=perception.model_dump())
+
+            trace.status = RunStatus.PLANNED
+            plan_cache = self.plan_cache
+            validated = plan_cache.lookup(perception, self.planner, registry, self.policy) if plan_cache else None
+            if plan_cache is not None:
+                metrics.inc("plan_cache_total", labels={"result": "hit" if validated is not None else "miss"})
+            if validated is None:
+                plan: Plan = self.planner.build_plan(perception, registry.catalog(), scratchpad={})
+                trace.plan = plan
+                logger.info("planning_done", "Planning completed", plan_steps=len(plan.steps))
+
+                trace.status = RunStatus.VALIDATED
+                validated = validate_plan(plan, registry, self.policy)
+                if plan_cache is not None:
+                    plan_cache.store(perception, validated.plan, self.planner, registry, self.policy)
+            else:
+                logger.info("planning_done", "Plan bound from template cache", plan_steps=len(validated.plan.steps))
+                trace.status = RunStatus.VALIDATED
+            trace.plan = validated.plan
+            if validated.warnings:
+                logger.warning("plan_warnings", "Plan validation warnings", warnings=validated.warnings)
+
+            short_term = ShortTermMemory(initial_state=perception.initial_state)
+            self._execute(trace, validated.plan, perception, short_term, metrics, logger, events, deadline, reuse=reuse)
+
+        except PlanValidationError as exc:
+            trace.status = RunStatus.FAILED
+            trace.stop_reason = StopReason(type=StopReasonType.VALIDATION_FAILED, message=str(exc))
+            trace.finished_at = utc_now_iso()
+            logger.error("plan_validation_error", "Plan validation failed", error=str(exc))
+        except Exception as exc:
+            trace.status = RunStatus.FAILED
+            trace.stop_reason = StopReason(type=StopReasonType.FAILED, message=str(exc))
+            trace.finished_at = utc_now_iso()
+            logger.error("run_exception", "Unhandled orchestration exception", error=str(exc))
+
+        trace = self._finish(trace, raw_goal, metrics, logger, events, export_trace, trace_prefix)
+        if cache is not None:
+            cache.put(cache_key, trace, cacheable)
+        return trace
+
+    def _from_cached(
+        self, prior: RunTrace, trace_id: str, run_id: str, raw_goal: str, context: dict[str, Any] | None
+    ) -> RunTrace:
+        trace = prior.model_copy(
+            deep=True,
+            update={
+                "trace_id": trace_id,
+                "run_id": run_id,
+                "request": {"raw_goal": raw_goal, "context": context or {}},
+                "usage": ResourceUsage(),
+                "started_at": utc_now_iso(),
+                "finished_at": None,
+            },
+        )
+        for call in trace.tool_calls:
+            call.from_cache = True
+        trace.final_output["meta"] = {"cached_from": prior.run_id}
+        return trace
+
+    def resume(
+        self,
+        run_id: str,
+        export_trace: bool = True,
+        trace_prefix: str = "resume",
+        on_start: Callable[[RunTrace], None] | None = None,
+        events: EventBus | None = None,
+        deadline_s: float | None = None,
+        cancel: CancellationToken | None = None,
+        reexecute_unsafe: bool = False,
+    ) -> RunTrace | None:
+        checkpoint = load_checkpoint(self.long_term, run_id)
+        if checkpoint is None:
+            # Either the run finished (its trace is stored) or it never reached execution.
+            return self.long_term.load_trace(run_id)
+        config = self.config
+        metrics = MetricsRegistry()
+        metrics.inc("runs_resumed_total")
+        logger = get_logger(config, component="maoo", trace_id=checkpoint.trace_id, run_id=run_id)
+        logger.info("run_resume", "Resuming orchestration run", step_index=checkpoint.step_index, checkpoint_seq=checkpoint.seq)
+        deadline = Deadline(config.run_deadline_s if deadline_s is None else deadline_s, token=cancel)
+        trace = RunTrace(
+            trace_id=checkpoint.trace_id,
+            run_id=run_id,
+            request=checkpoint.request,
+            status=RunStatus.EXECUTING,
+            perception=checkpoint.perception,
+            plan=checkpoint.plan,
+            step_events=checkpoint.step_events,
+            tool_calls=checkpoint.tool_calls,
+            monitor_signals=checkpoint.monitor_signals,
+            refinements=checkpoint.refinements,
+            usage=checkpoint.usage,
+            started_at=checkpoint.started_at,
+        )
+        if on_start is not None:
+            on_start(trace)
+        pending = checkpoint.pending_call
+        try:
+            if pending is not None and not reexecute_unsafe:
+                trace.status = RunStatus.FAILED
+                trace.stop_reason = StopReason(
+                    type=StopReasonType.FAILED,
+                    message=f"Step {pending['step_id']} ({pending['tool_name']}) is not idempotent and may already "
+                    "have been applied before the interruption; not re-executed",
+                )
+            else:
+                short_term = restore_short_term(checkpoint)
+                self._execute(
+                    trace, checkpoint.plan, checkpoint.perception, short_term, metrics, logger, events, deadline, checkpoint
+                )
+        except Exception as exc:
+            trace.status = RunStatus.FAILED
+            trace.stop_reason = StopReason(type=StopReasonType.FAILED, message=str(exc))
+            logger.error("run_exception", "Unhandled orchestration exception", error=str(exc))
+        return self._finish(trace, checkpoint.request.get("raw_goal", ""), metrics, logger, events, export_trace, trace_prefix)
+
+    def _execute(
+        self,
+        trace: RunTrace,
+        plan: Plan,
+        perception: PerceptionResult,
+        short_term: ShortTermMemory,
+        metrics: MetricsRegistry,
+        logger: Any,
+        events: EventBus | None,
+        deadline: Deadline,
+        resume: RunCheckpoint | None = None,
+        reuse: dict[str, Any] | None = None,
+    ) -> None:
+        checkpoints = RunCheckpointer(self.long_term, trace.run_id) if self.config.run_checkpoints else None
+        if checkpoints is not None and resume is not None:
+            checkpoints.resume_from(resume, short_term, trace)
         run_ctx = RunContext(
-            config=config,
+            config=self.config,
             logger=logger,
             metrics=metrics,
             trace=trace,
-            registry=registry,
-            policy=policy,
+            registry=self.registry,
+            policy=self.policy,
             short_term_memory=short_term,
-            long_term_memory=long_term,
-            planner=planner,
-            monitors=monitors,
-            refinement=refinement,
+            long_term_memory=self.long_term,
+            planner=self.planner,
+            monitors=self.monitors,
+            refinement=self.refinement,
+            timeouts=self.timeouts,
+            events=events,
+            deadline=deadline,
+            checkpoints=checkpoints,
+            reuse=reuse,
         )
-        _ = executor.run(validated.plan, perception, run_ctx)
+        self.executor.run(plan, perception, run_ctx, resume=resume)
 
         if trace.status in {RunStatus.COMPLETED, RunStatus.STOPPED, RunStatus.FAILED}:
             logger.info("run_done", "Run completed", status=trace.status.value, stop_reason=trace.stop_reason.type.value)
@@ -118,44 +311,126 @@ def run_orchestration(
             trace.status = RunStatus.FAILED
             trace.stop_reason = StopReason(type=StopReasonType.FAILED, message="Unexpected terminal state")
 
-    except PlanValidationError as exc:
-        trace.status = RunStatus.FAILED
-        trace.stop_reason = StopReason(type=StopReasonType.VALIDATION_FAILED, message=str(exc))
-        trace.finished_at = utc_now_iso()
-        logger.error("plan_validation_error", "Plan validation failed", error=str(exc))
-    except Exception as exc:
-        trace.status = RunStatus.FAILED
-        trace.stop_reason = StopReason(type=StopReasonType.FAILED, message=str(exc))
-        trace.finished_at = utc_now_iso()
-        logger.error("run_exception", "Unhandled orchestration exception", error=str(exc))
-
-    trace.metrics_snapshot = metrics.snapshot()
-    if not trace.finished_at:
-        trace.finished_at = utc_now_iso()
-
-    # Persist trace and store a compact memory entry for future retrieval.
-    try:
-        long_term.save_trace(trace)
-        long_term.add_memory_entry(
-            namespace="facts",
-            key=f"run:{trace.run_id}",
-            value_text=json.dumps(
-                {
-                    "request": raw_goal,
-                    "status": trace.status.value,
-                    "stop_reason": trace.stop_reason.type.value,
-                    "summary": trace.final_output.get("message", ""),
-                }
-            ),
-            metadata={"trace_id": trace.trace_id},
-        )
-    except Exception as exc:  # pragma: no cover - persistence failures should not mask primary result
-        logger.error("persist_error", "Failed to persist trace", error=str(exc))
+    def _finish(
+        self,
+        trace: RunTrace,
+        raw_goal: str,
+        metrics: MetricsRegistry,
+        logger: Any,
+        events: EventBus | None,
+        export_trace: bool,
+        trace_prefix: str,
+    ) -> RunTrace:
+        config = self.config
+        long_term = self.long_term
+        timeouts = self.timeouts
+        trace.metrics_snapshot = metrics.snapshot()
+        if not trace.finished_at:
+            trace.finished_at = utc_now_iso()
+        if events is not None and not events.closed:
+            # Runs that end before execution (validation failure, perception error) still close the stream.
+            events.emit(RunEventType.STOP, status=trace.status.value, stop_reason=trace.stop_reason.model_dump(mode="json"))
+
+        # Persist trace and store a compact memory entry for future retrieval.
+        try:
+            if timeouts is not None:
+                timeouts.flush()
+            cassette = self.cassette
+            if cassette is not None:
+                if cassette.mode == "record":
+                    cassette.save()
+                logger.info("cassette_done", "Tool cassette used", mode=cassette.mode, path=str(cassette.path), **cassette.stats)
+            prune_spills(config, trace.run_id)
+            long_term.save_trace(trace)
+            # The stored trace supersedes the checkpoints; resume(run_id) now just returns it.
+            clear_checkpoints(long_term, trace.run_id)
+            long_term.add_memory_entry(
+                namespace="facts",
+                key=f"run:{trace.run_id}",
+                value_text=json.dumps(
+                    {
+                        "request": raw_goal,
+                        "status": trace.status.value,
+                        "stop_reason": trace.stop_reason.type.value,
+                        "summary": trace.final_output.get("message", ""),
+                    }
+                ),
+                metadata={"trace_id": trace.trace_id},
+            )
+        except Exception as exc:  # pragma: no cover - persistence failures should not mask primary result
+            logger.error("persist_error", "Failed to persist trace", error=str(exc))
+
+        if export_trace:
+            path = export_trace_json(trace, config.traces_dir, prefix=trace_prefix)
+            trace.final_output.setdefault("meta", {})["trace_path"] = str(path)
+
+        return trace
+
+
+_ENGINES: OrderedDict[str, OrchestrationEngine] = OrderedDict()
+_ENGINES_LOCK = Lock()
+_MAX_ENGINES = 4
+
+
+def shared_engine(config: Config) -> OrchestrationEngine:
+    # One-shot callers (CLI, eval, scripts) reuse a warm engine per config, so its plan cache and tool memo
+    # carry over between calls instead of starting empty every time.
+    key = config.model_dump_json()
+    with _ENGINES_LOCK:
+        engine = _ENGINES.get(key)
+        if engine is None:
+            engine = _ENGINES[key] = OrchestrationEngine(config)
+        _ENGINES.move_to_end(key)
+        while len(_ENGINES) > _MAX_ENGINES:
+            _ENGINES.popitem(last=False)
+        return engine
+
+
+def run_orchestration(
+    raw_goal: str,
+    context: dict[str, Any] | None = None,
+    config_overrides: dict[str, Any] | None = None,
+    export_trace: bool = True,
+    trace_prefix: str = "trace",
+    on_event: Callable[[RunEvent], None] | None = None,
+    use_cache: bool | None = None,
+) -> tuple[RunTrace, Config]:
+    if use_cache is not None:
+        config_overrides = {**(config_overrides or {}), "run_cache_enabled": use_cache}
+    config = load_config(config_overrides)
+    engine = shared_engine(config)
+    trace_id, run_id = new_trace_id(), new_run_id()
+    events = None
+    if on_event is not None:
+        events = EventBus(trace_id, run_id)
+        events.subscribe(on_event)
+    trace = engine.run(
+        raw_goal,
+        context=context,
+        export_trace=export_trace,
+        trace_prefix=trace_prefix,
+        run_id=run_id,
+        trace_id=trace_id,
+        events=events,
+    )
+    return trace, config
 
-    if export_trace:
-        path = export_trace_json(trace, config.traces_dir, prefix=trace_prefix)
-        trace.final_output.setdefault("meta", {})["trace_path"] = str(path)
 
+def resume_orchestration(
+    run_id: str,
+    config_overrides: dict[str, Any] | None = None,
+    export_trace: bool = True,
+    on_event: Callable[[RunEvent], None] | None = None,
+    reexecute_unsafe: bool = False,
+) -> tuple[RunTrace | None, Config]:
+    config = load_config(config_overrides)
+    engine = shared_engine(config)
+    events = None
+    checkpoint = load_checkpoint(engine.long_term, run_id)
+    if on_event is not None and checkpoint is not None:
+        events = EventBus(checkpoint.trace_id, run_id)
+        events.subscribe(on_event)
+    trace = engine.resume(run_id, export_trace=export_trace, events=events, reexecute_unsafe=reexecute_unsafe)
     return trace, config
 
 
@@ -1,4 +1,7 @@
+from .latency import AdaptiveTimeoutService, LatencyDigest
 from .long_term import LongTermMemory
+from .query_cache import QueryResultCache, get_query_cache
 from .retrieval import retrieve_memory
 from .short_term import ShortTermMemory
+from .sqlite_pool import QueryBudget, QueryPage, ReadOnlyPool, get_read_pool
 
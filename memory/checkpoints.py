@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from core.tracing import utc_now_iso
+from core.types import PerceptionResult, Plan, PlanStep, RunCheckpoint, RunTrace
+
+from .long_term import LongTermMemory
+from .short_term import ShortTermMemory
+
+_MISSING = object()
+
+
+def _changed(previous: dict[str, Any], current: dict[str, Any]) -> dict[str, Any]:
+    # State values are replaced rather than mutated, so identity catches nearly every change cheaply.
+    out = {}
+    for key, value in current.items():
+        old = previous.get(key, _MISSING)
+        if old is not value and old != value:
+            out[key] = value
+    return out
+
+
+def _dump(items: list[Any]) -> list[Any]:
+    return [i.model_dump(mode="json") if hasattr(i, "model_dump") else i for i in items]
+
+
+class RunCheckpointer:
+    def __init__(self, long_term_memory: LongTermMemory, run_id: str) -> None:
+        self.ltm = long_term_memory
+        self.run_id = run_id
+        self.seq = -1
+        self.steps_version = 0
+        self._saved_steps_version = 0
+        self._state: dict[str, Any] = {}
+        self._retries: dict[str, int] = {}
+        self._signatures: dict[str, int] = {}
+        self._lens: dict[str, int] = {}
+        self._position: tuple[int, int] | None = None
+
+    def _write(self, kind: str, payload: dict[str, Any]) -> None:
+        self.seq += 1
+        self.ltm.execute(
+            "INSERT INTO run_checkpoints(run_id, seq, kind, payload_json, created_at) VALUES(?,?,?,?,?)",
+            [self.run_id, self.seq, kind, json.dumps(payload, default=str), utc_now_iso()],
+        )
+
+    def _mark(self, stm: ShortTermMemory, trace: RunTrace) -> None:
+        self._state = dict(stm.state)
+        self._retries = dict(stm.retries)
+        self._signatures = dict(stm.seen_step_signatures)
+        self._lens = {
+            "observations": len(stm.observations),
+            "stm_refinements": len(stm.refinements),
+            "step_events": len(trace.step_events),
+            "tool_calls": len(trace.tool_calls),
+            "monitor_signals": len(trace.monitor_signals),
+            "refinements": len(trace.refinements),
+        }
+        self._saved_steps_version = self.steps_version
+
+    def steps_changed(self) -> None:
+        self.steps_version += 1
+
+    def begin(self, trace: RunTrace, perception: PerceptionResult, plan: Plan, stm: ShortTermMemory) -> None:
+        self._write(
+            "base",
+            {
+                "trace_id": trace.trace_id,
+                "request": trace.request,
+                "started_at": trace.started_at,
+                "perception": perception.model_dump(mode="json"),
+                "plan": plan.model_dump(mode="json"),
+                "state": dict(stm.state),
+            },
+        )
+        self._position = (0, 0)
+        self._mark(stm, trace)
+
+    def resume_from(self, checkpoint: RunCheckpoint, stm: ShortTermMemory, trace: RunTrace) -> None:
+        self.seq = checkpoint.seq
+        self._position = (checkpoint.step_index, checkpoint.completed_steps)
+        self._mark(stm, trace)
+
+    def step(
+        self,
+        steps: list[PlanStep],
+        step_index: int,
+        completed_steps: int,
+        stm: ShortTermMemory,
+        trace: RunTrace,
+    ) -> None:
+        # Only what changed since the previous boundary is written; the full plan only after a patch or replan.
+        lens = self._lens
+        payload: dict[str, Any] = {
+            "step_index": step_index,
+            "completed_steps": completed_steps,
+            "state": _changed(self._state, stm.state),
+            "observations": stm.observations[lens["observations"] :],
+            "retries": _changed(self._retries, stm.retries),
+            "stm_refinements": stm.refinements[lens["stm_refinements"] :],
+            "signatures": _changed(self._signatures, stm.seen_step_signatures),
+            "step_events": _dump(trace.step_events[lens["step_events"] :]),
+            "tool_calls": _dump(trace.tool_calls[lens["tool_calls"] :]),
+            "monitor_signals": _dump(trace.monitor_signals[lens["monitor_signals"] :]),
+            "refinements": _dump(trace.refinements[lens["refinements"] :]),
+            "usage": trace.usage.model_dump(),
+        }
+        if self.steps_version != self._saved_steps_version:
+            payload["steps"] = _dump(steps)
+        position = (step_index, completed_steps)
+        appended = any(payload[k] for k in ("state", "observations", "retries", "stm_refinements", "step_events", "tool_calls"))
+        if position == self._position and not appended and "steps" not in payload:
+            return
+        self._write("step", payload)
+        self._position = position
+        self._mark(stm, trace)
+
+    def intent(self, step_id: str, attempt: int, tool_name: str) -> None:
+        # Written just before a non-idempotent call; resume will not blindly repeat it.
+        self._write("intent", {"step_id": step_id, "attempt": attempt, "tool_name": tool_name})
+
+    def clear(self) -> None:
+        clear_checkpoints(self.ltm, self.run_id)
+
+
+def load_checkpoint(long_term_memory: LongTermMemory, run_id: str) -> RunCheckpoint | None:
+    rows = long_term_memory.query(
+        "SELECT seq, kind, payload_json FROM run_checkpoints WHERE run_id = ? ORDER BY seq", [run_id]
+    )
+    if not rows or rows[0]["kind"] != "base":
+        return None
+    base = json.loads(rows[0]["payload_json"])
+    data: dict[str, Any] = {**base, "run_id": run_id, "seq": rows[0]["seq"], "steps": base["plan"]["steps"]}
+    for key in ("observations", "stm_refinements", "step_events", "tool_calls", "monitor_signals", "refinements"):
+        data[key] = []
+    data.update(retries={}, signatures={}, pending_call=None)
+    for row in rows[1:]:
+        delta = json.loads(row["payload_json"])
+        data["seq"] = row["seq"]
+        if row["kind"] == "intent":
+            data["pending_call"] = delta
+            continue
+        data["pending_call"] = None
+        data["step_index"] = delta["step_index"]
+        data["completed_steps"] = delta["completed_steps"]
+        data["usage"] = delta["usage"]
+        if "steps" in delta:
+            data["steps"] = delta["steps"]
+        for key in ("state", "retries", "signatures"):
+            data[key].update(delta[key])
+        for key in ("observations", "stm_refinements", "step_events", "tool_calls", "monitor_signals", "refinements"):
+            data[key].extend(delta[key])
+    return RunCheckpoint.model_validate(data)
+
+
+def clear_checkpoints(long_term_memory: LongTermMemory, run_id: str) -> int:
+    return long_term_memory.execute("DELETE FROM run_checkpoints WHERE run_id = ?", [run_id])
+
+
+def restore_short_term(checkpoint: RunCheckpoint) -> ShortTermMemory:
+    stm = ShortTermMemory(initial_state=checkpoint.state)
+    stm.observations = list(checkpoint.observations)
+    for observation in stm.observations:
+        stm.step_outputs[observation["step_id"]] = {k: v for k, v in observation.items() if k != "step_id"}
+    stm.retries = dict(checkpoint.retries)
+    stm.refinements = list(checkpoint.stm_refinements)
+    stm.seen_step_signatures = dict(checkpoint.signatures)
+    return stm
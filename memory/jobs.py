@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import json
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+from core.tracing import new_run_id, utc_now_iso
+from core.types import JobRecord, JobStatus
+
+from .long_term import LongTermMemory
+
+_COLUMNS = (
+    "job_id, queue, status, priority, payload_json, run_id, attempts, max_attempts, "
+    "available_at, lease_owner, lease_expires_at, last_error"
+)
+
+
+def _record(row: dict[str, Any]) -> JobRecord:
+    data = dict(row)
+    data["payload"] = json.loads(data.pop("payload_json") or "{}")
+    return JobRecord.model_validate(data)
+
+
+class JobQueue:
+    def __init__(
+        self,
+        long_term_memory: LongTermMemory,
+        queue: str = "default",
+        lease_s: float = 60.0,
+        max_attempts: int = 3,
+        retry_backoff_s: float = 2.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.ltm = long_term_memory
+        self.queue = queue
+        self.lease_s = lease_s
+        self.max_attempts = max_attempts
+        self.retry_backoff_s = retry_backoff_s
+        self._clock = clock
+
+    def enqueue(
+        self,
+        payload: dict[str, Any],
+        priority: int = 0,
+        delay_s: float = 0.0,
+        max_attempts: int | None = None,
+        job_id: str | None = None,
+    ) -> JobRecord:
+        now = utc_now_iso()
+        job = JobRecord(
+            job_id=job_id or uuid.uuid4().hex,
+            queue=self.queue,
+            status=JobStatus.QUEUED,
+            priority=priority,
+            payload=payload,
+            run_id=new_run_id(),
+            max_attempts=max_attempts or self.max_attempts,
+            available_at=self._clock() + delay_s,
+        )
+        self.ltm.execute(
+            "INSERT INTO jobs(job_id, queue, status, priority, payload_json, run_id, attempts, max_attempts, "
+            "available_at, created_at, updated_at) VALUES(?,?,?,?,?,?,0,?,?,?,?)",
+            [
+                job.job_id,
+                job.queue,
+                job.status.value,
+                job.priority,
+                json.dumps(payload, default=str),
+                job.run_id,
+                job.max_attempts,
+                job.available_at,
+                now,
+                now,
+            ],
+        )
+        return job
+
+    def get(self, job_id: str) -> JobRecord | None:
+        rows = self.ltm.query(f"SELECT {_COLUMNS} FROM jobs WHERE job_id = ?", [job_id])
+        return _record(rows[0]) if rows else None
+
+    def lease(self, owner: str, limit: int = 1) -> list[JobRecord]:
+        now = self._clock()
+        self._bury_expired(now)
+        # One statement claims the whole batch, so concurrent workers never lease the same job.
+        # Expired leases are claimable again: that is the visibility timeout.
+        rows = self.ltm.execute_returning(
+            f"""
+            UPDATE jobs
+               SET status = ?, lease_owner = ?, lease_expires_at = ?, attempts = attempts + 1, updated_at = ?
+             WHERE job_id IN (
+                   SELECT job_id FROM jobs
+                    WHERE queue = ?
+                      AND ((status = ? AND available_at <= ?) OR (status = ? AND lease_expires_at < ?))
+                    ORDER BY priority, available_at
+                    LIMIT ?)
+            RETURNING {_COLUMNS}
+            """,
+            [
+                JobStatus.LEASED.value,
+                owner,
+                now + self.lease_s,
+                utc_now_iso(),
+                self.queue,
+                JobStatus.QUEUED.value,
+                now,
+                JobStatus.LEASED.value,
+                now,
+                max(1, limit),
+            ],
+        )
+        jobs = [_record(r) for r in rows]
+        return sorted(jobs, key=lambda j: (j.priority, j.available_at))
+
+    def _bury_expired(self, now: float) -> None:
+        # A job whose last allowed attempt lost its lease (worker crash) is not handed out again.
+        self.ltm.execute(
+            "UPDATE jobs SET status = ?, last_error = COALESCE(last_error, 'lease expired'), lease_owner = NULL, updated_at = ? "
+            "WHERE queue = ? AND status = ? AND lease_expires_at < ? AND attempts >= max_attempts",
+            [JobStatus.DEAD.value, utc_now_iso(), self.queue, JobStatus.LEASED.value, now],
+        )
+
+    def heartbeat(self, owner: str, job_ids: list[str]) -> int:
+        if not job_ids:
+            return 0
+        marks = ",".join("?" for _ in job_ids)
+        return self.ltm.execute(
+            f"UPDATE jobs SET lease_expires_at = ?, updated_at = ? WHERE lease_owner = ? AND status = ? AND job_id IN ({marks})",
+            [self._clock() + self.lease_s, utc_now_iso(), owner, JobStatus.LEASED.value, *job_ids],
+        )
+
+    def complete(self, job_id: str, owner: str) -> bool:
+        return (
+            self.ltm.execute(
+                "UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires_at = NULL, updated_at = ? "
+                "WHERE job_id = ? AND lease_owner = ? AND status = ?",
+                [JobStatus.DONE.value, utc_now_iso(), job_id, owner, JobStatus.LEASED.value],
+            )
+            > 0
+        )
+
+    def retry(self, job_id: str, owner: str, error: str) -> JobStatus | None:
+        job = self.get(job_id)
+        if job is None or job.lease_owner != owner or job.status != JobStatus.LEASED:
+            return None
+        status = JobStatus.QUEUED if job.attempts < job.max_attempts else JobStatus.DEAD
+        backoff = self.retry_backoff_s * (2 ** max(0, job.attempts - 1))
+        updated = self.ltm.execute(
+            "UPDATE jobs SET status = ?, available_at = ?, last_error = ?, lease_owner = NULL, lease_expires_at = NULL, "
+            "updated_at = ? WHERE job_id = ? AND lease_owner = ? AND status = ?",
+            [status.value, self._clock() + backoff, error[:2000], utc_now_iso(), job_id, owner, JobStatus.LEASED.value],
+        )
+        return status if updated else None
+
+    def counts(self) -> dict[str, int]:
+        rows = self.ltm.query("SELECT status, COUNT(*) AS n FROM jobs WHERE queue = ? GROUP BY status", [self.queue])
+        return {r["status"]: r["n"] for r in rows}
+
+
+def job_queue_from_config(config: Any, long_term_memory: LongTermMemory, queue: str = "default") -> JobQueue:
+    return JobQueue(
+        long_term_memory,
+        queue=queue,
+        lease_s=config.job_lease_s,
+        max_attempts=config.job_max_attempts,
+        retry_backoff_s=config.job_retry_backoff_s,
+    )
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import json
+from threading import Lock
+from typing import Any
+from urllib.parse import urlparse
+
+from .long_term import LongTermMemory
+
+
+class LatencyDigest:
+    # Merging t-digest: centroids are [mean, weight] pairs kept sorted by mean.
+    def __init__(
+        self,
+        compression: float = 100.0,
+        centroids: list[list[float]] | None = None,
+        min_value: float | None = None,
+        max_value: float | None = None,
+    ) -> None:
+        self.compression = compression
+        self._centroids: list[list[float]] = [[float(m), float(w)] for m, w in centroids or []]
+        self._buffer: list[float] = []
+        self.count = sum(w for _, w in self._centroids)
+        self.min_value = min_value
+        self.max_value = max_value
+
+    def add(self, value: float) -> None:
+        value = float(value)
+        self._buffer.append(value)
+        self.count += 1
+        self.min_value = value if self.min_value is None else min(self.min_value, value)
+        self.max_value = value if self.max_value is None else max(self.max_value, value)
+        if len(self._buffer) >= self.compression:
+            self._compress()
+
+    def _compress(self) -> None:
+        if not self._buffer:
+            return
+        points = sorted(self._centroids + [[v, 1.0] for v in self._buffer], key=lambda c: c[0])
+        self._buffer = []
+        total = sum(w for _, w in points)
+        merged = [list(points[0])]
+        cumulative = 0.0
+        for mean, weight in points[1:]:
+            current = merged[-1]
+            proposed = current[1] + weight
+            q = (cumulative + proposed / 2) / total
+            if proposed <= max(1.0, 4 * total * q * (1 - q) / self.compression):
+                current[0] += (mean - current[0]) * weight / proposed
+                current[1] = proposed
+            else:
+                cumulative += current[1]
+                merged.append([mean, weight])
+        self._centroids = merged
+
+    def quantile(self, q: float) -> float | None:
+        self._compress()
+        if not self._centroids:
+            return None
+        target = min(max(q, 0.0), 1.0) * self.count
+        cumulative = 0.0
+        prev_mean, prev_mid = self.min_value, 0.0
+        for mean, weight in self._centroids:
+            mid = cumulative + weight / 2
+            if target <= mid:
+                if mid == prev_mid:
+                    return mean
+                return prev_mean + (mean - prev_mean) * (target - prev_mid) / (mid - prev_mid)
+            prev_mean, prev_mid = mean, mid
+            cumulative += weight
+        if self.count == prev_mid:
+            return prev_mean
+        return prev_mean + (self.max_value - prev_mean) * (target - prev_mid) / (self.count - prev_mid)
+
+    def to_dict(self) -> dict[str, Any]:
+        self._compress()
+        return {
+            "compression": self.compression,
+            "centroids": self._centroids,
+            "min": self.min_value,
+            "max": self.max_value,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "LatencyDigest":
+        return cls(
+            compression=float(data.get("compression", 100.0)),
+            centroids=data.get("centroids") or [],
+            min_value=data.get("min"),
+            max_value=data.get("max"),
+        )
+
+
+class AdaptiveTimeoutService:
+    # Latency is tracked per tool at two scopes: the host and the host+path endpoint.
+    tracked_tools = {"http_get", "http_post", "http_get_many"}
+
+    def __init__(self, config: Any, long_term_memory: LongTermMemory | None = None) -> None:
+        self.config = config
+        self.long_term_memory = long_term_memory
+        self._digests: dict[tuple[str, str], LatencyDigest] = {}
+        self._dirty: set[tuple[str, str]] = set()
+        self._pending = 0
+        self._lock = Lock()
+        if long_term_memory is not None:
+            self._load()
+
+    @staticmethod
+    def scopes(url: str) -> tuple[str, str]:
+        parsed = urlparse(url)
+        return f"host:{parsed.netloc}", f"endpoint:{parsed.netloc}{parsed.path}"
+
+    def _load(self) -> None:
+        rows = self.long_term_memory.load_latency_digests()
+        if rows:
+            for row in rows:
+                key = (row["tool_name"], row["scope"])
+                self._digests[key] = LatencyDigest.from_dict(json.loads(row["digest_json"]))
+            return
+        # Cold start: seed digests from historical tool outcomes.
+        for tool_name, url, latency_ms in self.long_term_memory.recent_tool_latencies(sorted(self.tracked_tools)):
+            self._add(tool_name, url, latency_ms)
+        if self._dirty:
+            self.flush()
+
+    def _add(self, tool_name: str, url: str, latency_ms: float) -> None:
+        for scope in self.scopes(url):
+            key = (tool_name, scope)
+            digest = self._digests.get(key)
+            if digest is None:
+                digest = self._digests[key] = LatencyDigest()
+            digest.add(latency_ms)
+            self._dirty.add(key)
+
+    def observe(self, tool_name: str, url: str, latency_ms: float) -> None:
+        if tool_name not in self.tracked_tools or not urlparse(url).netloc:
+            return
+        with self._lock:
+            self._add(tool_name, url, latency_ms)
+            self._pending += 1
+            flush_now = self._pending >= self.config.adaptive_timeout_persist_every
+        if flush_now:
+            self.flush()
+
+    def observe_call(self, record: Any) -> None:
+        # Timeouts are censored samples: the true latency is at least the timeout.
+        if record.status.value not in {"success", "timeout"}:
+            return
+        if record.tool_name == "http_get_many":
+            self._observe_batch(record)
+            return
+        url = str(record.validated_args.get("url") or record.tool_args.get("url") or "")
+        latency_ms = float(record.latency_ms)
+        if record.status.value == "timeout":
+            latency_ms = max(latency_ms, float(record.validated_args.get("timeout_s", 0.0)) * 1000)
+        self.observe(record.tool_name, url, latency_ms)
+
+    def _observe_batch(self, record: Any) -> None:
+        # Each item is its own sample; a batch that timed out entirely raised before producing item results.
+        args = record.validated_args
+        requests = args.get("requests") or []
+
+        def item_timeout(index: int) -> float:
+            item = requests[index] if index < len(requests) else {}
+            return float(item.get("timeout_s") or args.get("timeout_s") or 0.0)
+
+        if record.status.value == "timeout":
+            for index, item in enumerate(requests):
+                self.observe(record.tool_name, str(item.get("url", "")), item_timeout(index) * 1000)
+            return
+        result = record.result or {}
+        # Items reused from an earlier attempt were already observed when they were fetched.
+        reused = set((result.get("data") or {}).get("reused") or [])
+        for item in result.get("items") or []:
+            if int(item.get("index", -1)) in reused:
+                continue
+            latency_ms = float(item.get("latency_ms") or 0)
+            if item.get("failure_type") == "timeout":
+                latency_ms = max(latency_ms, item_timeout(int(item.get("index", 0))) * 1000)
+            elif not item.get("ok"):
+                continue
+            self.observe(record.tool_name, str(item.get("url", "")), latency_ms)
+
+    def timeout_for(self, tool_name: str, url: str, default_s: float) -> float:
+        if not urlparse(url).netloc:
+            return default_s
+        host_scope, endpoint_scope = self.scopes(url)
+        with self._lock:
+            for scope in (endpoint_scope, host_scope):
+                digest = self._digests.get((tool_name, scope))
+                if digest is None or digest.count < self.config.adaptive_timeout_min_samples:
+                    continue
+                latency_ms = digest.quantile(self.config.adaptive_timeout_quantile) or 0.0
+                learned = latency_ms / 1000 * self.config.adaptive_timeout_multiplier
+                return round(
+                    min(max(learned, self.config.adaptive_timeout_floor_s), self.config.adaptive_timeout_ceiling_s),
+                    3,
+                )
+        return default_s
+
+    def retry_timeout(self, tool_name: str, url: str, current_s: float) -> float:
+        learned = self.timeout_for(tool_name, url, current_s)
+        return min(max(current_s * 2, learned), self.config.adaptive_timeout_ceiling_s)
+
+    def flush(self) -> None:
+        if self.long_term_memory is None:
+            return
+        with self._lock:
+            dirty = [(key, self._digests[key].to_dict()) for key in sorted(self._dirty)]
+            self._dirty.clear()
+            self._pending = 0
+        for (tool_name, scope), data in dirty:
+            self.long_term_memory.save_latency_digest(tool_name, scope, json.dumps(data))
@@ -2,19 +2,35 @@ from __future__ import annotations
 
 import json
 import sqlite3
+from dataclasses import replace
 from pathlib import Path
 from typing import Any
 
 from core.types import RunTrace
 from core.tracing import utc_now_iso
 
+from .query_cache import cache_key, get_query_cache, note_write, own_write, write_targets
+from .run_cache import note_table_write
+from .sqlite_pool import QueryBudget, QueryPage, fetch_page, get_read_pool
+
 
 class LongTermMemory:
-    def __init__(self, sqlite_path: Path, schema_path: Path | None = None, seed_path: Path | None = None) -> None:
+    def __init__(
+        self,
+        sqlite_path: Path,
+        schema_path: Path | None = None,
+        seed_path: Path | None = None,
+        read_pool_size: int = 4,
+        query_cache_entries: int = 256,
+        query_cache_bytes: int = 8_388_608,
+    ) -> None:
         self.sqlite_path = Path(sqlite_path)
         self.sqlite_path.parent.mkdir(parents=True, exist_ok=True)
         self.schema_path = schema_path
         self.seed_path = seed_path
+        self.read_pool_size = read_pool_size
+        self.query_cache_entries = query_cache_entries
+        self.query_cache_bytes = query_cache_bytes
         self._initialized = False
         self._ensure_initialized()
 
@@ -27,11 +43,13 @@ class LongTermMemory:
         if self._initialized:
             return
         with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
             if self.schema_path and self.schema_path.exists():
                 conn.executescript(self.schema_path.read_text(encoding="utf-8"))
             if self.seed_path and self.seed_path.exists():
                 conn.executescript(self.seed_path.read_text(encoding="utf-8"))
             conn.commit()
+        note_write(self.sqlite_path, None)
         self._initialized = True
 
     def query(self, sql: str, params: list[Any] | tuple[Any, ...] | None = None) -> list[dict[str, Any]]:
@@ -41,12 +59,55 @@ class LongTermMemory:
             rows = cur.fetchall()
             return [dict(r) for r in rows]
 
+    def query_page(
+        self,
+        sql: str,
+        params: list[Any] | tuple[Any, ...] | None = None,
+        max_rows: int | None = None,
+        budget: QueryBudget | None = None,
+        readonly: bool = True,
+        use_cache: bool = True,
+    ) -> QueryPage:
+        # Read-only queries run on the shared mode=ro pool so they never contend with the writer.
+        self._ensure_initialized()
+        if not readonly:
+            with self._connect() as conn, own_write(self.sqlite_path, conn, None):
+                page = fetch_page(conn, sql, params, max_rows, budget)
+            note_table_write(self.sqlite_path, None)
+            return page
+        if not use_cache or self.query_cache_entries <= 0:
+            tables: set[str] = set()
+            with get_read_pool(self.sqlite_path, self.read_pool_size).connection() as conn:
+                page = fetch_page(conn, sql, params, max_rows, budget, tables=tables)
+            return replace(page, tables=tuple(sorted(tables)))
+        cache = get_query_cache(self.sqlite_path, self.query_cache_entries, self.query_cache_bytes)
+        key = cache_key(sql, params, max_rows, budget)
+        hit = cache.get(key)
+        if hit is not None:
+            return replace(hit, from_cache=True)
+        snapshot = cache.snapshot()
+        tables = set()
+        with get_read_pool(self.sqlite_path, self.read_pool_size).connection() as conn:
+            page = fetch_page(conn, sql, params, max_rows, budget, tables=tables)
+        page.tables = tuple(sorted(tables))
+        cache.put(key, page, tables, snapshot)
+        return page
+
     def execute(self, sql: str, params: list[Any] | tuple[Any, ...] | None = None) -> int:
         self._ensure_initialized()
-        with self._connect() as conn:
+        targets = write_targets(sql)
+        with self._connect() as conn, own_write(self.sqlite_path, conn, targets):
             cur = conn.execute(sql, params or [])
-            conn.commit()
-            return cur.rowcount
+        note_table_write(self.sqlite_path, targets)
+        return cur.rowcount
+
+    def execute_returning(self, sql: str, params: list[Any] | tuple[Any, ...] | None = None) -> list[dict[str, Any]]:
+        self._ensure_initialized()
+        targets = write_targets(sql)
+        with self._connect() as conn, own_write(self.sqlite_path, conn, targets):
+            rows = [dict(r) for r in conn.execute(sql, params or []).fetchall()]
+        note_table_write(self.sqlite_path, targets)
+        return rows
 
     def add_memory_entry(
         self,
@@ -61,12 +122,15 @@ class LongTermMemory:
         )
 
     def get_memory_entries(self, namespace: str | None = None, limit: int = 50) -> list[dict[str, Any]]:
+        # Served through the read cache: every plan retrieves the same entries until one is added.
         if namespace:
-            return self.query(
+            page = self.query_page(
                 "SELECT * FROM memory_entries WHERE namespace = ? ORDER BY id DESC LIMIT ?",
                 [namespace, limit],
             )
-        return self.query("SELECT * FROM memory_entries ORDER BY id DESC LIMIT ?", [limit])
+        else:
+            page = self.query_page("SELECT * FROM memory_entries ORDER BY id DESC LIMIT ?", [limit])
+        return [dict(zip(page.columns, row)) for row in page.rows]
 
     def save_tool_outcome(
         self,
@@ -82,6 +146,50 @@ class LongTermMemory:
             [trace_id, step_id, tool_name, status, latency_ms, json.dumps(outcome or {}), utc_now_iso()],
         )
 
+    def recent_tool_latencies(self, tool_names: list[str], limit: int = 5000) -> list[tuple[str, str, int]]:
+        placeholders = ",".join("?" for _ in tool_names)
+        rows = self.query(
+            f"SELECT tool_name, latency_ms, outcome_json FROM tool_outcomes WHERE status = 'success' AND tool_name IN ({placeholders}) ORDER BY id DESC LIMIT ?",
+            [*tool_names, limit],
+        )
+        out: list[tuple[str, str, int]] = []
+        for row in rows:
+            try:
+                outcome = json.loads(row["outcome_json"] or "{}")
+            except (TypeError, ValueError):
+                continue
+            url = (outcome.get("data") or {}).get("url")
+            if url:
+                out.append((row["tool_name"], str(url), int(row["latency_ms"])))
+            reused = set((outcome.get("data") or {}).get("reused") or [])
+            for item in outcome.get("items") or []:
+                # Batch calls carry one latency per item; reused items were recorded by the attempt that fetched them.
+                if item.get("ok") and item.get("url") and int(item.get("index", -1)) not in reused:
+                    out.append((row["tool_name"], str(item["url"]), int(item.get("latency_ms") or 0)))
+        return out
+
+    def load_latency_digests(self) -> list[dict[str, Any]]:
+        return self.query("SELECT tool_name, scope, digest_json FROM latency_digests")
+
+    def save_latency_digest(self, tool_name: str, scope: str, digest_json: str) -> None:
+        self.execute(
+            "INSERT OR REPLACE INTO latency_digests(tool_name, scope, digest_json, updated_at) VALUES(?,?,?,?)",
+            [tool_name, scope, digest_json, utc_now_iso()],
+        )
+
+    def get_llm_cache(self, cache_key: str, now: float) -> dict[str, Any] | None:
+        rows = self.query(
+            "SELECT response_text, total_tokens, expires_at FROM llm_cache WHERE cache_key = ? AND expires_at > ?",
+            [cache_key, now],
+        )
+        return rows[0] if rows else None
+
+    def save_llm_cache(self, cache_key: str, model: str, response_text: str, total_tokens: int, expires_at: float) -> None:
+        self.execute(
+            "INSERT OR REPLACE INTO llm_cache(cache_key, model, response_text, total_tokens, expires_at, created_at) VALUES(?,?,?,?,?,?)",
+            [cache_key, model, response_text, total_tokens, expires_at, utc_now_iso()],
+        )
+
     def save_trace(self, trace: RunTrace) -> None:
         trace_json = trace.model_dump_json()
         self.execute(
@@ -102,6 +210,10 @@ class LongTermMemory:
             [trace.trace_id, trace.run_id, trace_json, utc_now_iso()],
         )
 
+    def load_trace(self, run_id: str) -> RunTrace | None:
+        rows = self.query("SELECT trace_json FROM traces WHERE run_id = ? ORDER BY created_at DESC LIMIT 1", [run_id])
+        return RunTrace.model_validate_json(rows[0]["trace_json"]) if rows else None
+
     def save_eval_result(self, scenario_id: str, passed: bool, reason: str, score: float, trace_path: str | None) -> None:
         self.execute(
             "INSERT INTO eval_results(scenario_id, passed, reason, score, trace_path, created_at) VALUES(?,?,?,?,?,?)",
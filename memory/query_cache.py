@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+from .sqlite_pool import QueryPage
+
+_WRITE_TARGET = re.compile(
+    r"^\s*(?:insert(?:\s+or\s+\w+)?\s+into|replace\s+into|update(?:\s+or\s+\w+)?|delete\s+from)\s+[\"`\[]?(\w+)",
+    re.IGNORECASE,
+)
+_ENTRY_OVERHEAD_BYTES = 256
+
+
+def write_targets(sql: str) -> set[str] | None:
+    match = _WRITE_TARGET.match(sql)
+    return {match.group(1).lower()} if match else None
+
+
+def cache_key(sql: str, params: list[Any] | tuple[Any, ...] | None, max_rows: int | None, budget: Any) -> tuple[Any, ...]:
+    caps = (budget.max_rows, budget.max_bytes) if budget is not None else (None, None)
+    return (" ".join(sql.split()), tuple(params or ()), max_rows, caps)
+
+
+@dataclass
+class CacheSnapshot:
+    epoch: int
+    generations: dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class _Entry:
+    page: QueryPage
+    epoch: int
+    tables: dict[str, int]
+    size: int
+
+
+class QueryResultCache:
+    def __init__(self, sqlite_path: Path, max_entries: int = 256, max_bytes: int = 8_388_608) -> None:
+        self.uri = f"{Path(sqlite_path).resolve().as_uri()}?mode=ro"
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[Any, ...], _Entry] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._epoch = 0
+        self._bytes = 0
+        self._sentinel: sqlite3.Connection | None = None
+        self._data_version: int | None = None
+        self._lock = Lock()
+
+    def _read_data_version(self) -> int:
+        if self._sentinel is None:
+            self._sentinel = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+        return int(self._sentinel.execute("PRAGMA data_version").fetchone()[0])
+
+    def _sync(self) -> None:
+        # data_version moves whenever any other connection commits; writes we were not told about bump every entry.
+        version = self._read_data_version()
+        if self._data_version is not None and version != self._data_version:
+            self._epoch += 1
+        self._data_version = version
+
+    def _drop(self, key: tuple[Any, ...]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def snapshot(self) -> CacheSnapshot:
+        with self._lock:
+            self._sync()
+            return CacheSnapshot(epoch=self._epoch, generations=dict(self._generations))
+
+    def get(self, key: tuple[Any, ...]) -> QueryPage | None:
+        with self._lock:
+            self._sync()
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stale = entry.epoch != self._epoch or any(self._generations.get(t, 0) != g for t, g in entry.tables.items())
+            if stale:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry.page
+
+    def put(self, key: tuple[Any, ...], page: QueryPage, tables: set[str], snapshot: CacheSnapshot) -> None:
+        size = page.bytes_read + _ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = _Entry(
+                page=page,
+                epoch=snapshot.epoch,
+                tables={t: snapshot.generations.get(t, 0) for t in tables},
+                size=size,
+            )
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._drop(next(iter(self._entries)))
+
+    def begin_write(self) -> None:
+        # Anything committed before our write starts is someone else's and must count against the entries.
+        with self._lock:
+            self._sync()
+
+    def note_write(self, tables: set[str] | None, confirm: Callable[[], bool] | None = None) -> None:
+        # confirm() proves nothing else committed since begin_write; only then is the new data_version ours
+        # alone and safe to adopt. Otherwise the next read sees the change and bumps the epoch.
+        with self._lock:
+            if tables is None:
+                self._epoch += 1
+                stale = list(self._entries)
+            else:
+                for table in tables:
+                    self._generations[table] = self._generations.get(table, 0) + 1
+                stale = [key for key, entry in self._entries.items() if tables & entry.tables.keys()]
+            for key in stale:
+                self._drop(key)
+            if confirm is not None:
+                version = self._read_data_version()
+                if confirm():
+                    self._data_version = version
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "epoch": self._epoch}
+
+
+_CACHES: dict[str, QueryResultCache] = {}
+_CACHES_LOCK = Lock()
+
+
+def get_query_cache(sqlite_path: Path, max_entries: int = 256, max_bytes: int = 8_388_608) -> QueryResultCache:
+    key = str(Path(sqlite_path).resolve())
+    with _CACHES_LOCK:
+        cache = _CACHES.get(key)
+        if cache is None:
+            cache = _CACHES[key] = QueryResultCache(Path(key), max_entries=max_entries, max_bytes=max_bytes)
+        return cache
+
+
+def _lookup(sqlite_path: Path) -> QueryResultCache | None:
+    with _CACHES_LOCK:
+        return _CACHES.get(str(Path(sqlite_path).resolve()))
+
+
+def note_write(sqlite_path: Path, tables: set[str] | None) -> None:
+    cache = _lookup(sqlite_path)
+    if cache is not None:
+        cache.note_write(tables)
+
+
+def data_version(conn: sqlite3.Connection) -> int:
+    return int(conn.execute("PRAGMA data_version").fetchone()[0])
+
+
+@contextmanager
+def own_write(sqlite_path: Path, conn: sqlite3.Connection, tables: set[str] | None) -> Iterator[None]:
+    # A connection's data_version ignores its own commits, so an unchanged value across the write shows that
+    # no other connection committed in between. Commits on conn when the block exits.
+    cache = _lookup(sqlite_path)
+    before = data_version(conn)
+    if cache is not None:
+        cache.begin_write()
+    yield
+    conn.commit()
+    if cache is not None:
+        cache.note_write(tables, confirm=lambda: data_version(conn) == before)
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import time
+from collections.abc import Callable
+from contextlib import closing
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING, Any
+
+from core.tracing import utc_now_iso
+from core.types import RunStatus, RunTrace, ToolCallRecord, ToolCallStatus
+
+from .query_cache import own_write
+
+if TYPE_CHECKING:
+    from .long_term import LongTermMemory
+
+# Settings that change where or how a run is served, not what it computes.
+_VOLATILE_PREFIXES = ("service_", "job_", "run_cache_", "log_", "db_read_pool", "tool_replay", "tool_cassette", "tool_memo", "plan_cache", "eval_")
+_VOLATILE_SUFFIXES = ("_dir", "_path")
+
+# Tables read by cached db_query results, per database, so a write can drop the dependent entries.
+_WATCHED: dict[str, set[str]] = {}
+_WATCHED_LOCK = Lock()
+
+
+def normalize_goal(raw_goal: str) -> str:
+    return " ".join(raw_goal.split())
+
+
+def config_fingerprint(config: Any) -> str:
+    data = config.model_dump(mode="json") if hasattr(config, "model_dump") else dict(config)
+    stable = {
+        k: v
+        for k, v in sorted(data.items())
+        if not k.startswith(_VOLATILE_PREFIXES) and not k.endswith(_VOLATILE_SUFFIXES)
+    }
+    return hashlib.sha256(json.dumps(stable, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def run_cache_key(raw_goal: str, context: dict[str, Any] | None, config: Any) -> str:
+    payload = {"goal": normalize_goal(raw_goal), "context": context or {}, "config": config_fingerprint(config)}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def call_dependencies(call: ToolCallRecord, cacheable: Callable[[str], bool]) -> list[str] | None:
+    # None means the call's outcome cannot be reused; otherwise the tables it read (empty for pure tools).
+    if not cacheable(call.tool_name):
+        return None
+    if call.tool_name != "db_query":
+        return []
+    tables = ((call.result or {}).get("data") or {}).get("tables") or []
+    if not call.validated_args.get("readonly", True) or not tables:
+        return None
+    return list(tables)
+
+
+def _watch(sqlite_path: Path, tables: list[str]) -> None:
+    with _WATCHED_LOCK:
+        _WATCHED.setdefault(str(Path(sqlite_path).resolve()), set()).update(tables)
+
+
+def note_table_write(sqlite_path: Path, tables: set[str] | None) -> None:
+    key = str(Path(sqlite_path).resolve())
+    with _WATCHED_LOCK:
+        watched = _WATCHED.get(key)
+        if not watched:
+            return
+        hit = set(watched) if tables is None else watched & tables
+        if not hit:
+            return
+        watched.difference_update(hit)
+    # A direct connection: going through LongTermMemory.execute would re-enter this hook.
+    with closing(sqlite3.connect(key)) as conn, own_write(Path(key), conn, {"run_cache", "run_cache_deps"}):
+        conn.executemany(
+            "DELETE FROM run_cache WHERE cache_key IN (SELECT cache_key FROM run_cache_deps WHERE table_name = ?)",
+            [[t] for t in hit],
+        )
+        conn.executemany("DELETE FROM run_cache_deps WHERE table_name = ?", [[t] for t in hit])
+
+
+class RunCache:
+    def __init__(self, long_term_memory: LongTermMemory, ttl_s: float = 3600.0, clock: Callable[[], float] = time.time) -> None:
+        self.ltm = long_term_memory
+        self.ttl_s = ttl_s
+        self._clock = clock
+        rows = self.ltm.query("SELECT DISTINCT table_name FROM run_cache_deps")
+        _watch(self.ltm.sqlite_path, [r["table_name"] for r in rows])
+
+    def get(self, cache_key: str) -> dict[str, Any] | None:
+        rows = self.ltm.query("SELECT run_id, reusable, expires_at FROM run_cache WHERE cache_key = ?", [cache_key])
+        if not rows:
+            return None
+        if rows[0]["expires_at"] <= self._clock():
+            self.invalidate(cache_key)
+            return None
+        return {"run_id": rows[0]["run_id"], "reusable": bool(rows[0]["reusable"])}
+
+    def put(self, cache_key: str, trace: RunTrace, cacheable: Callable[[str], bool]) -> bool:
+        # Only completed runs are remembered: a retried failure should really be retried.
+        if trace.status != RunStatus.COMPLETED:
+            return False
+        deps = [call_dependencies(c, cacheable) for c in trace.tool_calls]
+        reusable = all(d is not None for d in deps)
+        tables = sorted({t for d in deps if d for t in d})
+        self.ltm.execute(
+            "INSERT OR REPLACE INTO run_cache(cache_key, run_id, reusable, expires_at, created_at) VALUES(?,?,?,?,?)",
+            [cache_key, trace.run_id, 1 if reusable else 0, self._clock() + self.ttl_s, utc_now_iso()],
+        )
+        self.ltm.execute("DELETE FROM run_cache_deps WHERE cache_key = ?", [cache_key])
+        for table in tables:
+            self.ltm.execute("INSERT INTO run_cache_deps(cache_key, table_name) VALUES(?,?)", [cache_key, table])
+        _watch(self.ltm.sqlite_path, tables)
+        return True
+
+    def invalidate(self, cache_key: str | None = None, tables: list[str] | None = None) -> int:
+        if tables:
+            marks = ",".join("?" for _ in tables)
+            keys = [
+                r["cache_key"]
+                for r in self.ltm.query(f"SELECT DISTINCT cache_key FROM run_cache_deps WHERE table_name IN ({marks})", tables)
+            ]
+        elif cache_key is not None:
+            keys = [cache_key]
+        else:
+            keys = [r["cache_key"] for r in self.ltm.query("SELECT cache_key FROM run_cache")]
+        for key in keys:
+            self.ltm.execute("DELETE FROM run_cache_deps WHERE cache_key = ?", [key])
+            self.ltm.execute("DELETE FROM run_cache WHERE cache_key = ?", [key])
+        return len(keys)
+
+    @staticmethod
+    def reusable_calls(trace: RunTrace, cacheable: Callable[[str], bool]) -> list[ToolCallRecord]:
+        return [
+            call
+            for call in trace.tool_calls
+            if call.status == ToolCallStatus.SUCCESS and call.result is not None and call_dependencies(call, cacheable) is not None
+        ]
+
+
+def run_cache_from_config(config: Any, long_term_memory: LongTermMemory) -> RunCache | None:
+    if not getattr(config, "run_cache_enabled", False):
+        return None
+    return RunCache(long_term_memory, ttl_s=config.run_cache_ttl_s)
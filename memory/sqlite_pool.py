@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import queue
+import sqlite3
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+from core.exceptions import QueryBudgetExceeded
+
+_PROGRESS_GRANULARITY = 1000
+
+
+@dataclass
+class QueryBudget:
+    timeout_s: float | None = None
+    max_vm_steps: int | None = None
+    max_rows: int | None = None
+    max_bytes: int | None = None
+
+
+@dataclass
+class QueryPage:
+    columns: list[str]
+    rows: list[tuple[Any, ...]] = field(default_factory=list)
+    has_more: bool = False
+    truncated_by: str | None = None
+    bytes_read: int = 0
+    vm_steps: int = 0
+    from_cache: bool = False
+    tables: tuple[str, ...] = ()
+
+
+def _row_bytes(row: tuple[Any, ...]) -> int:
+    size = 0
+    for value in row:
+        if isinstance(value, (str, bytes)):
+            size += len(value)
+        else:
+            size += 8
+    return size
+
+
+def fetch_page(
+    conn: sqlite3.Connection,
+    sql: str,
+    params: list[Any] | tuple[Any, ...] | None,
+    limit: int | None,
+    budget: QueryBudget | None = None,
+    tables: set[str] | None = None,
+) -> QueryPage:
+    budget = budget or QueryBudget()
+    deadline = time.monotonic() + budget.timeout_s if budget.timeout_s else None
+    state = {"steps": 0, "tripped": None}
+
+    def on_progress() -> int:
+        state["steps"] += _PROGRESS_GRANULARITY
+        if deadline is not None and time.monotonic() > deadline:
+            state["tripped"] = "wall_clock"
+            return 1
+        if budget.max_vm_steps and state["steps"] > budget.max_vm_steps:
+            state["tripped"] = "vm_steps"
+            return 1
+        return 0
+
+    caps = [x for x in (limit, budget.max_rows) if x]
+    row_cap = min(caps) if caps else None
+    # One row past the cap is enough to tell whether more remain.
+    batch_size = row_cap + 1 if row_cap is not None else 256
+
+    def on_authorize(action: int, arg1: str | None, *_: Any) -> int:
+        if action == sqlite3.SQLITE_READ and arg1:
+            tables.add(arg1.lower())
+        return sqlite3.SQLITE_OK
+
+    conn.set_progress_handler(on_progress, _PROGRESS_GRANULARITY)
+    if tables is not None:
+        conn.set_authorizer(on_authorize)
+    try:
+        cur = conn.execute(sql, params or [])
+        page = QueryPage(columns=[d[0] for d in cur.description or []])
+        while True:
+            batch = cur.fetchmany(batch_size)
+            if not batch:
+                break
+            for row in batch:
+                row = tuple(row)
+                if row_cap is not None and len(page.rows) >= row_cap:
+                    page.has_more = True
+                    if limit is None or row_cap < limit:
+                        page.truncated_by = "max_rows"
+                    break
+                size = _row_bytes(row)
+                if budget.max_bytes and page.bytes_read + size > budget.max_bytes and page.rows:
+                    page.has_more = True
+                    page.truncated_by = "max_bytes"
+                    break
+                page.rows.append(row)
+                page.bytes_read += size
+            if page.has_more:
+                break
+    except sqlite3.OperationalError as exc:
+        if state["tripped"]:
+            raise QueryBudgetExceeded(
+                f"query exceeded {state['tripped']} budget",
+                budget=state["tripped"],
+                diagnostics={"vm_steps": state["steps"], "timeout_s": budget.timeout_s, "max_vm_steps": budget.max_vm_steps},
+            ) from exc
+        raise
+    finally:
+        conn.set_progress_handler(None, 0)
+        if tables is not None:
+            conn.set_authorizer(None)
+    page.vm_steps = state["steps"]
+    return page
+
+
+class ReadOnlyPool:
+    def __init__(self, sqlite_path: Path, size: int = 4) -> None:
+        self.uri = f"{Path(sqlite_path).resolve().as_uri()}?mode=ro"
+        self.size = max(1, size)
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._opened = 0
+        self._lock = Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn: sqlite3.Connection | None = None
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                if self._opened < self.size:
+                    conn = self._open()
+                    self._opened += 1
+            if conn is None:
+                conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        # Only idle connections are closed; checked-out ones stay counted and return to the pool when released.
+        with self._lock:
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                conn.close()
+                self._opened -= 1
+
+
+_POOLS: dict[str, ReadOnlyPool] = {}
+_POOLS_LOCK = Lock()
+
+
+def get_read_pool(sqlite_path: Path, size: int = 4) -> ReadOnlyPool:
+    key = str(Path(sqlite_path).resolve())
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = _POOLS[key] = ReadOnlyPool(Path(key), size=size)
+        return pool
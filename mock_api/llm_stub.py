@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import random
+import re
+from collections import Counter
+from collections.abc import AsyncIterator
+from typing import Any
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+from core.config import load_config
+from execution.tool_registry import ToolRegistry
+from llm.heuristic_provider import HeuristicProvider
+from perception.agent import PerceptionAgent
+from planning.planner import PlannerAgent
+
+_SUMMARY_HEADER = re.compile(r"^Summarize the following in at most (\d+) sentences\.\s*", re.IGNORECASE)
+
+
+class StubSettings(BaseModel):
+    latency_p50_ms: float = 40.0
+    latency_p99_ms: float = 250.0
+    stream_chunks: int = 8
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after_s: float = 0.5
+    malformed_rate: float = 0.0
+    seed: int | None = None
+
+    @classmethod
+    def from_env(cls) -> "StubSettings":
+        values: dict[str, Any] = {}
+        for name in cls.model_fields:
+            raw = os.getenv(f"MAOO_LLM_STUB_{name.upper()}")
+            if raw not in (None, ""):
+                values[name] = raw
+        return cls.model_validate(values)
+
+
+class _Stub:
+    def __init__(self, settings: StubSettings) -> None:
+        self.settings = settings
+        self.rng = random.Random(settings.seed)
+        self.counters: Counter[str] = Counter()
+        config = load_config({"no_llm_mode": True, "log_to_file": False})
+        self.heuristic = HeuristicProvider(config)
+        self.perception = PerceptionAgent(self.heuristic)
+        self.planner = PlannerAgent(config)
+        registry = ToolRegistry()
+        registry.register_defaults()
+        self.catalog = registry.catalog()
+
+    def latency_s(self) -> float:
+        # Lognormal fitted to the configured p50/p99 (z_0.99 ~= 2.326).
+        p50 = max(self.settings.latency_p50_ms, 0.001)
+        p99 = max(self.settings.latency_p99_ms, p50)
+        sigma = math.log(p99 / p50) / 2.326
+        return self.rng.lognormvariate(math.log(p50), sigma) / 1000.0
+
+    def content_for(self, body: dict[str, Any]) -> str:
+        prompt = str((body.get("messages") or [{}])[-1].get("content", ""))
+        schema_name = ((body.get("response_format") or {}).get("json_schema") or {}).get("name")
+        if schema_name == "PerceptionResult":
+            return self.perception.run(prompt).model_dump_json()
+        if schema_name == "Plan":
+            perception = self.perception.run(prompt)
+            return self.planner.build_plan(perception, self.catalog, scratchpad={}).model_dump_json()
+        match = _SUMMARY_HEADER.match(prompt)
+        max_sentences = int(match.group(1)) if match else 3
+        text = prompt[match.end() :] if match else prompt
+        return self.heuristic.generate_text(text, text=text, max_sentences=max_sentences)
+
+    def malform(self, content: str) -> str:
+        if self.rng.random() < 0.5:
+            return f"Sure, here is the result:\n{content}\nLet me know if you need anything else."
+        return content[: max(1, len(content) // 2)]
+
+
+def _usage(prompt: str, content: str) -> dict[str, int]:
+    prompt_tokens = max(1, len(prompt) // 4)
+    completion_tokens = max(1, len(content) // 4)
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+
+
+def create_llm_stub_app(settings: StubSettings | None = None) -> FastAPI:
+    stub = _Stub(settings or StubSettings.from_env())
+    app = FastAPI(title="MAOO LLM Stub", version="0.1.0")
+    app.state.stub = stub
+
+    @app.get("/health")
+    def health() -> dict[str, object]:
+        return {"ok": True, "service": "llm-stub"}
+
+    @app.get("/stats")
+    def stats() -> dict[str, int]:
+        return dict(stub.counters)
+
+    @app.post("/reset")
+    def reset() -> dict[str, bool]:
+        stub.counters.clear()
+        return {"ok": True}
+
+    @app.post("/chat/completions")
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        cfg = stub.settings
+        stub.counters["requests"] += 1
+        roll = stub.rng.random()
+        if roll < cfg.rate_limit_rate:
+            stub.counters["rate_limited"] += 1
+            return JSONResponse(
+                {"error": {"message": "rate limited", "type": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"Retry-After": str(cfg.retry_after_s)},
+            )
+        if roll < cfg.rate_limit_rate + cfg.error_rate:
+            stub.counters["errors"] += 1
+            return JSONResponse({"error": {"message": "injected failure", "type": "server_error"}}, status_code=500)
+
+        prompt = str((body.get("messages") or [{}])[-1].get("content", ""))
+        content = stub.content_for(body)
+        if stub.rng.random() < cfg.malformed_rate:
+            stub.counters["malformed"] += 1
+            content = stub.malform(content)
+        usage = _usage(prompt, content)
+        delay = stub.latency_s()
+        model = body.get("model", "stub")
+
+        if not body.get("stream"):
+            await asyncio.sleep(delay)
+            stub.counters["completed"] += 1
+            return {
+                "id": f"stub-{stub.counters['requests']}",
+                "object": "chat.completion",
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage,
+            }
+
+        pieces = max(1, cfg.stream_chunks)
+        step = max(1, math.ceil(len(content) / pieces))
+
+        async def events() -> AsyncIterator[bytes]:
+            for start in range(0, len(content), step):
+                await asyncio.sleep(delay / pieces)
+                chunk = {"object": "chat.completion.chunk", "model": model, "choices": [{"index": 0, "delta": {"content": content[start : start + step]}}]}
+                yield f"data: {json.dumps(chunk)}\n\n".encode("utf-8")
+            yield f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n".encode("utf-8")
+            yield b"data: [DONE]\n\n"
+            stub.counters["completed"] += 1
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    port = int(os.getenv("MAOO_LLM_STUB_PORT", "8002"))
+    uvicorn.run(create_llm_stub_app(), host="0.0.0.0", port=port, reload=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+# Every substring any perception stage or the planner tests the lower-cased goal for.
+KEYWORDS = (
+    "fetch",
+    "get",
+    "retrieve",
+    "post",
+    "submit",
+    "flaky",
+    "slow",
+    "malformed",
+    "http",
+    "db",
+    "database",
+    "sql",
+    "write",
+    "save",
+    "file",
+    "calc",
+    "calculate",
+    "multiply",
+    "summary",
+    "summarize",
+    "non-existent tool",
+    "invalid args",
+    "example.com",
+    "delete row",
+    "drop table",
+    "long plan",
+    "budget test",
+    "early stop",
+    "strict json",
+    "safe exit",
+    "../",
+    "..\\",
+)
+
+_URL = re.compile(r"https?://[^\s]+")
+_EXPRESSION = re.compile(r"calc(?:ulate)?[:\s]+([0-9\+\-\*\/\(\)\.\s%]+)")
+_SUM_WORD = re.compile(r"\bsum\b")
+
+
+@dataclass(frozen=True)
+class GoalFeatures:
+    raw: str
+    lower: str
+    keywords: frozenset[str]
+    urls: tuple[str, ...]
+    expression: str | None
+    sum_word: bool
+    # classify_task only counts a space-delimited "sum", unlike the \bsum\b the extractor uses.
+    sum_spaced: bool
+    # Checked against the original text: identifiers are case-sensitive.
+    dunder_import: bool
+
+    def has(self, *keywords: str) -> bool:
+        return any(k in self.keywords for k in keywords)
+
+
+@lru_cache(maxsize=256)
+def goal_features(raw_goal: str) -> GoalFeatures:
+    lower = raw_goal.lower()
+    # One scan per keyword in C beats a regex alternation (or a Python-level automaton) over this small
+    # vocabulary; what the stages were paying for was repeating it, which the cache removes.
+    keywords = frozenset(k for k in KEYWORDS if k in lower)
+    expression = None
+    if keywords & {"calc", "calculate"}:
+        match = _EXPRESSION.search(lower)
+        expression = match.group(1).strip() if match else None
+    return GoalFeatures(
+        raw=raw_goal,
+        lower=lower,
+        keywords=keywords,
+        urls=tuple(_URL.findall(raw_goal)) if "http" in keywords else (),
+        expression=expression,
+        sum_word="sum" in lower and _SUM_WORD.search(lower) is not None,
+        sum_spaced=" sum " in f" {lower} ",
+        dunder_import="__import__" in raw_goal,
+    )
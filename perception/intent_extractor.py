@@ -1,68 +1,70 @@
 from __future__ import annotations
 
-import re
 from typing import Any
 
+from .features import goal_features
+
 
 def extract_intent_and_entities(raw_goal: str, context: dict[str, Any] | None = None) -> tuple[str, dict[str, Any]]:
     context = context or {}
-    lower = raw_goal.lower()
+    features = goal_features(raw_goal)
     entities: dict[str, Any] = {"raw_goal": raw_goal}
 
-    url_match = re.search(r"https?://[^\s]+", raw_goal)
-    if url_match:
-        entities["url"] = url_match.group(0)
+    urls = list(features.urls)
+    if urls:
+        entities["url"] = urls[0]
+    if len(urls) > 1:
+        entities["urls"] = urls
 
-    if any(t in lower for t in ["save", "write"]):
+    if features.has("save", "write"):
         entities["write_requested"] = True
-    if any(t in lower for t in ["summary", "summarize"]):
+    if features.has("summary", "summarize"):
         entities["summarize_requested"] = True
-    if any(t in lower for t in ["calc", "calculate", "multiply"]) or re.search(r"\bsum\b", lower):
+    if features.has("calc", "calculate", "multiply") or features.sum_word:
         entities["calc_requested"] = True
-        expr_match = re.search(r"calc(?:ulate)?[:\s]+([0-9\+\-\*\/\(\)\.\s%]+)", lower)
-        if expr_match:
-            entities["expression"] = expr_match.group(1).strip()
-    if any(t in lower for t in ["db", "database", "sql"]):
+        if features.expression is not None:
+            entities["expression"] = features.expression
+    if features.has("db", "database", "sql"):
         entities["db_requested"] = True
 
-    if "flaky" in lower:
+    if features.has("flaky"):
         entities["endpoint_mode"] = "flaky"
-    if "slow" in lower:
+    if features.has("slow"):
         entities["endpoint_mode"] = "slow"
-    if "malformed" in lower:
+    if features.has("malformed"):
         entities["endpoint_mode"] = "malformed"
 
-    if "non-existent tool" in lower:
+    if features.has("non-existent tool"):
         entities["force_invalid_tool"] = True
-    if "invalid args" in lower:
+    if features.has("invalid args"):
         entities["force_invalid_args"] = True
-    if "example.com" in lower:
+    if features.has("example.com"):
         entities["external_url"] = "http://example.com"
-    if "delete row" in lower or "drop table" in lower:
+    if features.has("delete row", "drop table"):
         entities["unsafe_sql"] = True
-    if "../" in raw_goal or "..\\" in raw_goal:
+    if features.has("../", "..\\"):
         entities["unsafe_path"] = True
-    if "__import__" in raw_goal:
+    if features.dunder_import:
         entities["unsafe_calc"] = True
-    if "long plan" in lower:
+    if features.has("long plan"):
         entities["force_long_plan"] = True
-    if "budget test" in lower:
+    if features.has("budget test"):
         entities["force_budget_heavy"] = True
-    if "early stop" in lower:
+    if features.has("early stop"):
         entities["force_extra_steps_after_success"] = True
 
     if context:
         entities["context"] = context
 
-    if any(t in lower for t in ["post", "submit"]):
+    if features.has("post", "submit"):
         intent = "submit data and inspect response"
-    elif any(t in lower for t in ["fetch", "get", "retrieve", "flaky", "slow", "malformed"]):
+    elif features.has("fetch", "get", "retrieve", "flaky", "slow", "malformed"):
         intent = "retrieve data"
-    elif "db" in lower or "sql" in lower:
+    elif features.has("db", "sql"):
         intent = "query database"
-    elif any(t in lower for t in ["calc", "calculate"]) or re.search(r"\bsum\b", lower):
+    elif features.has("calc", "calculate") or features.sum_word:
         intent = "calculate a value"
-    elif "summarize" in lower:
+    elif features.has("summarize"):
         intent = "summarize content"
     else:
         intent = "orchestrate a multi-step task"
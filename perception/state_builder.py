@@ -4,6 +4,8 @@ from typing import Any
 
 from core.types import TaskType
 
+from .features import goal_features
+
 
 def build_state(
     raw_goal: str,
@@ -14,13 +16,13 @@ def build_state(
     constraints = ["use allowlisted tools only", "no destructive actions"]
     success_criteria: list[str] = []
     initial_state = {"raw_goal": raw_goal, "context": context or {}, "task_type": task_type.value}
-    lower = raw_goal.lower()
+    features = goal_features(raw_goal)
 
     http_requested = bool(
         entities.get("url")
         or entities.get("external_url")
         or entities.get("endpoint_mode")
-        or any(t in lower for t in ["fetch", "get", "post", "submit", "http"])
+        or features.has("fetch", "get", "post", "submit", "http")
     )
     if http_requested or task_type in {TaskType.DATA_RETRIEVAL, TaskType.DATA_SUBMISSION}:
         success_criteria.append("http result captured")
@@ -35,9 +37,9 @@ def build_state(
     if not success_criteria:
         success_criteria.append("produce final output")
 
-    if "strict json" in raw_goal.lower():
+    if features.has("strict json"):
         constraints.append("expect structured json responses")
-    if "safe exit" in raw_goal.lower():
+    if features.has("safe exit"):
         constraints.append("stop safely on repeated failures")
 
     initial_state["entities"] = entities
@@ -2,20 +2,21 @@ from __future__ import annotations
 
 from core.types import TaskType
 
+from .features import goal_features
+
 
 def classify_task(raw_goal: str) -> TaskType:
-    lower = raw_goal.lower()
-    has_sum_word = " sum " in f" {lower} "
+    features = goal_features(raw_goal)
     flags = {
-        "http": any(t in lower for t in ["fetch", "get", "post", "submit", "flaky", "slow", "malformed", "http"]),
-        "db": any(t in lower for t in ["db", "database", "sql"]),
-        "file": any(t in lower for t in ["write", "save", "file"]),
-        "calc": any(t in lower for t in ["calc", "calculate", "multiply"]) or has_sum_word,
-        "summary": any(t in lower for t in ["summary", "summarize"]),
+        "http": features.has("fetch", "get", "post", "submit", "flaky", "slow", "malformed", "http"),
+        "db": features.has("db", "database", "sql"),
+        "file": features.has("write", "save", "file"),
+        "calc": features.has("calc", "calculate", "multiply") or features.sum_spaced,
+        "summary": features.has("summary", "summarize"),
     }
     if sum(1 for v in flags.values() if v) > 1:
         return TaskType.COMPOSITE
-    if flags["http"] and any(t in lower for t in ["post", "submit"]):
+    if flags["http"] and features.has("post", "submit"):
         return TaskType.DATA_SUBMISSION
     if flags["http"]:
         return TaskType.DATA_RETRIEVAL
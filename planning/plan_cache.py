@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from copy import deepcopy
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any
+from urllib.parse import urlparse
+
+from core.exceptions import PlanValidationError, PolicyViolationError
+from core.types import PerceptionResult, Plan, ValidatedPlan
+from execution.tool_registry import ToolRegistry
+from perception.features import goal_features
+
+from .planner import GOAL_KEYWORDS, PlannerAgent
+from .policy import PolicyEngine
+
+_HTTP_TOOLS = {"http_get", "http_post"}
+
+
+def _origin(url: Any) -> str:
+    parsed = urlparse(str(url))
+    return f"{parsed.scheme}://{parsed.hostname or ''}"
+
+
+def perception_signature(perception: PerceptionResult) -> tuple[Any, ...]:
+    # Everything the planner and policy branch on; the concrete URLs and expression are bound per request.
+    entities = perception.entities
+    keywords = goal_features(str(entities.get("raw_goal", ""))).keywords
+    url = entities.get("url")
+    urls = [str(u) for u in entities.get("urls") or []]
+    return (
+        perception.task_type.value,
+        tuple(sorted(k for k, v in entities.items() if v is True)),
+        entities.get("endpoint_mode"),
+        entities.get("external_url"),
+        _origin(url) if url else None,
+        "/submit" in str(url or ""),
+        tuple(_origin(u) for u in urls),
+        "expression" in entities,
+        tuple(k for k in GOAL_KEYWORDS if k in keywords),
+    )
+
+
+@dataclass
+class PlanTemplate:
+    plan: Plan
+    notes: list[str]
+    # (step index, path into tool_args, entity name, index into that entity's list or None)
+    slots: list[tuple[int, tuple[Any, ...], str, int | None]] = field(default_factory=list)
+
+
+def _find_slots(plan: Plan, entities: dict[str, Any]) -> list[tuple[int, tuple[Any, ...], str, int | None]]:
+    slots: list[tuple[int, tuple[Any, ...], str, int | None]] = []
+    url = entities.get("url")
+    urls = [str(u) for u in entities.get("urls") or []]
+    expression_bound = False
+    for index, step in enumerate(plan.steps):
+        args = step.tool_args
+        if step.tool_name in _HTTP_TOOLS and url and args.get("url") == url:
+            slots.append((index, ("url",), "url", None))
+        elif step.tool_name == "http_get_many":
+            for i, item in enumerate(args.get("requests") or []):
+                if i < len(urls) and item.get("url") == urls[i]:
+                    slots.append((index, ("requests", i, "url"), "urls", i))
+        elif step.tool_name == "calc" and not expression_bound and "expression" in entities:
+            # Only the first calc step carries the requested expression; later ones are planner constants.
+            if args.get("expression") == entities["expression"]:
+                slots.append((index, ("expression",), "expression", None))
+            expression_bound = True
+    return slots
+
+
+def _copy_args(args: dict[str, Any]) -> dict[str, Any]:
+    return {k: deepcopy(v) if isinstance(v, (dict, list)) else v for k, v in args.items()}
+
+
+class PlanCache:
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[Any, ...], PlanTemplate] = OrderedDict()
+        self._lock = Lock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0}
+
+    @staticmethod
+    def _key(perception: PerceptionResult, registry: ToolRegistry, policy: PolicyEngine) -> tuple[Any, ...]:
+        # Re-registering a tool or changing the policy settings yields new keys, so stale templates just age out.
+        return (perception_signature(perception), registry.version, policy.fingerprint())
+
+    def lookup(
+        self,
+        perception: PerceptionResult,
+        planner: PlannerAgent,
+        registry: ToolRegistry,
+        policy: PolicyEngine,
+    ) -> ValidatedPlan | None:
+        if self.max_entries <= 0:
+            return None
+        key = self._key(perception, registry, policy)
+        with self._lock:
+            template = self._entries.get(key)
+            if template is not None:
+                self._entries.move_to_end(key)
+            self.stats["hits" if template is not None else "misses"] += 1
+        if template is None:
+            return None
+        return ValidatedPlan(plan=self._bind(template, perception, planner, policy))
+
+    def store(
+        self,
+        perception: PerceptionResult,
+        plan: Plan,
+        planner: PlannerAgent,
+        registry: ToolRegistry,
+        policy: PolicyEngine,
+    ) -> None:
+        if self.max_entries <= 0 or not plan.steps:
+            return
+        recalled = planner.recall_notes(str(perception.entities.get("raw_goal", "")))
+        template = PlanTemplate(
+            plan=plan.model_copy(deep=True),
+            notes=plan.planner_notes[len(recalled) :],
+            slots=_find_slots(plan, perception.entities),
+        )
+        key = self._key(perception, registry, policy)
+        with self._lock:
+            self._entries[key] = template
+            self._entries.move_to_end(key)
+            self.stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _bind(self, template: PlanTemplate, perception: PerceptionResult, planner: PlannerAgent, policy: PolicyEngine) -> Plan:
+        entities = perception.entities
+        steps = [step.model_copy(update={"tool_args": _copy_args(step.tool_args)}) for step in template.plan.steps]
+        bound: set[int] = set()
+        for index, path, name, item in template.slots:
+            value = entities[name] if item is None else entities[name][item]
+            target = steps[index].tool_args
+            for part in path[:-1]:
+                target = target[part]
+            target[path[-1]] = value
+            bound.add(index)
+        if planner.timeouts is not None:
+            # Adaptive timeouts move as latencies are learned, so they are re-derived rather than cached.
+            for step in steps:
+                if step.tool_name in _HTTP_TOOLS:
+                    step.tool_args["timeout_s"] = planner.initial_timeout(step.tool_name, step.tool_args["url"])
+                elif step.tool_name == "http_get_many":
+                    for item in step.tool_args.get("requests") or []:
+                        item["timeout_s"] = planner.initial_timeout("http_get_many", item["url"])
+        for index in sorted(bound):
+            # Bound values keep their validated types, but policy is value-dependent (e.g. calc expressions).
+            try:
+                policy.validate_step(steps[index])
+            except PolicyViolationError as exc:
+                raise PlanValidationError(
+                    str(exc), {"step_id": steps[index].step_id, **getattr(exc, "diagnostics", {})}
+                ) from exc
+        plan = template.plan
+        return Plan(
+            steps=steps,
+            max_steps=plan.max_steps,
+            max_retries_per_step=plan.max_retries_per_step,
+            budget_guard=plan.budget_guard.model_copy(),
+            planner_notes=planner.recall_notes(str(entities.get("raw_goal", ""))) + list(template.notes),
+        )
+
+
+def plan_cache_from_config(config: Any) -> PlanCache | None:
+    if getattr(config, "plan_cache_max_entries", 0) <= 0:
+        return None
+    return PlanCache(max_entries=config.plan_cache_max_entries)
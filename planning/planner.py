@@ -3,15 +3,38 @@ from __future__ import annotations
 from typing import Any
 
 from core.config import Config
-from core.types import BudgetGuard, PerceptionResult, Plan, PlanStep, ToolCatalogEntry
+from core.types import BudgetGuard, PerceptionResult, Plan, PlanDelta, PlanStep, ToolCatalogEntry
 from memory.long_term import LongTermMemory
 from memory.retrieval import retrieve_memory
+from perception.features import goal_features
+
+
+# Every substring of the goal that build_plan branches on; plan templates are keyed on which of them occur.
+GOAL_KEYWORDS = (
+    "fetch",
+    "get",
+    "post",
+    "submit",
+    "flaky",
+    "slow",
+    "malformed",
+    "db",
+    "database",
+    "sql",
+    "calc",
+    "calculate",
+    "write",
+    "save",
+    "summary",
+    "summarize",
+)
 
 
 class PlannerAgent:
-    def __init__(self, config: Config, long_term_memory: LongTermMemory | None = None) -> None:
+    def __init__(self, config: Config, long_term_memory: LongTermMemory | None = None, timeouts: Any = None) -> None:
         self.config = config
         self.long_term_memory = long_term_memory
+        self.timeouts = timeouts
 
     def build_plan(
         self,
@@ -21,16 +44,11 @@ class PlannerAgent:
     ) -> Plan:
         scratchpad = scratchpad or {}
         raw_goal = str(perception.entities.get("raw_goal", ""))
-        lower = raw_goal.lower()
+        features = goal_features(raw_goal)
         steps: list[PlanStep] = []
-        notes: list[str] = []
+        notes: list[str] = self.recall_notes(raw_goal)
         tool_names = {t.name for t in tool_catalog}
 
-        if self.long_term_memory:
-            recalled = retrieve_memory(self.long_term_memory, "facts", raw_goal, limit=2)
-            if recalled:
-                notes.append(f"Retrieved {len(recalled)} prior memory entries")
-
         failure_context = scratchpad.get("failure_context") or {}
         if failure_context:
             notes.append(f"Replanning after {failure_context.get('failure_type')} on {failure_context.get('step_id')}")
@@ -67,23 +85,24 @@ class PlannerAgent:
         def next_step_id() -> str:
             return f"s{len(steps)+1}"
 
-        def mock_url_for(lower_text: str) -> str:
+        def mock_url_for(keywords: frozenset[str]) -> str:
             base = self.config.mock_api_base_url.rstrip("/")
-            if "flaky" in lower_text:
+            if "flaky" in keywords:
                 return f"{base}/flaky?fail_first=1&key=demo"
-            if "slow" in lower_text:
+            if "slow" in keywords:
                 return f"{base}/slow?delay_ms=1500"
-            if "malformed" in lower_text:
+            if "malformed" in keywords:
                 return f"{base}/malformed?kind=json_text"
-            if "post" in lower_text or "submit" in lower_text:
+            if "post" in keywords or "submit" in keywords:
                 return f"{base}/submit"
             return f"{base}/data"
 
         http_url = perception.entities.get("url") or perception.entities.get("external_url")
-        if not http_url and any(t in lower for t in ["fetch", "get", "post", "submit", "flaky", "slow", "malformed"]):
-            http_url = mock_url_for(lower)
+        if not http_url and features.has("fetch", "get", "post", "submit", "flaky", "slow", "malformed"):
+            http_url = mock_url_for(features.keywords)
 
-        if "post" in lower or "submit" in lower:
+        submitting = features.has("post", "submit")
+        if submitting:
             if "http_post" in tool_names:
                 steps.append(
                     PlanStep(
@@ -91,9 +110,9 @@ class PlannerAgent:
                         objective="Submit data to API",
                         tool_name="http_post",
                         tool_args={
-                            "url": http_url or mock_url_for("submit"),
+                            "url": http_url or mock_url_for(frozenset({"submit"})),
                             "json_body": {"message": "hello from maoo"},
-                            "timeout_s": self.config.default_http_timeout_s,
+                            "timeout_s": self.initial_timeout("http_post", http_url or mock_url_for(frozenset({"submit"}))),
                             "expect_json": True,
                         },
                         expected_observation="submission response captured",
@@ -101,10 +120,27 @@ class PlannerAgent:
                     )
                 )
 
-        if http_url and "http_get" in tool_names and not ("/submit" in str(http_url) and ("post" in lower or "submit" in lower)):
-            fallback = "replan_to_alternate_endpoint" if "malformed" in lower else "retry_with_backoff"
-            args = {"url": http_url, "timeout_s": self.config.default_http_timeout_s, "expect_json": True}
-            if "malformed" in lower:
+        batch_urls = [str(u) for u in perception.entities.get("urls") or []]
+        if len(batch_urls) > 1 and "http_get_many" in tool_names and not submitting:
+            steps.append(
+                PlanStep(
+                    step_id=next_step_id(),
+                    objective=f"Fetch {len(batch_urls)} API endpoints concurrently",
+                    tool_name="http_get_many",
+                    tool_args={
+                        "requests": [{"url": u, "timeout_s": self.initial_timeout("http_get_many", u)} for u in batch_urls],
+                        "timeout_s": self.config.default_http_timeout_s,
+                    },
+                    expected_observation="per-item response bodies captured",
+                    fallback_strategy="retry_failed_items",
+                )
+            )
+            http_url = None
+
+        if http_url and "http_get" in tool_names and not ("/submit" in str(http_url) and submitting):
+            fallback = "replan_to_alternate_endpoint" if features.has("malformed") else "retry_with_backoff"
+            args = {"url": http_url, "timeout_s": self.initial_timeout("http_get", http_url), "expect_json": True}
+            if features.has("malformed"):
                 args["allow_malformed"] = False
             steps.append(
                 PlanStep(
@@ -117,7 +153,7 @@ class PlannerAgent:
                 )
             )
 
-        if perception.entities.get("db_requested") or any(t in lower for t in ["db", "database", "sql"]):
+        if perception.entities.get("db_requested") or features.has("db", "database", "sql"):
             sql = "SELECT id, label, value FROM demo_numbers ORDER BY id LIMIT 3"
             if perception.entities.get("unsafe_sql"):
                 sql = "DELETE FROM demo_numbers WHERE id = 1"
@@ -132,7 +168,7 @@ class PlannerAgent:
                 )
             )
 
-        if perception.entities.get("calc_requested") or any(t in lower for t in ["calc", "calculate"]):
+        if perception.entities.get("calc_requested") or features.has("calc", "calculate"):
             expr = perception.entities.get("expression", "2 + 2")
             if perception.entities.get("unsafe_calc"):
                 expr = "__import__('os').system('bad')"
@@ -147,7 +183,7 @@ class PlannerAgent:
                 )
             )
 
-        if perception.entities.get("write_requested") or any(t in lower for t in ["write", "save"]):
+        if perception.entities.get("write_requested") or features.has("write", "save"):
             rel_path = "../escape.txt" if perception.entities.get("unsafe_path") else "reports/output.txt"
             steps.append(
                 PlanStep(
@@ -160,7 +196,7 @@ class PlannerAgent:
                 )
             )
 
-        if perception.entities.get("summarize_requested") or "summary" in lower or "summarize" in lower or not steps:
+        if perception.entities.get("summarize_requested") or features.has("summary", "summarize") or not steps:
             steps.append(
                 PlanStep(
                     step_id=next_step_id(),
@@ -197,18 +233,49 @@ class PlannerAgent:
                 )
             )
 
-        if failure_context.get("failure_type") in {"schema_error", "bad_response"}:
-            for step in steps:
-                if step.tool_name == "http_get" and "/malformed" in str(step.tool_args.get("url", "")):
-                    step.tool_args["url"] = self.config.mock_api_base_url.rstrip("/") + "/data"
-                    notes.append("Replanned malformed endpoint to /data")
-        if failure_context.get("failure_type") == "timeout":
-            for step in steps:
-                if step.tool_name in {"http_get", "http_post"}:
-                    step.tool_args["timeout_s"] = max(float(step.tool_args.get("timeout_s", 2.0)), 3.5)
-                    notes.append("Increased timeout during replan")
+        for step in steps:
+            patch, note = self._repair_args(step, failure_context)
+            if patch:
+                step.tool_args.update(patch)
+                notes.append(note)
         return self._plan_with(steps, notes)
 
+    def recall_notes(self, raw_goal: str) -> list[str]:
+        if not self.long_term_memory:
+            return []
+        recalled = retrieve_memory(self.long_term_memory, "facts", raw_goal, limit=2)
+        return [f"Retrieved {len(recalled)} prior memory entries"] if recalled else []
+
+    def _repair_args(self, step: PlanStep, failure_context: dict[str, Any]) -> tuple[dict[str, Any], str]:
+        failure_type = failure_context.get("failure_type")
+        if failure_type in {"schema_error", "bad_response"}:
+            if step.tool_name == "http_get" and "/malformed" in str(step.tool_args.get("url", "")):
+                return {"url": self.config.mock_api_base_url.rstrip("/") + "/data"}, "Replanned malformed endpoint to /data"
+        if failure_type == "timeout" and step.tool_name in {"http_get", "http_post"}:
+            return {"timeout_s": max(float(step.tool_args.get("timeout_s", 2.0)), 3.5)}, "Increased timeout during replan"
+        return {}, ""
+
+    def replan_suffix(
+        self,
+        perception: PerceptionResult,
+        failed_step: PlanStep,
+        remaining_steps: list[PlanStep],
+        tool_catalog: list[ToolCatalogEntry],
+        scratchpad: dict[str, Any] | None = None,
+    ) -> PlanDelta:
+        # Only steps a repair actually touches are rebuilt; the completed prefix is never regenerated
+        # and untouched suffix steps are handed back as-is, so the executor has nothing to re-validate.
+        failure_context = (scratchpad or {}).get("failure_context") or {}
+        delta = PlanDelta()
+        for step in [failed_step, *remaining_steps]:
+            patch, note = self._repair_args(step, failure_context)
+            if patch:
+                step = step.model_copy(update={"tool_args": {**step.tool_args, **patch}})
+                delta.rebuilt_step_ids.append(step.step_id)
+                delta.notes.append(note)
+            delta.steps.append(step)
+        return delta
+
     def replan_remaining(
         self,
         perception: PerceptionResult,
@@ -216,9 +283,15 @@ class PlannerAgent:
         tool_catalog: list[ToolCatalogEntry],
         scratchpad: dict[str, Any] | None = None,
     ) -> list[PlanStep]:
-        scratchpad = scratchpad or {}
-        new_plan = self.build_plan(perception, tool_catalog, scratchpad=scratchpad)
-        return new_plan.steps if new_plan.steps else remaining_steps
+        if not remaining_steps:
+            return []
+        return self.replan_suffix(perception, remaining_steps[0], remaining_steps[1:], tool_catalog, scratchpad).steps
+
+    def initial_timeout(self, tool_name: str, url: str) -> float:
+        default = self.config.default_http_timeout_s
+        if self.timeouts is None:
+            return default
+        return self.timeouts.timeout_for(tool_name, str(url), default)
 
     def _plan_with(self, steps: list[PlanStep], notes: list[str]) -> Plan:
         return Plan(
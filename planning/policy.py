@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import ast
 import re
 from pathlib import Path
 from typing import Any
@@ -8,16 +7,31 @@ from urllib.parse import urlparse
 
 from core.config import Config
 from core.exceptions import PolicyViolationError
+from core.expressions import UnsafeExpressionError, compile_expression
 from core.types import PlanStep
 
+_SQL_FORBIDDEN = re.compile(r"\b(attach|detach|load_extension|vacuum)\b")
+_SQL_WRITE = re.compile(r"\b(insert|update|delete|create|drop|alter|reindex)\b")
+_SQL_QUOTED = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|`(?:[^`]|``)*`|\[[^\]]*\]")
+
 
 class PolicyEngine:
     def __init__(self, config: Config) -> None:
         self.config = config
 
+    def fingerprint(self) -> tuple[Any, ...]:
+        config = self.config
+        return (tuple(sorted(config.allowed_http_hosts)), config.enable_real_http, config.enable_db_writes)
+
     def validate_step(self, step: PlanStep) -> None:
         if step.tool_name in {"http_get", "http_post"}:
             self._validate_http(step.tool_args)
+        elif step.tool_name == "http_get_many":
+            requests = step.tool_args.get("requests") or []
+            if not requests:
+                raise PolicyViolationError("http_get_many requires at least one request")
+            for item in requests:
+                self._validate_http(item if isinstance(item, dict) else {"url": item})
         elif step.tool_name == "file_write":
             self._validate_file_path(step.tool_args.get("relative_path", ""))
         elif step.tool_name == "db_query":
@@ -47,8 +61,19 @@ class PolicyEngine:
 
     def _validate_sql(self, sql: str, readonly: bool = True) -> None:
         normalized = self._normalize_sql(sql)
-        if readonly and not (normalized.startswith("select") or normalized.startswith("pragma")):
-            raise PolicyViolationError("Read-only db_query only permits SELECT/PRAGMA", {"sql": sql})
+        statements = [part.strip() for part in self._strip_sql_literals(normalized).split(";") if part.strip()]
+        if len(statements) > 1:
+            raise PolicyViolationError("db_query permits a single statement", {"sql": sql})
+        body = statements[0] if statements else ""
+        if _SQL_FORBIDDEN.search(body):
+            raise PolicyViolationError("db_query statement is not permitted", {"sql": sql})
+        if readonly:
+            if not body.startswith(("select", "with", "pragma")):
+                raise PolicyViolationError("Read-only db_query only permits SELECT/WITH/PRAGMA", {"sql": sql})
+            if body.startswith("pragma") and "=" in body:
+                raise PolicyViolationError("Read-only db_query cannot assign PRAGMA values", {"sql": sql})
+            if _SQL_WRITE.search(body):
+                raise PolicyViolationError("Read-only db_query cannot modify data", {"sql": sql})
         if not readonly and not self.config.enable_db_writes:
             raise PolicyViolationError("DB writes are disabled", {"sql": sql})
 
@@ -56,18 +81,20 @@ class PolicyEngine:
         if not expression:
             raise PolicyViolationError("calc expression required")
         try:
-            tree = ast.parse(expression, mode="eval")
+            compile_expression(expression)
         except SyntaxError as exc:
             raise PolicyViolationError("Invalid calc syntax", {"expression": expression}) from exc
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.Expression, ast.Constant, ast.BinOp, ast.UnaryOp, ast.Load)):
-                continue
-            if isinstance(node, (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.UAdd, ast.USub)):
-                continue
-            raise PolicyViolationError("Unsafe calc expression", {"expression": expression, "node": type(node).__name__})
+        except UnsafeExpressionError as exc:
+            raise PolicyViolationError("Unsafe calc expression", {"expression": expression, "node": exc.node}) from exc
 
     @staticmethod
     def _normalize_sql(sql: str) -> str:
         no_comments = re.sub(r"--.*?$", "", sql, flags=re.MULTILINE)
+        no_comments = re.sub(r"/\*.*?\*/", " ", no_comments, flags=re.DOTALL)
         return re.sub(r"\s+", " ", no_comments).strip().lower()
 
+    @staticmethod
+    def _strip_sql_literals(sql: str) -> str:
+        # Quoted identifiers go too, so a column named "update" is not mistaken for a keyword.
+        return _SQL_QUOTED.sub("''", sql)
+
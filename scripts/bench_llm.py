@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.config import load_config
+from core.metrics import MetricsRegistry
+from core.types import PerceptionResult, Plan
+from llm.provider import get_provider
+
+GOALS = [
+    "Fetch mock data, calculate 2 + 2, summarize the result, and write a file",
+    "Query the database for demo numbers and summarize them",
+    "Fetch flaky endpoint and summarize the result after retry flaky",
+]
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the OpenAI-compatible provider against the local LLM stub")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8002")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", choices=["structured", "text", "mixed"], default="mixed")
+    parser.add_argument("--no-stream", action="store_true")
+    args = parser.parse_args()
+
+    config = load_config(
+        {
+            "no_llm_mode": False,
+            "openai_base_url": args.base_url,
+            "openai_api_key": "stub",
+            "llm_stream": not args.no_stream,
+            "llm_cache_enabled": False,
+            "llm_max_concurrency": args.concurrency,
+            "llm_pool_max_connections": args.concurrency,
+            "log_to_file": False,
+        }
+    )
+    metrics = MetricsRegistry()
+    provider = get_provider(config, metrics=metrics)
+
+    def one(i: int) -> tuple[float, str | None]:
+        goal = f"{GOALS[i % len(GOALS)]} #{i}"
+        kind = args.mix if args.mix != "mixed" else ("structured", "text")[i % 2]
+        started = time.perf_counter()
+        try:
+            if kind == "structured":
+                provider.generate_structured(goal, PerceptionResult if i % 4 < 2 else Plan)
+            else:
+                provider.generate_text(f"{goal}. It has several sentences. Summaries keep the first ones.", max_tokens=64)
+        except Exception as exc:
+            return time.perf_counter() - started, type(exc).__name__
+        return time.perf_counter() - started, None
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        outcomes = list(pool.map(one, range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [lat * 1000 for lat, err in outcomes if err is None]
+    errors: dict[str, int] = {}
+    for _, err in outcomes:
+        if err:
+            errors[err] = errors.get(err, 0) + 1
+    report = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "stream": not args.no_stream,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(args.requests / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 0.50), 1),
+            "p95": round(_percentile(latencies, 0.95), 1),
+            "p99": round(_percentile(latencies, 0.99), 1),
+            "max": round(max(latencies, default=0.0), 1),
+        },
+        "errors": errors,
+        "metrics": metrics.snapshot(),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+from .workers import RunRequest, WorkerPool
+
+__all__ = ["RunRequest", "WorkerPool"]
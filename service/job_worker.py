@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+import signal
+import socket
+import uuid
+from threading import Event, Lock, Thread, current_thread, main_thread
+from typing import Any
+
+from core.exceptions import WorkerCrashedError
+from core.types import JobRecord, JobStatus
+from memory.jobs import JobQueue, job_queue_from_config
+
+_MAX_RESTART_BACKOFF_S = 30.0
+
+
+class JobWorker:
+    def __init__(
+        self,
+        engine: Any,
+        queue: JobQueue,
+        owner: str | None = None,
+        batch_size: int = 4,
+        poll_interval_s: float = 0.5,
+    ) -> None:
+        self.engine = engine
+        self.queue = queue
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.batch_size = max(1, batch_size)
+        self.poll_interval_s = poll_interval_s
+        self._held: list[str] = []
+        self._held_lock = Lock()
+        self.stats = {"completed": 0, "retried": 0, "dead": 0, "resumed": 0}
+
+    def _heartbeat(self, stop: Event) -> None:
+        # Renew every lease still held from the current batch well before it expires.
+        interval = max(0.05, self.queue.lease_s / 3.0)
+        while not stop.wait(interval):
+            with self._held_lock:
+                held = list(self._held)
+            self.queue.heartbeat(self.owner, held)
+
+    def _process(self, job: JobRecord) -> None:
+        payload = job.payload
+        try:
+            trace = None
+            if job.attempts > 1:
+                # A previous holder died mid-run: continue from its last checkpoint instead of starting over.
+                trace = self.engine.resume(
+                    job.run_id,
+                    export_trace=bool(payload.get("export_trace", False)),
+                    trace_prefix=payload.get("trace_prefix", "job"),
+                    deadline_s=payload.get("deadline_s"),
+                )
+                if trace is not None:
+                    self.stats["resumed"] += 1
+            if trace is None:
+                self.engine.run(
+                    payload.get("raw_goal", ""),
+                    context=payload.get("context") or {},
+                    export_trace=bool(payload.get("export_trace", False)),
+                    trace_prefix=payload.get("trace_prefix", "job"),
+                    run_id=job.run_id,
+                    deadline_s=payload.get("deadline_s"),
+                )
+        except Exception as exc:
+            status = self.queue.retry(job.job_id, self.owner, f"{type(exc).__name__}: {exc}")
+            self.stats["dead" if status == JobStatus.DEAD else "retried"] += 1
+            return
+        if self.queue.complete(job.job_id, self.owner):
+            self.stats["completed"] += 1
+
+    def run_once(self) -> int:
+        jobs = self.queue.lease(self.owner, self.batch_size)
+        if not jobs:
+            return 0
+        with self._held_lock:
+            self._held = [j.job_id for j in jobs]
+        stop = Event()
+        beat = Thread(target=self._heartbeat, args=(stop,), name="maoo-job-heartbeat", daemon=True)
+        beat.start()
+        try:
+            for job in jobs:
+                self._process(job)
+                with self._held_lock:
+                    self._held.remove(job.job_id)
+        finally:
+            stop.set()
+            beat.join()
+        return len(jobs)
+
+    def run_forever(self, stop: Event | None = None) -> None:
+        stop = stop or Event()
+        while not stop.is_set():
+            if self.run_once() == 0:
+                stop.wait(self.poll_interval_s)
+
+
+def run_job_worker(config_overrides: dict[str, Any] | None = None, stop: Any = None) -> None:
+    from core.config import load_config
+    from main import OrchestrationEngine
+
+    config = load_config(config_overrides)
+    engine = OrchestrationEngine(config)
+    worker = JobWorker(
+        engine,
+        job_queue_from_config(config, engine.long_term),
+        batch_size=config.job_batch_size,
+        poll_interval_s=config.job_poll_interval_s,
+    )
+    worker.run_forever(stop)
+
+
+def serve_job_workers(
+    processes: int,
+    config_overrides: dict[str, Any] | None = None,
+    start_method: str = "spawn",
+    max_restarts: int = 16,
+    restart_backoff_s: float = 0.5,
+) -> None:
+    # Leases of a crashed worker expire and are re-claimed, so restarting it is all the recovery needed.
+    ctx = mp.get_context(start_method)
+    stop = ctx.Event()
+
+    def spawn(index: int) -> Any:
+        proc = ctx.Process(target=run_job_worker, args=(config_overrides, stop), name=f"maoo-job-worker-{index}", daemon=True)
+        proc.start()
+        return proc
+
+    previous = None
+    if current_thread() is main_thread():
+        # Supervisors stop us with SIGTERM; setting stop lets workers finish their batch and release leases.
+        previous = signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    restarts = 0
+    procs = [spawn(i) for i in range(max(1, processes))]
+    try:
+        while not stop.is_set():
+            for i, proc in enumerate(procs):
+                proc.join(timeout=0.5 / len(procs))
+                if proc.is_alive() or stop.is_set():
+                    continue
+                if restarts >= max_restarts:
+                    raise WorkerCrashedError(
+                        "job workers keep crashing; restart limit reached",
+                        {"restarts": restarts, "exitcode": proc.exitcode},
+                    )
+                restarts += 1
+                # Back off so a worker that dies on startup does not turn into a fork loop.
+                if stop.wait(min(restart_backoff_s * 2 ** (restarts - 1), _MAX_RESTART_BACKOFF_S)):
+                    break
+                procs[i] = spawn(i)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        for proc in procs:
+            proc.join(timeout=10)
+        if previous is not None:
+            signal.signal(signal.SIGTERM, previous)
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Literal
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from core.config import Config, load_config
+from core.deadline import CancellationToken
+from core.tracing import new_run_id, new_trace_id
+from core.types import RunEvent, RunEventType, RunStatus, RunTrace
+from execution.events import EventBus
+
+_TERMINAL = {RunStatus.COMPLETED, RunStatus.STOPPED, RunStatus.FAILED}
+
+
+class RunSubmission(BaseModel):
+    request: str = Field(min_length=1)
+    context: dict[str, Any] = Field(default_factory=dict)
+    mode: Literal["sync", "async"] = "async"
+    export_trace: bool = False
+    deadline_s: float | None = Field(default=None, gt=0)
+
+
+class AdmissionController:
+    def __init__(self, max_in_flight: int, max_queue: int, initial_run_s: float = 1.0) -> None:
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max(0, max_queue)
+        self.in_flight = 0
+        self.queued = 0
+        self._avg_run_s = initial_run_s
+        self._lock = Lock()
+        self.stats = {"admitted": 0, "rejected": 0}
+
+    def try_admit(self) -> float | None:
+        # Returns None when admitted, otherwise a Retry-After in seconds.
+        with self._lock:
+            if self.in_flight + self.queued < self.max_in_flight + self.max_queue:
+                self.queued += 1
+                self.stats["admitted"] += 1
+                return None
+            self.stats["rejected"] += 1
+            waves = (self.queued + self.in_flight) / self.max_in_flight
+            return float(max(1, math.ceil(waves * self._avg_run_s)))
+
+    def started(self) -> None:
+        with self._lock:
+            self.queued -= 1
+            self.in_flight += 1
+
+    def finished(self, duration_s: float) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self._avg_run_s = 0.8 * self._avg_run_s + 0.2 * duration_s
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "queued": self.queued,
+                "max_in_flight": self.max_in_flight,
+                "max_queue": self.max_queue,
+                "avg_run_s": round(self._avg_run_s, 3),
+                **self.stats,
+            }
+
+
+class RunService:
+    def __init__(self, config: Config, engine: Any = None) -> None:
+        if engine is None:
+            from main import OrchestrationEngine
+
+            engine = OrchestrationEngine(config)
+        self.config = config
+        self.engine = engine
+        self.admission = AdmissionController(config.service_max_in_flight, config.service_max_queue)
+        self.pool = ThreadPoolExecutor(max_workers=self.admission.max_in_flight, thread_name_prefix="maoo-run")
+        self._live: OrderedDict[str, RunTrace] = OrderedDict()
+        self._futures: dict[str, Future[RunTrace]] = {}
+        self._buses: dict[str, EventBus] = {}
+        self._tokens: dict[str, CancellationToken] = {}
+        self._lock = Lock()
+
+    def _remember(self, trace: RunTrace) -> None:
+        with self._lock:
+            self._live[trace.run_id] = trace
+            self._live.move_to_end(trace.run_id)
+            # Finished runs stay readable from SQLite; keep only a bounded window in memory.
+            while len(self._live) > self.config.service_max_live_runs:
+                oldest, old = next(iter(self._live.items()))
+                if old.status not in _TERMINAL:
+                    break
+                self._live.pop(oldest)
+                self._futures.pop(oldest, None)
+                self._buses.pop(oldest, None)
+                self._tokens.pop(oldest, None)
+
+    def _execute(self, run_id: str, submission: RunSubmission, bus: EventBus, token: CancellationToken) -> RunTrace:
+        self.admission.started()
+        started = time.perf_counter()
+        try:
+            return self.engine.run(
+                submission.request,
+                context=submission.context,
+                export_trace=submission.export_trace,
+                trace_prefix="service",
+                run_id=run_id,
+                trace_id=bus.trace_id,
+                on_start=self._remember,
+                events=bus,
+                deadline_s=submission.deadline_s,
+                cancel=token,
+            )
+        finally:
+            self.admission.finished(time.perf_counter() - started)
+            # Streams must always terminate, even when the run raised before the executor stopped it.
+            if not bus.closed:
+                bus.emit(RunEventType.STOP, status=RunStatus.FAILED.value)
+
+    def submit(self, submission: RunSubmission) -> tuple[str, Future[RunTrace]] | float:
+        retry_after = self.admission.try_admit()
+        if retry_after is not None:
+            return retry_after
+        run_id = new_run_id()
+        bus = EventBus(new_trace_id(), run_id)
+        token = CancellationToken()
+        with self._lock:
+            self._buses[run_id] = bus
+            self._tokens[run_id] = token
+            self._futures[run_id] = self.pool.submit(self._execute, run_id, submission, bus, token)
+            future = self._futures[run_id]
+        return run_id, future
+
+    def get(self, run_id: str) -> RunTrace | None:
+        with self._lock:
+            trace = self._live.get(run_id)
+        if trace is not None:
+            return trace
+        return self.engine.long_term.load_trace(run_id)
+
+    def bus(self, run_id: str) -> EventBus | None:
+        with self._lock:
+            return self._buses.get(run_id)
+
+    def cancel(self, run_id: str) -> bool:
+        # Cooperative: a queued run stops before its first step, a running one at the next tool boundary.
+        with self._lock:
+            token = self._tokens.get(run_id)
+        if token is None or not self.is_pending(run_id):
+            return False
+        token.cancel("cancelled via API")
+        return True
+
+    def is_pending(self, run_id: str) -> bool:
+        with self._lock:
+            future = self._futures.get(run_id)
+        return future is not None and not future.done()
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=True)
+
+
+def _summary(trace: RunTrace) -> dict[str, Any]:
+    return {
+        "run_id": trace.run_id,
+        "trace_id": trace.trace_id,
+        "status": trace.status.value,
+        "stop_reason": trace.stop_reason.type.value,
+        "steps": len(trace.step_events),
+    }
+
+
+def create_service_app(config: Config | None = None, engine: Any = None) -> FastAPI:
+    config = config or load_config()
+    service = RunService(config, engine=engine)
+    app = FastAPI(title="MAOO Orchestration Service", version="0.1.0")
+    app.state.service = service
+
+    @app.get("/health")
+    def health() -> dict[str, Any]:
+        return {"ok": True, "service": "maoo", "admission": service.admission.snapshot()}
+
+    @app.post("/runs")
+    async def create_run(submission: RunSubmission):
+        submitted = service.submit(submission)
+        if isinstance(submitted, float):
+            return JSONResponse(
+                {"error": "saturated", "retry_after_s": submitted, "admission": service.admission.snapshot()},
+                status_code=429,
+                headers={"Retry-After": str(int(submitted))},
+            )
+        run_id, future = submitted
+        links = {"self": f"/runs/{run_id}", "events": f"/runs/{run_id}/events"}
+        if submission.mode == "sync":
+            try:
+                trace = await asyncio.wait_for(
+                    asyncio.shield(asyncio.wrap_future(future)), timeout=config.service_sync_timeout_s
+                )
+            except asyncio.TimeoutError:
+                # The run keeps going; the caller polls like an async submission.
+                return JSONResponse({"run_id": run_id, "status": "running", "links": links}, status_code=202)
+            return {**_summary(trace), "links": links, "trace": trace.model_dump(mode="json")}
+        return JSONResponse({"run_id": run_id, "status": "queued", "links": links}, status_code=202)
+
+    @app.get("/runs/{run_id}")
+    def get_run(run_id: str) -> dict[str, Any]:
+        trace = service.get(run_id)
+        if trace is None:
+            if service.is_pending(run_id):
+                return {"run_id": run_id, "status": "queued"}
+            raise HTTPException(status_code=404, detail="run not found")
+        return {**_summary(trace), "trace": trace.model_dump(mode="json")}
+
+    @app.delete("/runs/{run_id}")
+    def cancel_run(run_id: str):
+        if not service.cancel(run_id):
+            if service.get(run_id) is None:
+                raise HTTPException(status_code=404, detail="run not found")
+            return JSONResponse({"run_id": run_id, "status": "finished"}, status_code=409)
+        return JSONResponse({"run_id": run_id, "status": "cancelling"}, status_code=202)
+
+    @app.get("/runs/{run_id}/events")
+    async def run_events(run_id: str):
+        if service.get(run_id) is None and not service.is_pending(run_id):
+            raise HTTPException(status_code=404, detail="run not found")
+
+        bus = service.bus(run_id)
+
+        def frame(event: str, data: str) -> bytes:
+            return f"event: {event}\ndata: {data}\n\n".encode("utf-8")
+
+        def done() -> bytes:
+            trace = service.get(run_id)
+            return frame("done", json.dumps(_summary(trace) if trace is not None else {"run_id": run_id}))
+
+        async def live() -> AsyncIterator[bytes]:
+            loop = asyncio.get_running_loop()
+            queue: asyncio.Queue[RunEvent] = asyncio.Queue()
+            # The executor thread pushes into the loop; replay covers events emitted before we subscribed.
+            unsubscribe = bus.subscribe(lambda event: loop.call_soon_threadsafe(queue.put_nowait, event), replay=True)
+            try:
+                while True:
+                    event = await queue.get()
+                    yield frame(event.type.value, event.model_dump_json())
+                    if event.type == RunEventType.STOP:
+                        break
+            finally:
+                unsubscribe()
+            yield done()
+
+        async def archived() -> AsyncIterator[bytes]:
+            # Evicted or pre-restart runs only have their persisted step events left.
+            trace = service.get(run_id)
+            for event in trace.step_events if trace is not None else []:
+                yield frame(RunEventType.STEP.value, event.model_dump_json())
+            yield done()
+
+        return StreamingResponse(live() if bus is not None else archived(), media_type="text/event-stream")
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    config = load_config()
+    uvicorn.run(create_service_app(config), host="0.0.0.0", port=config.service_port, reload=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import itertools
+import multiprocessing as mp
+import os
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection, wait
+from threading import Lock, Thread
+from typing import Any
+
+from core.exceptions import WorkerCrashedError
+from core.types import RunTrace
+
+
+@dataclass
+class RunRequest:
+    raw_goal: str
+    context: dict[str, Any] = field(default_factory=dict)
+    export_trace: bool = True
+    trace_prefix: str = "trace"
+    run_id: str | None = None
+    trace_id: str | None = None
+    deadline_s: float | None = None
+
+
+def _worker_main(worker_id: int, config_overrides: dict[str, Any], conn: Connection) -> None:
+    # Imported here so the supervisor process never builds an engine of its own.
+    from core.config import load_config
+    from main import OrchestrationEngine
+
+    engine = OrchestrationEngine(load_config(config_overrides))
+    conn.send(("ready", worker_id, os.getpid()))
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        job_id, request = message
+        try:
+            trace = engine.run(
+                request.raw_goal,
+                context=request.context,
+                export_trace=request.export_trace,
+                trace_prefix=request.trace_prefix,
+                run_id=request.run_id,
+                trace_id=request.trace_id,
+                deadline_s=request.deadline_s,
+            )
+            # JSON over the pipe: one pickle-free string per run instead of a deep pydantic graph.
+            conn.send(("ok", job_id, trace.model_dump_json()))
+        except Exception as exc:  # pragma: no cover - engine.run already folds failures into the trace
+            conn.send(("error", job_id, f"{type(exc).__name__}: {exc}"))
+
+
+@dataclass
+class _Worker:
+    worker_id: int
+    process: Any
+    conn: Connection
+    ready: bool = False
+    job: tuple[int, Future[RunTrace]] | None = None
+
+
+class WorkerPool:
+    def __init__(
+        self,
+        workers: int = 0,
+        config_overrides: dict[str, Any] | None = None,
+        start_method: str = "spawn",
+        max_restarts: int = 16,
+    ) -> None:
+        self.size = workers if workers > 0 else (os.cpu_count() or 1)
+        self.config_overrides = dict(config_overrides or {})
+        self.max_restarts = max_restarts
+        self._ctx = mp.get_context(start_method)
+        self._lock = Lock()
+        self._pending: deque[tuple[int, RunRequest, Future[RunTrace]]] = deque()
+        self._workers: dict[int, _Worker] = {}
+        self._job_ids = itertools.count()
+        self._worker_ids = itertools.count()
+        self._wake_r, self._wake_w = self._ctx.Pipe(duplex=False)
+        self._closed = False
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "restarts": 0}
+        for _ in range(self.size):
+            self._spawn()
+        self._dispatcher = Thread(target=self._loop, name="maoo-supervisor", daemon=True)
+        self._dispatcher.start()
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _spawn(self) -> _Worker:
+        worker_id = next(self._worker_ids)
+        parent, child = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self.config_overrides, child),
+            name=f"maoo-worker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        child.close()
+        worker = _Worker(worker_id=worker_id, process=process, conn=parent)
+        with self._lock:
+            self._workers[worker_id] = worker
+        return worker
+
+    def submit(self, request: RunRequest) -> Future[RunTrace]:
+        future: Future[RunTrace] = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("worker pool is closed")
+            self._pending.append((next(self._job_ids), request, future))
+            self.stats["submitted"] += 1
+        self._wake_w.send_bytes(b"x")
+        return future
+
+    def run(self, raw_goal: str, context: dict[str, Any] | None = None, **kwargs: Any) -> RunTrace:
+        return self.submit(RunRequest(raw_goal=raw_goal, context=context or {}, **kwargs)).result()
+
+    def map(self, requests: list[RunRequest]) -> list[RunTrace]:
+        futures = [self.submit(r) for r in requests]
+        return [f.result() for f in futures]
+
+    def _dispatch(self) -> None:
+        broken: list[_Worker] = []
+        with self._lock:
+            for worker in self._workers.values():
+                if not self._pending:
+                    break
+                if worker.ready and worker.job is None:
+                    job_id, request, future = self._pending.popleft()
+                    # A job requeued after a failed send is already running.
+                    if not (future.running() or future.set_running_or_notify_cancel()):
+                        continue
+                    try:
+                        worker.conn.send((job_id, request))
+                    except OSError:
+                        # The worker died after wait() returned: keep the job and replace the worker.
+                        self._pending.appendleft((job_id, request, future))
+                        broken.append(worker)
+                        continue
+                    worker.job = (job_id, future)
+        for worker in broken:
+            self._on_crash(worker)
+
+    def _on_message(self, worker: _Worker) -> None:
+        if worker.worker_id not in self._workers:
+            return
+        try:
+            message = worker.conn.recv()
+        except (EOFError, OSError):
+            self._on_crash(worker)
+            return
+        kind = message[0]
+        if kind == "ready":
+            worker.ready = True
+            return
+        job = worker.job
+        worker.job = None
+        if job is None:
+            return
+        _, future = job
+        if kind == "ok":
+            future.set_result(RunTrace.model_validate_json(message[2]))
+            self.stats["completed"] += 1
+        else:
+            future.set_exception(RuntimeError(message[2]))
+            self.stats["failed"] += 1
+
+    def _on_crash(self, worker: _Worker) -> None:
+        with self._lock:
+            if self._workers.pop(worker.worker_id, None) is None:
+                return
+        worker.conn.close()
+        worker.process.join(timeout=1.0)
+        if worker.job is not None:
+            job_id, future = worker.job
+            future.set_exception(
+                WorkerCrashedError(
+                    f"orchestration worker {worker.worker_id} exited during job {job_id}",
+                    {"worker_id": worker.worker_id, "exitcode": worker.process.exitcode},
+                )
+            )
+            self.stats["failed"] += 1
+        if self._closed:
+            return
+        if self.stats["restarts"] >= self.max_restarts:
+            self._fail_pending("orchestration workers keep crashing; restart limit reached")
+            return
+        self.stats["restarts"] += 1
+        self._spawn()
+
+    def _fail_pending(self, message: str) -> None:
+        with self._lock:
+            pending = list(self._pending)
+            self._pending.clear()
+        for _, _, future in pending:
+            if future.running() or future.set_running_or_notify_cancel():
+                future.set_exception(WorkerCrashedError(message, {"restarts": self.stats["restarts"]}))
+
+    def _loop(self) -> None:
+        while not (self._closed and not any(w.job for w in self._workers.values())):
+            by_conn = {w.conn: w for w in self._workers.values()}
+            by_sentinel = {w.process.sentinel: w for w in self._workers.values()}
+            for ready in wait([self._wake_r, *by_conn, *by_sentinel], timeout=1.0):
+                if ready is self._wake_r:
+                    while self._wake_r.poll():
+                        self._wake_r.recv_bytes()
+                elif ready in by_conn:
+                    self._on_message(by_conn[ready])
+                elif ready in by_sentinel:
+                    worker = by_sentinel[ready]
+                    # Drain a result the worker sent just before exiting.
+                    while worker.worker_id in self._workers and worker.conn.poll():
+                        self._on_message(worker)
+                    if worker.worker_id in self._workers:
+                        self._on_crash(worker)
+            self._dispatch()
+            if not self._workers and not self._closed:
+                self._fail_pending("no orchestration workers are running")
+
+    @classmethod
+    def from_config(cls, config: Any, config_overrides: dict[str, Any] | None = None) -> "WorkerPool":
+        return cls(
+            workers=config.service_workers,
+            config_overrides=config_overrides,
+            start_method=config.service_start_method,
+            max_restarts=config.service_max_worker_restarts,
+        )
+
+    def worker_pids(self) -> list[int]:
+        with self._lock:
+            return [w.process.pid for w in self._workers.values()]
+
+    def close(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._fail_pending("worker pool closed")
+        self._wake_w.send_bytes(b"x")
+        self._dispatcher.join(timeout=timeout)
+        for worker in list(self._workers.values()):
+            try:
+                worker.conn.send(None)
+            except (OSError, BrokenPipeError):
+                pass
+        for worker in list(self._workers.values()):
+            worker.process.join(timeout=timeout)
+            if worker.process.is_alive():
+                worker.process.kill()
+            worker.conn.close()
+        self._workers.clear()
@@ -16,6 +16,49 @@ CREATE TABLE IF NOT EXISTS traces (
   created_at TEXT NOT NULL
 );
 
+CREATE TABLE IF NOT EXISTS run_checkpoints (
+  run_id TEXT NOT NULL,
+  seq INTEGER NOT NULL,
+  kind TEXT NOT NULL,
+  payload_json TEXT NOT NULL,
+  created_at TEXT NOT NULL,
+  PRIMARY KEY (run_id, seq)
+);
+
+CREATE TABLE IF NOT EXISTS run_cache (
+  cache_key TEXT PRIMARY KEY,
+  run_id TEXT NOT NULL,
+  reusable INTEGER NOT NULL DEFAULT 0,
+  expires_at REAL NOT NULL,
+  created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS run_cache_deps (
+  cache_key TEXT NOT NULL,
+  table_name TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_run_cache_deps_table ON run_cache_deps(table_name);
+
+CREATE TABLE IF NOT EXISTS jobs (
+  job_id TEXT PRIMARY KEY,
+  queue TEXT NOT NULL DEFAULT 'default',
+  status TEXT NOT NULL,
+  priority INTEGER NOT NULL DEFAULT 0,
+  payload_json TEXT NOT NULL,
+  run_id TEXT NOT NULL,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  max_attempts INTEGER NOT NULL DEFAULT 3,
+  available_at REAL NOT NULL,
+  lease_owner TEXT,
+  lease_expires_at REAL,
+  last_error TEXT,
+  created_at TEXT NOT NULL,
+  updated_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs(queue, status, priority, available_at);
+
 CREATE TABLE IF NOT EXISTS memory_entries (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
   namespace TEXT NOT NULL,
@@ -36,6 +79,23 @@ CREATE TABLE IF NOT EXISTS tool_outcomes (
   created_at TEXT NOT NULL
 );
 
+CREATE TABLE IF NOT EXISTS latency_digests (
+  tool_name TEXT NOT NULL,
+  scope TEXT NOT NULL,
+  digest_json TEXT NOT NULL,
+  updated_at TEXT NOT NULL,
+  PRIMARY KEY (tool_name, scope)
+);
+
+CREATE TABLE IF NOT EXISTS llm_cache (
+  cache_key TEXT PRIMARY KEY,
+  model TEXT NOT NULL,
+  response_text TEXT NOT NULL,
+  total_tokens INTEGER NOT NULL DEFAULT 0,
+  expires_at REAL NOT NULL,
+  created_at TEXT NOT NULL
+);
+
 CREATE TABLE IF NOT EXISTS eval_results (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
   scenario_id TEXT NOT NULL,
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import random
+
+from core.types import FailureSignal, FailureType, PlanStep, ToolCallRecord, ToolCallStatus
+from execution.refinement import RefinementEngine
+from memory.latency import AdaptiveTimeoutService, LatencyDigest
+
+
+def test_latency_digest_quantiles_track_distribution():
+    rng = random.Random(7)
+    digest = LatencyDigest()
+    values = [rng.uniform(0, 1000) for _ in range(5000)]
+    for v in values:
+        digest.add(v)
+    assert abs(digest.quantile(0.5) - 500) < 30
+    assert abs(digest.quantile(0.99) - 990) < 15
+    restored = LatencyDigest.from_dict(digest.to_dict())
+    assert abs(restored.quantile(0.99) - digest.quantile(0.99)) < 1e-6
+
+
+def test_adaptive_timeouts_learn_per_endpoint_and_persist(test_config, long_term_memory):
+    service = AdaptiveTimeoutService(test_config, long_term_memory)
+    fast = "http://127.0.0.1:8001/data"
+    slow = "http://127.0.0.1:8001/slow?delay_ms=3000"
+    assert service.timeout_for("http_get", fast, 2.0) == 2.0
+    for _ in range(test_config.adaptive_timeout_min_samples):
+        service.observe("http_get", fast, 40)
+        service.observe("http_get", slow, 3000)
+    assert service.timeout_for("http_get", fast, 2.0) == test_config.adaptive_timeout_floor_s
+    assert service.timeout_for("http_get", slow, 2.0) > 3.0
+    service.flush()
+
+    reloaded = AdaptiveTimeoutService(test_config, long_term_memory)
+    assert reloaded.timeout_for("http_get", slow, 2.0) == service.timeout_for("http_get", slow, 2.0)
+
+
+def test_adaptive_timeouts_count_timeouts_as_censored_samples(test_config):
+    service = AdaptiveTimeoutService(test_config)
+    for _ in range(test_config.adaptive_timeout_min_samples):
+        service.observe_call(
+            ToolCallRecord(
+                step_id="s1",
+                step_attempt_id="a",
+                tool_name="http_get",
+                validated_args={"url": "http://127.0.0.1:8001/slow", "timeout_s": 1.5},
+                status=ToolCallStatus.TIMEOUT,
+                latency_ms=1490,
+            )
+        )
+    assert service.timeout_for("http_get", "http://127.0.0.1:8001/slow", 2.0) >= 3.0
+
+
+def test_refinement_uses_learned_timeout_for_patch(test_config):
+    service = AdaptiveTimeoutService(test_config)
+    url = "http://127.0.0.1:8001/slow"
+    for _ in range(test_config.adaptive_timeout_min_samples):
+        service.observe("http_get", url, 2500)
+    step = PlanStep(
+        step_id="s1",
+        objective="fetch",
+        tool_name="http_get",
+        tool_args={"url": url, "timeout_s": 0.5},
+        expected_observation="body",
+        fallback_strategy="retry_with_backoff",
+    )
+    signal = FailureSignal(failure_type=FailureType.TIMEOUT, retryable=True, message="timeout", recommended_action="retry")
+    decision = RefinementEngine(timeouts=service).decide(step, signal, 1, 3, perception=None, tool_catalog=[])
+    assert decision.patched_args["timeout_s"] == 5.0
+
+
+def test_retried_batch_does_not_resample_reused_items(test_config, long_term_memory):
+    service = AdaptiveTimeoutService(test_config, long_term_memory)
+    fast, slow = "http://127.0.0.1:8001/data", "http://127.0.0.1:8001/slow"
+    requests = [{"url": fast}, {"url": slow}]
+
+    def record(items, reused):
+        return ToolCallRecord(
+            step_id="s1",
+            step_attempt_id="a",
+            tool_name="http_get_many",
+            validated_args={"requests": requests, "timeout_s": 1.0},
+            status=ToolCallStatus.SUCCESS,
+            latency_ms=100,
+            result={"data": {"reused": reused}, "items": items},
+        )
+
+    first = [{"index": 0, "url": fast, "ok": True, "latency_ms": 40}, {"index": 1, "url": slow, "ok": False, "failure_type": "http_error"}]
+    retried = [first[0], {"index": 1, "url": slow, "ok": True, "latency_ms": 900}]
+    service.observe_call(record(first, []))
+    service.observe_call(record(retried, [0]))
+    fast_scope = service.scopes(fast)[1]
+    slow_scope = service.scopes(slow)[1]
+    assert service._digests[("http_get_many", fast_scope)].count == 1
+    assert service._digests[("http_get_many", slow_scope)].count == 1
+
+    long_term_memory.save_tool_outcome("t", "s1", "http_get_many", "success", 100, {"data": {"reused": [0]}, "items": retried})
+    assert long_term_memory.recent_tool_latencies(["http_get_many"]) == [("http_get_many", slow, 900)]
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from core.exceptions import ToolExecutionError
+from core.types import (
+    BudgetGuard,
+    FailureSignal,
+    FailureType,
+    PerceptionResult,
+    Plan,
+    PlanStep,
+    RefinementActionType,
+    ResourceUsage,
+    RunStatus,
+    StopReasonType,
+    TaskType,
+    charge_usage,
+)
+from execution.executor import Executor
+from execution.refinement import RefinementEngine
+from execution.tool_schemas import CalcArgs, CalcResult
+
+
+def _perception() -> PerceptionResult:
+    return PerceptionResult(
+        intent="calc",
+        task_type=TaskType.CALCULATION,
+        entities={"raw_goal": "calc"},
+        success_criteria=["summary produced"],
+    )
+
+
+def _step(step_id: str, fallback: str = "abort") -> PlanStep:
+    return PlanStep(step_id=step_id, objective="calc", tool_name="calc", tool_args={"expression": "1+1"}, expected_observation="", fallback_strategy=fallback)
+
+
+def test_actual_token_and_row_usage_is_charged_and_enforced(registry, run_trace, run_context_factory):
+    def expensive(args: CalcArgs, ctx):
+        charge_usage(ctx, prompt_tokens=1500, completion_tokens=500, rows_scanned=2000)
+        return CalcResult(ok=True, message="ok", result=2)
+
+    registry.get("calc").handler = expensive
+    registry.get("calc").pure = False
+    plan = Plan(
+        steps=[_step("s1"), _step("s2"), _step("s3")],
+        max_steps=5,
+        budget_guard=BudgetGuard(max_cost_units=8),
+    )
+    result = Executor().run(plan, _perception(), run_context_factory(run_trace))
+
+    assert result.stop_reason.type == StopReasonType.BUDGET_GUARD
+    assert len(run_trace.tool_calls) == 2
+    assert run_trace.tool_calls[0].usage.cost_units == 1 + 2 + 2
+    assert run_trace.usage.total_tokens == 4000
+    assert run_trace.usage.rows_scanned == 4000
+    assert run_trace.metrics_snapshot["cost_units_total"] == 10
+
+
+def test_token_budget_stops_run(registry, run_trace, run_context_factory):
+    def chatty(args: CalcArgs, ctx):
+        charge_usage(ctx, completion_tokens=300)
+        return CalcResult(ok=True, message="ok", result=2)
+
+    registry.get("calc").handler = chatty
+    plan = Plan(steps=[_step("s1"), _step("s2")], budget_guard=BudgetGuard(max_cost_units=50, max_tokens=300))
+    result = Executor().run(plan, _perception(), run_context_factory(run_trace))
+    assert result.stop_reason.type == StopReasonType.BUDGET_GUARD
+    assert "Token budget" in result.stop_reason.message
+
+
+def test_retry_is_abandoned_when_budget_cannot_cover_it(registry, run_trace, run_context_factory):
+    def failing(args: CalcArgs, ctx):
+        raise ToolExecutionError("flaky", failure_type=FailureType.TOOL_ERROR)
+
+    registry.get("calc").handler = failing
+    plan = Plan(steps=[_step("s1", fallback="retry")], max_retries_per_step=3, budget_guard=BudgetGuard(max_cost_units=1))
+    result = Executor().run(plan, _perception(), run_context_factory(run_trace))
+    assert result.status == RunStatus.STOPPED
+    assert result.stop_reason.type == StopReasonType.BUDGET_GUARD
+    assert run_trace.refinements[0].action == RefinementActionType.ABORT
+
+
+def test_refinement_skips_when_budget_is_spent_and_skip_is_allowed():
+    decision = RefinementEngine().decide(
+        step=_step("s1", fallback="retry_or_skip"),
+        failure_signal=FailureSignal(failure_type=FailureType.TIMEOUT, retryable=True, message="slow", recommended_action="retry"),
+        attempt=1,
+        max_retries_per_step=3,
+        perception=_perception(),
+        tool_catalog=[],
+        budget_remaining=BudgetGuard(max_tokens=10).remaining(ResourceUsage(prompt_tokens=10)),
+    )
+    assert decision.action == RefinementActionType.SKIP_STEP
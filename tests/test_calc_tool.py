@@ -2,10 +2,13 @@ from __future__ import annotations
 
 import pytest
 
+from core import expressions
 from core.exceptions import ToolExecutionError
+from core.expressions import compile_expression
 from core.types import ToolExecutionContext
 from execution.tool_schemas import CalcArgs
 from execution.tools.calc_tool import calc_tool
+from planning.policy import PolicyEngine
 
 
 def _ctx(test_config):
@@ -31,3 +34,45 @@ def test_calc_tool_blocks_unsafe_expression(test_config):
     with pytest.raises(ToolExecutionError):
         calc_tool(CalcArgs(expression="__import__('os').system('bad')"), _ctx(test_config))
 
+
+def test_calc_tool_binds_variables_and_evaluates_batches(test_config):
+    ctx = _ctx(test_config)
+    assert calc_tool(CalcArgs(expression="price * qty", bindings={"price": 2.5, "qty": 4}), ctx).result == 10
+    batch = calc_tool(CalcArgs(expression="price * qty + 1", batch={"price": [1, 2, 3], "qty": [10, 10, 2]}), ctx)
+    assert batch.results == [11, 21, 7]
+    assert all(type(v) is int for v in batch.results)
+    assert calc_tool(CalcArgs(expression="qty / 4", batch={"qty": [2, 8]}), ctx).results == [0.5, 2.0]
+    assert calc_tool(CalcArgs(expression="qty % 3 + 2 ** qty", batch={"qty": [4, -1]}), ctx).results == [17, 2.5]
+    # A constant still yields one result per row.
+    assert calc_tool(CalcArgs(expression="2 + 3", batch={"qty": [1, 2, 3]}), ctx).results == [5, 5, 5]
+    with pytest.raises(ToolExecutionError):
+        calc_tool(CalcArgs(expression="price * qty", bindings={"price": 1}), ctx)
+
+
+def test_policy_and_tool_share_compiled_expressions(test_config):
+    compile_expression.cache_clear()
+    PolicyEngine(test_config)._validate_calc_expression("7 * 6")
+    assert calc_tool(CalcArgs(expression="7 * 6"), _ctx(test_config)).result == 42
+    info = compile_expression.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
+
+
+@pytest.mark.parametrize(
+    ("expression", "columns"),
+    [
+        ("x + 1", {"x": []}),
+        ("price * qty + 1", {"price": [1, 2, 3], "qty": [10, 10, 2]}),
+        ("x / 4 - y", {"x": [2, 8], "y": [0.5, 1]}),
+        ("x * x * x * x - 1", {"x": [2, 3_000_000]}),
+        ("x * x - x * x + 1", {"x": [2**40]}),
+        ("-x % 3", {"x": [4, 5]}),
+    ],
+)
+def test_vectorized_batch_matches_the_scalar_path(monkeypatch, expression, columns):
+    pytest.importorskip("numpy")
+    compiled = compile_expression(expression)
+    vectorized = compiled.evaluate_batch(columns)
+    monkeypatch.setattr(expressions, "np", None)
+    scalar = compiled.evaluate_batch(columns)
+    assert vectorized == scalar
+    assert [type(v) for v in vectorized] == [type(v) for v in scalar]
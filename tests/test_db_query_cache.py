@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+from core.metrics import MetricsRegistry
+from core.types import ToolExecutionContext
+from execution.tool_schemas import DBQueryArgs
+from execution.tools.db_query_tool import db_query_tool
+from memory.long_term import LongTermMemory
+from memory.query_cache import write_targets
+
+_SQL = "SELECT id, label, value FROM demo_numbers ORDER BY id LIMIT 3"
+
+
+def _run(ctx, sql=_SQL):
+    return db_query_tool(DBQueryArgs(sql=sql, limit=3), ctx)
+
+
+def test_repeated_query_is_served_from_cache_until_table_changes(test_config, long_term_memory):
+    metrics = MetricsRegistry()
+    ctx = ToolExecutionContext("t", "r", "s1", 1, test_config, None, None, long_term_memory, metrics)
+
+    first = _run(ctx)
+    second = _run(ctx)
+    assert first.data["cached"] is False
+    assert second.data["cached"] is True
+    assert second.rows == first.rows
+
+    long_term_memory.save_tool_outcome("t", "s1", "db_query", "success", 3, {})
+    assert _run(ctx).data["cached"] is True
+
+    long_term_memory.execute("UPDATE demo_numbers SET label = ? WHERE id = 1", ["changed"])
+    refreshed = _run(ctx)
+    assert refreshed.data["cached"] is False
+    assert refreshed.rows[0]["label"] == "changed"
+    assert metrics.snapshot()["db_query_cache_total|result=hit"] == 2
+
+
+def test_external_writer_invalidates_via_data_version(test_config, long_term_memory):
+    ctx = ToolExecutionContext("t", "r", "s1", 1, test_config, None, None, long_term_memory, None)
+    _run(ctx)
+    assert _run(ctx).data["cached"] is True
+
+    conn = sqlite3.connect(test_config.sqlite_path)
+    conn.execute("UPDATE demo_numbers SET value = 99 WHERE id = 1")
+    conn.commit()
+    conn.close()
+
+    refreshed = _run(ctx)
+    assert refreshed.data["cached"] is False
+    assert refreshed.rows[0]["value"] == 99
+
+
+def test_cache_evicts_least_recently_used(test_config):
+    ltm = LongTermMemory(
+        test_config.sqlite_path,
+        schema_path=Path("sql/schema.sql"),
+        seed_path=Path("sql/seed_data.sql"),
+        query_cache_entries=2,
+    )
+    for sql in ("SELECT 1", "SELECT 2", "SELECT 3"):
+        ltm.query_page(sql)
+    assert ltm.query_page("SELECT 3").from_cache is True
+    assert ltm.query_page("SELECT 1").from_cache is False
+
+
+def test_write_targets_parses_simple_statements():
+    assert write_targets("INSERT OR REPLACE INTO latency_digests(a) VALUES(1)") == {"latency_digests"}
+    assert write_targets("  update demo_numbers set value = 1") == {"demo_numbers"}
+    assert write_targets("DELETE FROM \"jobs\" WHERE id = 1") == {"jobs"}
+    assert write_targets("CREATE TABLE x(a)") is None
+
+
+def test_external_commit_next_to_our_own_write_is_not_hidden(test_config, long_term_memory):
+    ctx = ToolExecutionContext("t", "r", "s1", 1, test_config, None, None, long_term_memory, None)
+    _run(ctx)
+
+    conn = sqlite3.connect(test_config.sqlite_path)
+    conn.execute("UPDATE demo_numbers SET value = 77 WHERE id = 1")
+    conn.commit()
+    conn.close()
+    long_term_memory.save_tool_outcome("t", "s1", "db_query", "success", 3, {})
+
+    assert _run(ctx).rows[0]["value"] == 77
+
+
+def test_repeated_goal_hits_the_query_cache_despite_run_writes(test_config):
+    from main import OrchestrationEngine
+
+    engine = OrchestrationEngine(test_config.model_copy(update={"run_cache_enabled": False}))
+    first = engine.run("Query the database for demo numbers", export_trace=False)
+    second = engine.run("Query the database for demo numbers", export_trace=False)
+
+    assert first.metrics_snapshot["db_query_cache_total|result=miss"] == 1
+    assert second.metrics_snapshot.get("db_query_cache_total|result=hit") == 1
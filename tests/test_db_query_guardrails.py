@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+
+from core.exceptions import PolicyViolationError, ToolExecutionError
+from core.types import FailureType, ToolCallRecord, ToolCallStatus, ToolExecutionContext
+from execution.monitors import Monitors
+from execution.tool_schemas import DBQueryArgs
+from execution.tools.db_query_tool import db_query_tool
+from memory.sqlite_pool import ReadOnlyPool, get_read_pool
+from planning.policy import PolicyEngine
+
+_RUNAWAY = "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n) SELECT count(*) FROM n"
+
+
+def _ctx(config, long_term_memory):
+    return ToolExecutionContext("t", "r", "s1", 1, config, None, None, long_term_memory, None)
+
+
+def test_runaway_query_is_cut_off_by_vm_step_budget(test_config, long_term_memory):
+    cfg = test_config.model_copy(update={"db_query_max_vm_steps": 200_000, "db_query_timeout_s": 30.0})
+    with pytest.raises(ToolExecutionError) as exc_info:
+        db_query_tool(DBQueryArgs(sql=_RUNAWAY), _ctx(cfg, long_term_memory))
+    assert exc_info.value.failure_type == FailureType.BUDGET_EXCEEDED
+    assert exc_info.value.diagnostics["budget"] == "vm_steps"
+
+    record = ToolCallRecord(
+        step_id="s1",
+        step_attempt_id="s1:1",
+        tool_name="db_query",
+        status=ToolCallStatus.ERROR,
+        raw_response={"failure_type": "budget_exceeded", "diagnostics": exc_info.value.diagnostics},
+    )
+    signal = Monitors().evaluate_tool_call(record)[0]
+    assert signal.failure_type == FailureType.BUDGET_EXCEEDED
+    assert signal.retryable is False
+
+
+def test_runaway_query_is_cut_off_by_wall_clock(test_config, long_term_memory):
+    cfg = test_config.model_copy(update={"db_query_max_vm_steps": 0, "db_query_timeout_s": 0.05})
+    with pytest.raises(ToolExecutionError) as exc_info:
+        db_query_tool(DBQueryArgs(sql=_RUNAWAY), _ctx(cfg, long_term_memory))
+    assert exc_info.value.diagnostics["budget"] == "wall_clock"
+
+
+def test_result_caps_truncate_and_hand_back_a_cursor(test_config, long_term_memory):
+    for i in range(4, 21):
+        long_term_memory.execute("INSERT INTO demo_numbers(id, label, value) VALUES(?,?,?)", [i, f"n{i}", float(i)])
+    cfg = test_config.model_copy(update={"db_query_max_rows": 5})
+    result = db_query_tool(DBQueryArgs(sql="SELECT id FROM demo_numbers ORDER BY id", limit=50), _ctx(cfg, long_term_memory))
+    assert result.row_count == 5
+    assert result.truncated_by == "max_rows"
+    assert result.next_cursor
+
+    cfg = test_config.model_copy(update={"db_query_max_bytes": 40})
+    result = db_query_tool(DBQueryArgs(sql="SELECT label FROM demo_numbers ORDER BY id"), _ctx(cfg, long_term_memory))
+    assert result.truncated_by == "max_bytes"
+    assert 0 < result.row_count < 20
+
+
+def test_read_pool_connections_reject_writes(long_term_memory):
+    with get_read_pool(long_term_memory.sqlite_path).connection() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM demo_numbers")
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "SELECT 1; DELETE FROM demo_numbers",
+        "PRAGMA query_only = 0",
+        "ATTACH DATABASE 'x.db' AS x",
+        "WITH t AS (SELECT 1) DELETE FROM demo_numbers",
+    ],
+)
+def test_policy_rejects_unsafe_readonly_sql(test_config, sql):
+    with pytest.raises(PolicyViolationError):
+        PolicyEngine(test_config)._validate_sql(sql)
+
+
+def test_policy_allows_cte_and_semicolons_in_literals(test_config):
+    policy = PolicyEngine(test_config)
+    policy._validate_sql("WITH t AS (SELECT 1 AS x) SELECT x FROM t")
+    policy._validate_sql("SELECT 'a; delete' AS label;")
+    policy._validate_sql('SELECT "update", [drop], `create` FROM t WHERE label = \'insert\'')
+
+
+def test_read_pool_close_keeps_checked_out_connections_counted(long_term_memory):
+    pool = ReadOnlyPool(long_term_memory.sqlite_path, size=2)
+    with pool.connection() as held:
+        with pool.connection() as returned:
+            pass
+        pool.close()
+        with pytest.raises(sqlite3.ProgrammingError):
+            returned.execute("SELECT 1")
+        assert held.execute("SELECT 1").fetchone() == (1,)
+        assert pool._opened == 1
+    assert (pool._opened, pool._idle.qsize()) == (1, 1)
+
+
+def test_read_pool_failed_connect_does_not_leak_a_slot(long_term_memory, monkeypatch):
+    pool = ReadOnlyPool(long_term_memory.sqlite_path, size=1)
+    opener = pool._open
+
+    def refuse() -> sqlite3.Connection:
+        raise sqlite3.OperationalError("unable to open database file")
+
+    monkeypatch.setattr(pool, "_open", refuse)
+    with pytest.raises(sqlite3.OperationalError):
+        with pool.connection():
+            pass
+    assert pool._opened == 0
+    monkeypatch.setattr(pool, "_open", opener)
+    with pool.connection() as conn:
+        assert conn.execute("SELECT 1").fetchone() == (1,)
+    assert pool._opened == 1
@@ -21,3 +21,52 @@ def test_db_query_tool_returns_seeded_rows(test_config, long_term_memory):
     assert result.ok is True
     assert result.row_count == 2
 
+
+
+def _ctx(test_config, long_term_memory):
+    return ToolExecutionContext("t", "r", "s1", 1, test_config, None, None, long_term_memory, None)
+
+
+def test_db_query_tool_pages_with_keyset_cursor(test_config, long_term_memory):
+    for i in range(4, 11):
+        long_term_memory.execute("INSERT INTO demo_numbers(id, label, value) VALUES(?,?,?)", [i, f"n{i}", float(i)])
+    ctx = _ctx(test_config, long_term_memory)
+    seen: list[int] = []
+    args = DBQueryArgs(sql="SELECT id, value FROM demo_numbers", limit=4, keyset_column="id")
+    while True:
+        page = db_query_tool(args, ctx)
+        seen.extend(row["id"] for row in page.rows)
+        if not page.next_cursor:
+            break
+        assert page.has_more is True
+        args = args.model_copy(update={"cursor": page.next_cursor})
+    assert seen == list(range(1, 11))
+
+
+def test_db_query_tool_offset_cursor_and_columnar_format(test_config, long_term_memory):
+    ctx = _ctx(test_config, long_term_memory)
+    first = db_query_tool(DBQueryArgs(sql="SELECT id, label FROM demo_numbers ORDER BY id", limit=2, format="columns"), ctx)
+    assert first.rows == []
+    assert first.columns == ["id", "label"]
+    assert first.column_values == [[1, 2], ["alpha", "beta"]]
+    second = db_query_tool(
+        DBQueryArgs(sql="SELECT id, label FROM demo_numbers ORDER BY id", limit=2, format="columns", cursor=first.next_cursor),
+        ctx,
+    )
+    assert second.column_values == [[3], ["gamma"]]
+    assert second.next_cursor is None
+
+
+def test_keyset_cursor_does_not_skip_ties_across_pages(test_config, long_term_memory):
+    for i in range(4, 11):
+        long_term_memory.execute("INSERT INTO demo_numbers(id, label, value) VALUES(?,?,?)", [i, f"n{i}", float(i // 4)])
+    ctx = _ctx(test_config, long_term_memory)
+    seen: list[int] = []
+    args = DBQueryArgs(sql="SELECT id, value FROM demo_numbers WHERE id >= 4", limit=2, keyset_column="value")
+    while True:
+        page = db_query_tool(args, ctx)
+        seen.extend(row["id"] for row in page.rows)
+        if not page.next_cursor:
+            break
+        args = args.model_copy(update={"cursor": page.next_cursor})
+    assert sorted(seen) == list(range(4, 11))
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from core.exceptions import ToolExecutionError
-from core.types import FailureType, RunStatus
+from core.types import FailureType, PerceptionResult, PlanStep, RunStatus, TaskType
 from execution.executor import Executor
 from execution.tool_schemas import HTTPGetArgs, HTTPResult
 from llm.heuristic_provider import HeuristicProvider
@@ -26,3 +26,71 @@ def test_executor_replans_remaining_steps_on_schema_error(test_config, long_term
     assert result.status == RunStatus.COMPLETED
     assert any(r.action.value == "replan_remaining" for r in run_ctx.trace.refinements)
 
+
+def test_replan_suffix_rebuilds_only_the_repaired_steps(test_config, registry):
+    planner = PlannerAgent(test_config)
+    failed = PlanStep(
+        step_id="s2",
+        objective="fetch",
+        tool_name="http_get",
+        tool_args={"url": f"{test_config.mock_api_base_url}/malformed?kind=json_text", "timeout_s": 2.0},
+        expected_observation="",
+        fallback_strategy="replan_to_alternate_endpoint",
+    )
+    summary = PlanStep(step_id="s3", objective="sum", tool_name="summarize", tool_args={"text": "x"}, expected_observation="")
+    delta = planner.replan_suffix(
+        PerceptionResult(intent="fetch", task_type=TaskType.DATA_RETRIEVAL),
+        failed,
+        [summary],
+        registry.catalog(),
+        scratchpad={"failure_context": {"failure_type": "schema_error", "step_id": "s2"}},
+    )
+
+    assert [s.step_id for s in delta.steps] == ["s2", "s3"]
+    assert delta.rebuilt_step_ids == ["s2"]
+    assert delta.steps[0].tool_args["url"].endswith("/data")
+    assert "/malformed" in failed.tool_args["url"]
+    assert delta.steps[1] is summary
+    assert delta.notes == ["Replanned malformed endpoint to /data"]
+
+
+def test_replan_keeps_the_completed_prefix(test_config, long_term_memory, registry, run_trace, run_context_factory):
+    planner = PlannerAgent(test_config, long_term_memory=long_term_memory)
+    perception = PerceptionAgent(HeuristicProvider(test_config), long_term_memory).run("Fetch malformed endpoint and summarize malformed")
+    plan = planner.build_plan(perception, registry.catalog())
+    calc = PlanStep(step_id="s0", objective="calc", tool_name="calc", tool_args={"expression": "1 + 1"}, expected_observation="")
+    plan.steps.insert(0, calc)
+    calls = []
+
+    def fake_http_get(args: HTTPGetArgs, ctx):
+        calls.append(args.url)
+        if "/malformed" in args.url:
+            raise ToolExecutionError("malformed json", failure_type=FailureType.SCHEMA_ERROR)
+        return HTTPResult(ok=True, message="ok", data={}, status_code=200, headers={}, body={"ok": True}, malformed=False)
+
+    registry.get("http_get").handler = fake_http_get
+    run_ctx = run_context_factory(run_trace, planner=planner)
+    result = Executor().run(plan, perception, run_ctx)
+
+    assert result.status == RunStatus.COMPLETED
+    assert [c.tool_name for c in run_trace.tool_calls].count("calc") == 1
+    assert len(calls) == 2 and calls[1].endswith("/data")
+    replan = next(r for r in run_trace.refinements if r.action.value == "replan_remaining")
+    assert replan.rebuilt_step_ids == ["s1"]
+    assert "replanned malformed endpoint" in replan.reason.lower()
+
+
+def test_memory_retrieval_is_cached_until_an_entry_is_added(long_term_memory, monkeypatch):
+    pages = []
+    query_page = long_term_memory.query_page
+
+    def recording_query_page(*args, **kwargs):
+        pages.append(query_page(*args, **kwargs))
+        return pages[-1]
+
+    monkeypatch.setattr(long_term_memory, "query_page", recording_query_page)
+    first = long_term_memory.get_memory_entries("facts", limit=200)
+    assert long_term_memory.get_memory_entries("facts", limit=200) == first
+    long_term_memory.add_memory_entry("facts", "replan", "fresh fact")
+    assert long_term_memory.get_memory_entries("facts", limit=200)[0]["value_text"] == "fresh fact"
+    assert [page.from_cache for page in pages] == [False, True, False]
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import importlib
+import uuid
+
+from fastapi.testclient import TestClient
+
+from core.types import BudgetGuard, PerceptionResult, Plan, PlanStep, RunStatus, TaskType, ToolExecutionContext
+from execution.executor import Executor
+from execution.tool_schemas import HTTPGetManyArgs
+from mock_api.server import create_app
+from tests.test_http_tools_with_mock_api import _PatchedHTTPXClient
+
+
+def _patch_pool(monkeypatch):
+    client = _PatchedHTTPXClient(TestClient(create_app()))
+    mod = importlib.import_module("execution.tools.http_get_many_tool")
+    monkeypatch.setattr(mod, "shared_http_client", lambda config: client)
+    return mod
+
+
+def test_http_get_many_reports_per_item_status(monkeypatch, test_config):
+    mod = _patch_pool(monkeypatch)
+    key = uuid.uuid4().hex
+    args = HTTPGetManyArgs(
+        requests=[
+            {"url": "http://127.0.0.1:8001/data"},
+            {"url": f"http://127.0.0.1:8001/flaky?fail_first=1&key={key}"},
+            {"url": "http://127.0.0.1:8001/malformed?kind=json_text"},
+        ]
+    )
+    ctx = ToolExecutionContext("t", "r", "s1", 1, test_config, None, None, None, None)
+    res = mod.http_get_many_tool(args, ctx)
+    assert res.succeeded == 1
+    assert res.failed_indices == [1, 2]
+    assert res.items[0].body["sum"] == 14
+    assert res.items[1].failure_type == "tool_error"
+    assert res.items[2].failure_type == "schema_error"
+
+
+def test_executor_retries_only_failed_batch_items(monkeypatch, registry, run_trace, run_context_factory):
+    _patch_pool(monkeypatch)
+    key = uuid.uuid4().hex
+    perception = PerceptionResult(
+        intent="retrieve data",
+        task_type=TaskType.DATA_RETRIEVAL,
+        entities={"raw_goal": "fetch"},
+        success_criteria=["http result captured"],
+    )
+    plan = Plan(
+        steps=[
+            PlanStep(
+                step_id="s1",
+                objective="fetch many",
+                tool_name="http_get_many",
+                tool_args={
+                    "requests": [
+                        {"url": "http://127.0.0.1:8001/data"},
+                        {"url": f"http://127.0.0.1:8001/flaky?fail_first=1&key={key}"},
+                    ]
+                },
+                expected_observation="bodies",
+                fallback_strategy="retry_failed_items",
+            )
+        ],
+        max_steps=3,
+        max_retries_per_step=3,
+        budget_guard=BudgetGuard(max_cost_units=10),
+    )
+    run_ctx = run_context_factory(run_trace)
+    result = Executor().run(plan, perception, run_ctx)
+    assert result.status == RunStatus.COMPLETED
+    assert run_ctx.trace.refinements[0].patched_args == {"only_indices": [1]}
+    final = run_ctx.trace.tool_calls[-1].result
+    assert final["failed_indices"] == []
+    assert final["data"]["reused"] == [0]
+    assert final["items"][1]["body"]["status"] == "recovered"
+
+
+def test_timeout_retry_raises_planner_item_timeouts(test_config, registry, run_trace, run_context_factory):
+    from core.exceptions import ToolExecutionError
+    from core.types import FailureType
+    from execution.tool_schemas import HTTPGetManyItemResult, HTTPGetManyResult
+    from planning.planner import PlannerAgent
+
+    urls = ["http://127.0.0.1:8001/data", "http://127.0.0.1:8001/slow?delay_ms=10"]
+    perception = PerceptionResult(
+        intent="retrieve data",
+        task_type=TaskType.DATA_RETRIEVAL,
+        entities={"raw_goal": "fetch " + " ".join(urls), "url": urls[0], "urls": urls},
+        success_criteria=["http result captured"],
+    )
+    plan = PlannerAgent(test_config).build_plan(perception, registry.catalog())
+    assert plan.steps[0].tool_name == "http_get_many"
+    seen = []
+
+    def fake_many(args, ctx):
+        seen.append([item.timeout_s for item in args.requests])
+        if len(seen) == 1:
+            # Every item timing out makes the tool raise, so failed_indices only travel in the diagnostics.
+            raise ToolExecutionError(
+                "all timed out", failure_type=FailureType.TIMEOUT, diagnostics={"failed_indices": [0, 1]}
+            )
+        items = [HTTPGetManyItemResult(index=i, url=r.url, ok=True, body={}) for i, r in enumerate(args.requests)]
+        return HTTPGetManyResult(ok=True, message="ok", items=items, succeeded=len(items), failed_indices=[])
+
+    registry.get("http_get_many").handler = fake_many
+    run_ctx = run_context_factory(run_trace)
+    Executor().run(plan, perception, run_ctx)
+
+    assert len(seen) == 2
+    assert all(after > before for before, after in zip(seen[0], seen[1]))
+    assert run_ctx.trace.refinements[0].patched_args["only_indices"] == [0, 1]
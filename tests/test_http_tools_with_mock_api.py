@@ -2,11 +2,14 @@ from __future__ import annotations
 
 from fastapi.testclient import TestClient
 import importlib
+from pathlib import Path
 import pytest
+import time
 
 from core.exceptions import ToolExecutionError
 from core.types import ToolExecutionContext
 from execution.tool_schemas import HTTPGetArgs, HTTPPostArgs
+from execution.tools.http_body import prune_spills, spill_dir
 from execution.tools.http_get_tool import http_get_tool
 from execution.tools.http_post_tool import http_post_tool
 from mock_api.server import create_app
@@ -34,6 +37,9 @@ class _PatchedHTTPXClient:
     def post(self, url, json=None, headers=None):
         return self.test_client.post(self._strip(url), json=json, headers=headers)
 
+    def stream(self, method, url, **kwargs):
+        return self.test_client.stream(method, self._strip(url), **kwargs)
+
 
 def _ctx(test_config):
     return ToolExecutionContext(
@@ -68,3 +74,35 @@ def test_http_tools_with_mock_api_routes(monkeypatch, test_config):
 
     with pytest.raises(ToolExecutionError):
         http_get_tool(HTTPGetArgs(url="http://127.0.0.1:8001/malformed?kind=json_text", expect_json=True), _ctx(test_config))
+
+
+def test_http_get_spills_oversized_body_to_workspace(monkeypatch, test_config):
+    client = TestClient(create_app())
+    http_get_mod = importlib.import_module("execution.tools.http_get_tool")
+    monkeypatch.setattr(http_get_mod.httpx, "Client", lambda *a, **k: _PatchedHTTPXClient(client))
+
+    res = http_get_tool(HTTPGetArgs(url="http://127.0.0.1:8001/data", max_body_bytes=16), _ctx(test_config))
+    assert res.ok is True
+    assert res.body is None
+    assert res.body_ref["bytes"] == res.data["body_bytes"] > 16
+    spilled = Path(res.body_ref["path"])
+    assert b'"sum":14' in spilled.read_bytes()
+    assert res.body_ref["preview"].startswith('{"ok"')
+
+
+def test_spilled_bodies_are_pruned_after_the_retention_window(test_config, tmp_path):
+    test_config = test_config.model_copy(update={"file_workspace_root": tmp_path})
+    root = spill_dir(test_config)
+    root.mkdir(parents=True, exist_ok=True)
+    ours, theirs = root / "r_s1_1.body", root / "other_s1_1.body"
+    for path in (ours, theirs):
+        path.write_bytes(b"x")
+
+    assert prune_spills(test_config, "r") == 0
+    assert prune_spills(test_config, "r", now=time.time() + test_config.http_spill_retention_s + 1) == 2
+    assert not any(root.iterdir())
+
+    for path in (ours, theirs):
+        path.write_bytes(b"x")
+    assert prune_spills(test_config.model_copy(update={"http_spill_retention_s": 0}), "r") == 1
+    assert [p.name for p in root.iterdir()] == ["other_s1_1.body"]
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import os
+import signal
+import time
+from threading import Thread, Timer
+
+import pytest
+
+from core.exceptions import WorkerCrashedError
+from core.types import JobStatus, RunStatus
+from main import OrchestrationEngine
+from memory.jobs import JobQueue
+from service import job_worker
+from service.job_worker import JobWorker, serve_job_workers
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lease_claims_each_job_once_across_workers(long_term_memory):
+    queue = JobQueue(long_term_memory)
+    ids = {queue.enqueue({"raw_goal": f"job {i}"}).job_id for i in range(20)}
+    claimed: list[list[str]] = []
+
+    def claim(owner: str) -> None:
+        batch: list[str] = []
+        while jobs := queue.lease(owner, limit=3):
+            batch.extend(j.job_id for j in jobs)
+        claimed.append(batch)
+
+    threads = [Thread(target=claim, args=(f"w{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    flat = [job_id for batch in claimed for job_id in batch]
+    assert sorted(flat) == sorted(ids)
+    assert queue.counts() == {"leased": 20}
+
+
+def test_priority_visibility_timeout_retry_and_dead_letter(long_term_memory):
+    clock = FakeClock()
+    queue = JobQueue(long_term_memory, lease_s=10, max_attempts=2, retry_backoff_s=5, clock=clock)
+    low = queue.enqueue({"raw_goal": "batch"}, priority=10)
+    high = queue.enqueue({"raw_goal": "interactive"}, priority=0)
+
+    [first] = queue.lease("a", limit=1)
+    assert first.job_id == high.job_id and first.attempts == 1
+
+    # Worker "a" goes silent: once the lease expires, the job is visible again.
+    clock.now += 11
+    leased = queue.lease("b", limit=2)
+    assert [j.job_id for j in leased] == [high.job_id, low.job_id]
+    assert queue.complete(high.job_id, "a") is False
+    assert queue.heartbeat("b", [high.job_id, low.job_id]) == 2
+
+    assert queue.complete(high.job_id, "b") is True
+    assert queue.retry(low.job_id, "b", "boom") == JobStatus.QUEUED
+    assert queue.lease("c") == []
+    clock.now += 5
+    [again] = queue.lease("c")
+    assert again.job_id == low.job_id and again.attempts == 2
+    assert queue.retry(low.job_id, "c", "boom again") == JobStatus.DEAD
+    assert queue.get(low.job_id).last_error == "boom again"
+    assert queue.counts() == {"done": 1, "dead": 1}
+
+
+def test_job_worker_runs_jobs_and_persists_runs(test_config):
+    engine = OrchestrationEngine(test_config)
+    queue = JobQueue(engine.long_term)
+    jobs = [queue.enqueue({"raw_goal": f"Calculate {i} + 1"}) for i in range(3)]
+
+    worker = JobWorker(engine, queue, owner="test-worker", batch_size=2)
+    assert worker.run_once() == 2
+    assert worker.run_once() == 1
+    assert worker.run_once() == 0
+
+    assert worker.stats["completed"] == 3
+    assert all(queue.get(j.job_id).status == JobStatus.DONE for j in jobs)
+    rows = engine.long_term.query("SELECT run_id, status FROM runs WHERE run_id IN (?,?,?)", [j.run_id for j in jobs])
+    assert {r["status"] for r in rows} == {RunStatus.COMPLETED.value}
+    assert len(rows) == 3
+
+
+def test_job_worker_retries_when_engine_raises(long_term_memory):
+    class BrokenEngine:
+        def run(self, *args, **kwargs):
+            raise RuntimeError("engine down")
+
+    queue = JobQueue(long_term_memory, max_attempts=1)
+    job = queue.enqueue({"raw_goal": "anything"})
+    worker = JobWorker(BrokenEngine(), queue, owner="w")
+    worker.run_once()
+    stored = queue.get(job.job_id)
+    assert stored.status == JobStatus.DEAD
+    assert "engine down" in stored.last_error
+    assert worker.stats["dead"] == 1
+
+
+def _exit_at_once(config_overrides, stop):
+    return None
+
+
+def _wait_for_stop(config_overrides, stop):
+    stop.wait(10)
+
+
+def test_serve_job_workers_gives_up_after_restart_limit(monkeypatch):
+    monkeypatch.setattr(job_worker, "run_job_worker", _exit_at_once)
+    with pytest.raises(WorkerCrashedError) as excinfo:
+        serve_job_workers(1, start_method="fork", max_restarts=2, restart_backoff_s=0.01)
+    assert excinfo.value.diagnostics["restarts"] == 2
+
+
+def test_serve_job_workers_drains_on_sigterm(monkeypatch):
+    monkeypatch.setattr(job_worker, "run_job_worker", _wait_for_stop)
+    handler = signal.getsignal(signal.SIGTERM)
+    Timer(0.3, os.kill, args=(os.getpid(), signal.SIGTERM)).start()
+    started = time.monotonic()
+    serve_job_workers(2, start_method="fork")
+    assert time.monotonic() - started < 5
+    assert signal.getsignal(signal.SIGTERM) == handler
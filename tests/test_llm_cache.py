@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+
+import httpx
+import pytest
+
+from core.metrics import MetricsRegistry
+from core.types import PerceptionResult
+from llm.cache import LLMResponseCache
+from llm.openai_compatible import OpenAICompatibleProvider
+
+
+class _FakeServer:
+    def __init__(self) -> None:
+        self.posts: list[dict] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.posts.append(body)
+        if "response_format" in body:
+            content = PerceptionResult(intent="x", task_type="unknown").model_dump_json()
+        else:
+            content = f"answer {len(self.posts)}"
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}], "usage": {"total_tokens": 42}})
+
+
+def _provider(test_config, server, cache, metrics=None):
+    cfg = test_config.model_copy(
+        update={"no_llm_mode": False, "openai_api_key": "k", "openai_base_url": "http://llm.local/v1", "llm_stream": False}
+    )
+    client = httpx.Client(transport=httpx.MockTransport(server))
+    return OpenAICompatibleProvider(cfg, cache=cache, metrics=metrics, client=client)
+
+
+def test_deterministic_completions_are_cached_in_memory_and_sqlite(test_config, long_term_memory):
+    server = _FakeServer()
+    metrics = MetricsRegistry()
+    provider = _provider(test_config, server, LLMResponseCache(ttl_s=60, long_term_memory=long_term_memory), metrics)
+
+    first = provider.generate_text("same prompt")
+    assert provider.generate_text("same prompt") == first
+    assert len(server.posts) == 1
+
+    provider.generate_text("same prompt", temperature=0.7)
+    provider.generate_text("same prompt", temperature=0.7)
+    assert len(server.posts) == 3
+
+    snapshot = metrics.snapshot()
+    assert snapshot["llm_cache_total|result=hit"] == 1
+    assert snapshot["llm_cache_saved_tokens_total"] == 42
+
+    cold = _provider(test_config, server, LLMResponseCache(ttl_s=60, long_term_memory=long_term_memory))
+    assert cold.generate_text("same prompt") == first
+    assert len(server.posts) == 3
+
+
+def test_schema_is_part_of_the_key_and_expired_entries_miss(test_config):
+    server = _FakeServer()
+    provider = _provider(test_config, server, LLMResponseCache(ttl_s=60))
+    provider.generate_text("PerceptionResult please")
+    provider.generate_structured("PerceptionResult please", PerceptionResult)
+    provider.generate_structured("PerceptionResult please", PerceptionResult)
+    assert len(server.posts) == 2
+
+    expired = _provider(test_config, server, LLMResponseCache(ttl_s=-1))
+    expired.generate_text("again")
+    expired.generate_text("again")
+    assert len(server.posts) == 4
+
+
+def test_invalid_or_truncated_output_is_not_cached(test_config):
+    posts: list[dict] = []
+    valid = PerceptionResult(intent="x", task_type="unknown").model_dump_json()
+
+    def server(request: httpx.Request) -> httpx.Response:
+        posts.append(json.loads(request.content))
+        content = '{"intent": "x", "task_ty' if len(posts) == 1 else valid
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}], "usage": {"total_tokens": 7}})
+
+    provider = _provider(test_config, server, LLMResponseCache(ttl_s=60))
+    with pytest.raises(ValueError):
+        provider.generate_structured("perceive", PerceptionResult)
+    assert provider.generate_structured("perceive", PerceptionResult).intent == "x"
+    assert len(posts) == 2
+
+    def cut_short(request: httpx.Request) -> httpx.Response:
+        posts.append(json.loads(request.content))
+        return httpx.Response(200, json={"choices": [{"message": {"content": "half"}, "finish_reason": "length"}]})
+
+    truncated = _provider(test_config, cut_short, LLMResponseCache(ttl_s=60))
+    truncated.generate_text("long answer")
+    truncated.generate_text("long answer")
+    assert len(posts) == 4
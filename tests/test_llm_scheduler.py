@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import httpx
+
+from core.types import ResourceUsage
+from llm.openai_compatible import OpenAICompatibleProvider
+from llm.scheduler import LLMScheduler
+
+
+def _rate_limited(retry_after: str) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "http://llm.local/v1/chat/completions")
+    response = httpx.Response(429, headers={"retry-after": retry_after}, request=request)
+    return httpx.HTTPStatusError("rate limited", request=request, response=response)
+
+
+def test_concurrency_cap_and_interactive_priority():
+    scheduler = LLMScheduler(max_concurrency=1)
+    gate = threading.Event()
+    order: list[str] = []
+
+    def blocker():
+        gate.wait(2)
+        return "first", 0
+
+    def record(name):
+        def call():
+            order.append(name)
+            return name, 0
+
+        return call
+
+    head = threading.Thread(target=scheduler.submit, args=(blocker,))
+    head.start()
+    time.sleep(0.05)
+    batch = threading.Thread(target=scheduler.submit, args=(record("batch"),), kwargs={"priority": "batch"})
+    batch.start()
+    time.sleep(0.05)
+    interactive = threading.Thread(target=scheduler.submit, args=(record("interactive"),))
+    interactive.start()
+    time.sleep(0.05)
+    assert order == []
+    gate.set()
+    for t in (head, batch, interactive):
+        t.join(2)
+    assert order == ["interactive", "batch"]
+
+
+def test_identical_in_flight_requests_are_coalesced():
+    scheduler = LLMScheduler(max_concurrency=4)
+    calls: list[int] = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.1)
+        return "shared", 10
+
+    results: list[tuple[str, bool]] = []
+    threads = [threading.Thread(target=lambda: results.append(scheduler.submit_shared(slow, coalesce_key="k"))) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(2)
+    # Only the leader's result is unshared, so only it charges usage and writes the cache.
+    assert sorted(results) == [("shared", False), ("shared", True), ("shared", True)]
+    assert len(calls) == 1
+    assert scheduler.stats["coalesced"] == 2
+
+
+def test_rate_limit_pauses_then_retries():
+    scheduler = LLMScheduler(max_concurrency=2)
+    attempts: list[float] = []
+
+    def flaky():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise _rate_limited("0.2")
+        return "ok", 0
+
+    assert scheduler.submit(flaky) == "ok"
+    assert attempts[1] - attempts[0] >= 0.19
+    assert scheduler.stats["rate_limited"] == 1
+
+
+def test_token_bucket_delays_requests_over_budget():
+    scheduler = LLMScheduler(max_concurrency=4, tokens_per_minute=600)
+    started = time.monotonic()
+    scheduler.submit(lambda: ("a", 600), estimated_tokens=600)
+    scheduler.submit(lambda: ("b", 5), estimated_tokens=5)
+    assert time.monotonic() - started >= 0.4
+
+
+def test_release_reconciles_against_the_tokens_actually_deducted():
+    scheduler = LLMScheduler(tokens_per_minute=600, clock=lambda: 0.0)
+    scheduler.submit(lambda: ("big", 100), estimated_tokens=5000)
+    assert scheduler._tokens == 500
+
+
+def test_coalesced_followers_do_not_charge_usage_again(test_config):
+    gate = threading.Event()
+    posts: list[int] = []
+
+    def server(request: httpx.Request) -> httpx.Response:
+        posts.append(1)
+        gate.wait(2)
+        usage = {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+        return httpx.Response(200, json={"choices": [{"message": {"content": "same"}}], "usage": usage})
+
+    cfg = test_config.model_copy(
+        update={"no_llm_mode": False, "openai_api_key": "k", "openai_base_url": "http://llm.local/v1", "llm_stream": False}
+    )
+    usage = ResourceUsage()
+    provider = OpenAICompatibleProvider(
+        cfg, client=httpx.Client(transport=httpx.MockTransport(server)), scheduler=LLMScheduler(), usage=usage
+    )
+    threads = [threading.Thread(target=provider.generate_text, args=("hi",)) for _ in range(3)]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    gate.set()
+    for t in threads:
+        t.join(2)
+    assert len(posts) == 1
+    assert usage.total_tokens == 15
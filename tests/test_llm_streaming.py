@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+
+import httpx
+
+from core.types import PerceptionResult, ResourceUsage
+from llm.cache import LLMResponseCache
+from llm.json_stream import JsonObjectScanner, first_json_object
+from llm.openai_compatible import OpenAICompatibleProvider
+
+
+def _sse(pieces: list[str], consumed: list[int], usage: dict | None = None, finish_reason: str = "stop"):
+    for i, piece in enumerate(pieces):
+        consumed.append(i)
+        event = {"choices": [{"delta": {"content": piece}}]}
+        yield f"data: {json.dumps(event)}\n\n".encode("utf-8")
+    yield f"data: {json.dumps({'choices': [{'delta': {}, 'finish_reason': finish_reason}]})}\n\n".encode("utf-8")
+    if usage is not None:
+        yield f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n".encode("utf-8")
+    yield b"data: [DONE]\n\n"
+
+
+def _provider(test_config, handler, usage=None, cache=None):
+    cfg = test_config.model_copy(update={"no_llm_mode": False, "openai_api_key": "k", "openai_base_url": "http://llm.local/v1"})
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    return OpenAICompatibleProvider(cfg, client=client, usage=usage, cache=cache)
+
+
+def test_streamed_structured_output_stops_when_object_closes(test_config):
+    consumed: list[int] = []
+    seen: list[dict] = []
+    obj = PerceptionResult(intent="get {x}", task_type="unknown").model_dump_json()
+    pieces = ["Sure: ", obj[:10], obj[10:], " trailing"] + [" chatter"] * 10
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(json.loads(request.content))
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=_sse(pieces, consumed))
+
+    result = _provider(test_config, handler).generate_structured("perceive", PerceptionResult)
+    assert result.intent == "get {x}"
+    assert seen[0]["stream"] is True
+    assert seen[0]["response_format"]["json_schema"]["name"] == "PerceptionResult"
+    assert max(consumed) < len(pieces) - 1
+
+
+def test_structured_stream_reads_the_usage_chunk_after_the_object(test_config):
+    consumed: list[int] = []
+    obj = PerceptionResult(intent="x", task_type="unknown").model_dump_json()
+    usage = ResourceUsage()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=_sse([obj, ""], consumed, {"prompt_tokens": 90, "completion_tokens": 30, "total_tokens": 120}))
+
+    assert _provider(test_config, handler, usage).generate_structured("perceive", PerceptionResult).intent == "x"
+    assert (usage.prompt_tokens, usage.completion_tokens) == (90, 30)
+
+
+def test_streamed_text_is_concatenated(test_config):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=_sse(["Hello", ", ", "world."], []))
+
+    assert _provider(test_config, handler).generate_text("hi") == "Hello, world."
+
+
+def test_streamed_completion_cut_off_by_max_tokens_is_not_cached(test_config):
+    posts: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        posts.append(1)
+        return httpx.Response(200, content=_sse(["A long", " answer that"], [], finish_reason="length"))
+
+    provider = _provider(test_config, handler, cache=LLMResponseCache(ttl_s=60))
+    assert provider.generate_text("explain", max_tokens=4) == "A long answer that"
+    provider.generate_text("explain", max_tokens=4)
+    assert len(posts) == 2
+
+
+def test_scanner_ignores_braces_inside_strings():
+    scanner = JsonObjectScanner()
+    assert scanner.feed('noise {"a": "}{\\"", "b": [1, {"c": 2}]') is False
+    assert scanner.feed("} tail") is True
+    assert json.loads(scanner.text) == {"a": '}{"', "b": [1, {"c": 2}]}
+    assert first_json_object("no object here") is None
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from core.types import PerceptionResult, Plan
+from llm.openai_compatible import OpenAICompatibleProvider
+from mock_api.llm_stub import StubSettings, create_llm_stub_app
+
+
+def _provider(test_config, settings: StubSettings, stream: bool = True) -> OpenAICompatibleProvider:
+    cfg = test_config.model_copy(
+        update={"no_llm_mode": False, "openai_api_key": "stub", "openai_base_url": "http://testserver", "llm_stream": stream}
+    )
+    return OpenAICompatibleProvider(cfg, client=TestClient(create_llm_stub_app(settings)))
+
+
+@pytest.mark.parametrize("stream", [True, False])
+def test_stub_returns_schema_valid_structured_payloads(test_config, stream):
+    provider = _provider(test_config, StubSettings(latency_p50_ms=1, latency_p99_ms=2, seed=1), stream=stream)
+    perception = provider.generate_structured("Fetch mock data and calculate 2 + 2", PerceptionResult)
+    assert perception.task_type.value in {"composite", "calculation", "data_retrieval"}
+    plan = provider.generate_structured("Fetch mock data and calculate 2 + 2", Plan)
+    assert {step.tool_name for step in plan.steps} >= {"calc"}
+    summary = provider.generate_text("Summarize the following in at most 1 sentences.\n\nFirst. Second. Third.")
+    assert summary == "First."
+
+
+def test_stub_injects_rate_limits_and_malformed_bodies(test_config):
+    limited = _provider(test_config, StubSettings(latency_p50_ms=1, latency_p99_ms=2, rate_limit_rate=1.0, retry_after_s=3))
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
+        limited.generate_text("hello")
+    assert exc_info.value.response.status_code == 429
+    assert exc_info.value.response.headers["retry-after"] == "3.0"
+
+    malformed = _provider(test_config, StubSettings(latency_p50_ms=1, latency_p99_ms=2, malformed_rate=1.0, seed=3), stream=False)
+    outcomes = []
+    for _ in range(6):
+        try:
+            outcomes.append(malformed.generate_structured("Calculate 2 + 2", PerceptionResult).intent)
+        except Exception as exc:
+            outcomes.append(type(exc).__name__)
+    assert any(o == "ValidationError" for o in outcomes)
+    assert any(o != "ValidationError" for o in outcomes)
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from perception.features import KEYWORDS, goal_features
+from perception.intent_extractor import extract_intent_and_entities
+from perception.task_classifier import classify_task
+from planning.planner import GOAL_KEYWORDS
+
+
+def test_keywords_match_as_substrings_including_overlaps():
+    assert goal_features("slowrite calculatedb").keywords == {"slow", "write", "calc", "calculate", "db"}
+    assert not goal_features("nothing relevant").keywords
+
+
+def test_features_are_computed_once_per_goal_and_cover_the_planner():
+    goal = "Calculate 2 + 3 and summarize; fetch http://localhost:8001/data and https://127.0.0.1/x"
+    features = goal_features(goal)
+    assert goal_features(goal) is features
+    assert features.expression == "2 + 3"
+    assert features.urls == ("http://localhost:8001/data", "https://127.0.0.1/x")
+    assert set(GOAL_KEYWORDS) <= set(KEYWORDS)
+
+
+def test_stages_consume_the_shared_features():
+    intent, entities = extract_intent_and_entities("Please SUM the numbers, then save ../out and __import__ it")
+    assert intent == "calculate a value"
+    assert entities["calc_requested"] and entities["write_requested"]
+    assert entities["unsafe_path"] and entities["unsafe_calc"]
+    assert "unsafe_calc" not in extract_intent_and_entities("calc __IMPORT__")[1]
+    # classify_task only counts a space-delimited "sum", so "sum," alone does not make it a calculation.
+    assert classify_task("sum, then summarize").value == "summarization"
+    assert classify_task("Submit the form via http post").value == "data_submission"
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from llm.heuristic_provider import HeuristicProvider
+from main import OrchestrationEngine
+from perception.agent import PerceptionAgent
+from planning.plan_cache import PlanCache, perception_signature
+from planning.plan_validator import validate_plan
+from planning.planner import PlannerAgent
+from planning.policy import PolicyEngine
+
+
+def _perceive(test_config, goal):
+    return PerceptionAgent(HeuristicProvider(test_config)).run(goal)
+
+
+def _plan(planner, registry, policy, perception, cache):
+    hit = cache.lookup(perception, planner, registry, policy)
+    if hit is not None:
+        return hit.plan
+    plan = validate_plan(planner.build_plan(perception, registry.catalog(), scratchpad={}), registry, policy).plan
+    cache.store(perception, plan, planner, registry, policy)
+    return plan
+
+
+def test_bound_template_matches_a_freshly_built_plan(test_config, registry):
+    planner, policy, cache = PlannerAgent(test_config), PolicyEngine(test_config), PlanCache()
+    base = test_config.mock_api_base_url
+    _plan(planner, registry, policy, _perceive(test_config, f"Fetch {base}/data?key=a and calc: 2 + 3 then summarize"), cache)
+
+    perception = _perceive(test_config, f"Fetch {base}/data?key=b and calc: 7 * 6 then summarize")
+    bound = cache.lookup(perception, planner, registry, policy)
+    fresh = validate_plan(planner.build_plan(perception, registry.catalog(), scratchpad={}), registry, policy).plan
+
+    assert bound is not None
+    assert [s.model_dump() for s in bound.plan.steps] == [s.model_dump() for s in fresh.steps]
+    assert bound.plan.steps[0].tool_args["url"].endswith("key=b")
+    assert cache.stats == {"hits": 1, "misses": 1, "stores": 1}
+
+
+def test_bound_plans_do_not_share_state_with_the_template(test_config, registry):
+    planner, policy, cache = PlannerAgent(test_config), PolicyEngine(test_config), PlanCache()
+    perception = _perceive(test_config, "Calculate 2 + 3 and summarize the result")
+    first = _plan(planner, registry, policy, perception, cache)
+    first.steps[0].tool_args["expression"] = "mutated"
+    first.steps[1].tool_args["text"] = "mutated"
+
+    again = cache.lookup(perception, planner, registry, policy).plan
+    assert again.steps[0].tool_args["expression"] == "2 + 3"
+    assert again.steps[1].tool_args["text"] == "Summarize run observations"
+
+
+def test_signature_and_invalidation(test_config, registry):
+    planner, policy, cache = PlannerAgent(test_config), PolicyEngine(test_config), PlanCache()
+    perception = _perceive(test_config, "Calculate 2 + 3 and summarize the result")
+    _plan(planner, registry, policy, perception, cache)
+
+    assert perception_signature(perception) != perception_signature(_perceive(test_config, "Calculate 2 + 3 and save the result"))
+    assert perception_signature(perception) == perception_signature(_perceive(test_config, "calculate 9 - 1 and summarize it"))
+
+    registry.register(registry.get("calc"))
+    assert cache.lookup(perception, planner, registry, policy) is None
+    _plan(planner, registry, policy, perception, cache)
+    stricter = PolicyEngine(test_config.model_copy(update={"allowed_http_hosts": ["localhost"]}))
+    assert cache.lookup(perception, planner, registry, stricter) is None
+    assert cache.lookup(perception, planner, registry, policy) is not None
+
+
+def test_engine_binds_per_request_expression(test_config):
+    engine = OrchestrationEngine(test_config)
+    engine.run("Calculate 2 + 3 and summarize the result", export_trace=False)
+    trace = engine.run("Calculate 10 * 4 and summarize the result", export_trace=False)
+
+    calc = next(c for c in trace.tool_calls if c.tool_name == "calc")
+    assert calc.validated_args["expression"] == "10 * 4"
+    assert calc.result["result"] == 40
+    assert trace.metrics_snapshot["plan_cache_total|result=hit"] == 1
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from core.types import RunStatus, RunTrace, ToolCallRecord, ToolCallStatus
+from main import OrchestrationEngine
+from memory.run_cache import RunCache, run_cache_key
+
+REQUEST = "Calculate 2 + 3 and summarize the result"
+
+
+def _count_calls(engine, tool_name):
+    spec = engine.registry.get(tool_name)
+    original = spec.handler
+    calls = []
+
+    def counted(args, ctx):
+        calls.append(args)
+        return original(args, ctx)
+
+    spec.handler = counted
+    return calls
+
+
+def test_identical_request_returns_the_cached_result(test_config):
+    engine = OrchestrationEngine(test_config.model_copy(update={"run_cache_enabled": True, "tool_memo_max_entries": 0}))
+    calc_calls = _count_calls(engine, "calc")
+
+    first = engine.run(REQUEST, export_trace=False)
+    second = engine.run(f"  {REQUEST.replace(' ', '  ')} ", export_trace=False)
+
+    assert len(calc_calls) == 1
+    assert second.status == first.status == RunStatus.COMPLETED
+    assert second.run_id != first.run_id
+    assert second.final_output["meta"]["cached_from"] == first.run_id
+    assert all(c.from_cache for c in second.tool_calls)
+    assert second.metrics_snapshot.get("run_cache_total|result=hit") == 1
+    assert engine.long_term.load_trace(second.run_id) is not None
+
+    engine.run(REQUEST, context={"tenant": "b"}, export_trace=False)
+    assert len(calc_calls) == 2
+
+
+def test_only_deterministic_steps_are_reused_when_the_run_is_not_fully_cacheable(test_config):
+    engine = OrchestrationEngine(test_config.model_copy(update={"run_cache_enabled": True, "tool_memo_max_entries": 0}))
+    engine.registry.get("summarize").cacheable = False
+    calc_calls = _count_calls(engine, "calc")
+    summarize_calls = _count_calls(engine, "summarize")
+
+    engine.run(REQUEST, export_trace=False)
+    second = engine.run(REQUEST, export_trace=False)
+
+    assert (len(calc_calls), len(summarize_calls)) == (1, 2)
+    assert [(c.tool_name, c.from_cache) for c in second.tool_calls] == [("calc", True), ("summarize", False)]
+    assert second.status == RunStatus.COMPLETED
+
+
+def test_entries_expire_and_are_invalidated_by_writes_to_tables_they_read(long_term_memory, test_config):
+    now = [1000.0]
+    cache = RunCache(long_term_memory, ttl_s=60, clock=lambda: now[0])
+    trace = RunTrace(
+        trace_id="t",
+        run_id="r1",
+        request={},
+        status=RunStatus.COMPLETED,
+        tool_calls=[
+            ToolCallRecord(
+                step_id="s1",
+                step_attempt_id="a",
+                tool_name="db_query",
+                validated_args={"sql": "SELECT * FROM demo_numbers", "readonly": True},
+                status=ToolCallStatus.SUCCESS,
+                result={"data": {"tables": ["demo_numbers"]}},
+            )
+        ],
+    )
+    cacheable = {"db_query"}.__contains__
+    key = run_cache_key("q", {}, test_config)
+
+    assert cache.put(key, trace, cacheable)
+    assert cache.get(key) == {"run_id": "r1", "reusable": True}
+    long_term_memory.execute("INSERT INTO memory_entries(namespace, key, value_text, created_at) VALUES('n','k','v','now')")
+    assert cache.get(key) is not None
+    long_term_memory.execute("UPDATE demo_numbers SET value = value + 1 WHERE id = 1")
+    assert cache.get(key) is None
+
+    cache.put(key, trace, cacheable)
+    now[0] += 61
+    assert cache.get(key) is None
+
+    trace.status = RunStatus.FAILED
+    assert not cache.put(key, trace, cacheable)
+
+
+def test_llm_backed_summaries_are_not_reused(test_config, long_term_memory, registry):
+    cache = RunCache(long_term_memory, ttl_s=60)
+    calls = [
+        ToolCallRecord(
+            step_id=f"s{i}",
+            step_attempt_id="a",
+            tool_name=name,
+            validated_args=args,
+            status=ToolCallStatus.SUCCESS,
+            result={"ok": True},
+        )
+        for i, (name, args) in enumerate([("calc", {"expression": "2 + 3"}), ("summarize", {"text": "five"})])
+    ]
+    trace = RunTrace(trace_id="t", run_id="r1", request={}, status=RunStatus.COMPLETED, tool_calls=calls)
+    llm_config = test_config.model_copy(update={"no_llm_mode": False, "openai_api_key": "k"})
+
+    def cacheable(name):
+        return registry.is_cacheable(name, llm_config)
+
+    key = run_cache_key("q", {}, llm_config)
+    cache.put(key, trace, cacheable)
+    assert cache.get(key)["reusable"] is False
+    assert [c.tool_name for c in RunCache.reusable_calls(trace, cacheable)] == ["calc"]
+    assert [c.tool_name for c in RunCache.reusable_calls(trace, lambda name: registry.is_cacheable(name, test_config))] == [
+        "calc",
+        "summarize",
+    ]
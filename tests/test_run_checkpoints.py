@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+
+from core.types import RunStatus
+from main import OrchestrationEngine
+from memory.checkpoints import load_checkpoint
+
+REQUEST = "Calculate 2 + 3 and summarize the result"
+
+
+class WorkerDied(BaseException):
+    pass
+
+
+def _crash_on(engine, tool_name):
+    spec = engine.registry.get(tool_name)
+    original = spec.handler
+
+    def crash(args, ctx):
+        raise WorkerDied()
+
+    spec.handler = crash
+    return lambda: setattr(spec, "handler", original)
+
+
+def _count_calls(engine, tool_name):
+    spec = engine.registry.get(tool_name)
+    original = spec.handler
+    calls = []
+
+    def counted(args, ctx):
+        calls.append(args)
+        return original(args, ctx)
+
+    spec.handler = counted
+    return calls
+
+
+def _interrupted_run(engine, tool_name, run_id="run-1"):
+    restore = _crash_on(engine, tool_name)
+    try:
+        engine.run(REQUEST, export_trace=False, run_id=run_id)
+    except WorkerDied:
+        pass
+    restore()
+
+
+def test_resume_continues_after_the_last_completed_step(test_config):
+    engine = OrchestrationEngine(test_config)
+    calc_calls = _count_calls(engine, "calc")
+    _interrupted_run(engine, "summarize")
+
+    checkpoint = load_checkpoint(engine.long_term, "run-1")
+    assert checkpoint.step_index == 1 and checkpoint.completed_steps == 1
+    assert [c.tool_name for c in checkpoint.tool_calls] == ["calc"]
+    assert "s1" in checkpoint.state.get("last_step_id", "")
+
+    trace = engine.resume("run-1", export_trace=False)
+    assert trace.status == RunStatus.COMPLETED
+    assert len(calc_calls) == 1
+    assert [c.tool_name for c in trace.tool_calls] == ["calc", "summarize"]
+    assert load_checkpoint(engine.long_term, "run-1") is None
+    assert engine.resume("run-1").run_id == "run-1"
+    assert engine.resume("never-started") is None
+
+
+def test_checkpoints_are_written_as_deltas(test_config):
+    engine = OrchestrationEngine(test_config)
+    _interrupted_run(engine, "summarize")
+
+    rows = engine.long_term.query("SELECT kind, payload_json FROM run_checkpoints WHERE run_id = ? ORDER BY seq", ["run-1"])
+    assert [r["kind"] for r in rows] == ["base", "step"]
+    delta = json.loads(rows[1]["payload_json"])
+    assert "steps" not in delta and "plan" not in delta
+    assert [c["tool_name"] for c in delta["tool_calls"]] == ["calc"]
+    assert set(delta["state"]) >= {"last_tool", "calculation result available"}
+
+
+def test_resume_refuses_to_repeat_an_in_flight_non_idempotent_step(test_config):
+    engine = OrchestrationEngine(test_config)
+    engine.registry.get("calc").idempotent = False
+    _interrupted_run(engine, "calc")
+    assert load_checkpoint(engine.long_term, "run-1").pending_call["tool_name"] == "calc"
+
+    refused = engine.resume("run-1", export_trace=False)
+    assert refused.status == RunStatus.FAILED
+    assert "not idempotent" in refused.stop_reason.message
+
+    _interrupted_run(engine, "calc", run_id="run-2")
+    forced = engine.resume("run-2", export_trace=False, reexecute_unsafe=True)
+    assert forced.status == RunStatus.COMPLETED
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import pytest
+
+from core.deadline import CancellationToken, Deadline, clamp_timeout
+from core.exceptions import RunInterruptedError, ToolExecutionError
+from core.types import FailureType, PerceptionResult, Plan, PlanStep, RunStatus, StopReasonType, TaskType
+from execution.executor import Executor
+from main import OrchestrationEngine
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _perception() -> PerceptionResult:
+    return PerceptionResult(
+        intent="calc",
+        task_type=TaskType.CALCULATION,
+        entities={"raw_goal": "calc"},
+        success_criteria=["summary produced"],
+    )
+
+
+def _plan() -> Plan:
+    return Plan(
+        steps=[
+            PlanStep(step_id="s1", objective="calc", tool_name="calc", tool_args={"expression": "1+1"}, expected_observation=""),
+            PlanStep(step_id="s2", objective="calc", tool_name="calc", tool_args={"expression": "2+2"}, expected_observation=""),
+        ],
+        max_retries_per_step=5,
+    )
+
+
+def test_deadline_clamps_timeouts_and_refuses_late_calls():
+    clock = FakeClock()
+    deadline = Deadline(2.0, clock=clock)
+    assert deadline.clamp(10.0) == 2.0
+    assert deadline.clamp(0.5) == 0.5
+    assert Deadline(0, clock=clock).clamp(10.0) == 10.0
+
+    clock.now += 1.5
+    assert deadline.clamp(None) == pytest.approx(0.5)
+    deadline.check("tool calc")
+
+    clock.now += 1.0
+    assert deadline.expired
+    assert deadline.stop_reason().type == StopReasonType.DEADLINE_EXCEEDED
+    with pytest.raises(RunInterruptedError) as err:
+        deadline.check("tool calc")
+    assert err.value.failure_type == FailureType.TIMEOUT
+
+    deadline.token.cancel("caller gone")
+    assert deadline.stop_reason().type == StopReasonType.CANCELLED
+
+
+def test_executor_stops_retrying_once_the_deadline_passes(registry, run_trace, run_context_factory):
+    clock = FakeClock()
+    seen_timeouts = []
+
+    def slow_timeout(args, ctx):
+        seen_timeouts.append(clamp_timeout(ctx, 10.0))
+        clock.now += 3.0
+        raise ToolExecutionError("timed out", failure_type=FailureType.TIMEOUT)
+
+    registry.get("calc").handler = slow_timeout
+    run_ctx = run_context_factory(run_trace)
+    run_ctx.deadline = Deadline(5.0, clock=clock)
+    result = Executor().run(_plan(), _perception(), run_ctx)
+
+    assert result.status == RunStatus.STOPPED
+    assert result.stop_reason.type == StopReasonType.DEADLINE_EXCEEDED
+    assert seen_timeouts == [5.0, 2.0]
+    assert len(run_trace.tool_calls) == 2
+
+
+def test_cancellation_stops_at_the_next_step_boundary(registry, run_trace, run_context_factory):
+    token = CancellationToken()
+    original = registry.get("calc").handler
+
+    def cancel_after_first(args, ctx):
+        token.cancel("caller went away")
+        return original(args, ctx)
+
+    registry.get("calc").handler = cancel_after_first
+    run_ctx = run_context_factory(run_trace)
+    run_ctx.deadline = Deadline(token=token)
+    result = Executor().run(_plan(), _perception(), run_ctx)
+
+    assert result.stop_reason.type == StopReasonType.CANCELLED
+    assert result.stop_reason.message == "caller went away"
+    assert [c.step_id for c in run_trace.tool_calls] == ["s1"]
+
+
+def test_engine_run_honours_a_pre_cancelled_token(test_config):
+    token = CancellationToken()
+    token.cancel()
+    trace = OrchestrationEngine(test_config).run("Calculate 2 + 3", export_trace=False, cancel=token)
+    assert trace.status == RunStatus.STOPPED
+    assert trace.stop_reason.type == StopReasonType.CANCELLED
+    assert trace.tool_calls == []
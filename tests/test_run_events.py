@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import json
+
+from core.types import RunEventType
+from execution.events import EventBus, NdjsonEventWriter
+from main import run_orchestration
+
+
+def test_run_orchestration_streams_ordered_events(test_config, monkeypatch, tmp_path):
+    monkeypatch.setattr("main.load_config", lambda overrides=None: test_config)
+    seen = []
+    writer = NdjsonEventWriter(tmp_path / "events.ndjson")
+
+    def on_event(event):
+        seen.append(event)
+        writer(event)
+
+    trace, _ = run_orchestration("Calculate 2 + 3", export_trace=False, on_event=on_event)
+
+    types = [e.type for e in seen]
+    assert types[0] == RunEventType.RUN_START
+    assert types[-1] == RunEventType.STOP
+    assert types.count(RunEventType.STOP) == 1
+    assert RunEventType.STEP_START in types and RunEventType.TOOL_CALL in types
+    assert [e.seq for e in seen] == list(range(1, len(seen) + 1))
+    assert {e.run_id for e in seen} == {trace.run_id}
+    assert seen[-1].data["status"] == trace.status.value
+    assert len([e for e in seen if e.type == RunEventType.STEP]) == len(trace.step_events)
+
+    lines = (tmp_path / "events.ndjson").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["seq"] for line in lines] == [e.seq for e in seen]
+
+
+def test_late_subscriber_replays_history_and_broken_consumer_is_isolated():
+    bus = EventBus("t", "r")
+
+    def broken(event):
+        raise RuntimeError("consumer bug")
+
+    bus.subscribe(broken)
+    bus.emit(RunEventType.RUN_START, steps=1)
+    bus.emit(RunEventType.STEP_START, "s1", attempt=1)
+
+    late = []
+    unsubscribe = bus.subscribe(late.append, replay=True)
+    bus.emit(RunEventType.STOP, status="COMPLETED")
+    unsubscribe()
+    bus.emit(RunEventType.STEP, "s1")
+
+    assert [e.seq for e in late] == [1, 2, 3]
+    assert bus.closed
+
+
+def test_run_orchestration_reuses_a_warm_engine_per_config(test_config, monkeypatch):
+    monkeypatch.setattr("main.load_config", lambda overrides=None: test_config)
+    run_orchestration("Calculate 2 + 3 and summarize the result", export_trace=False)
+    trace, _ = run_orchestration("Calculate 10 * 4 and summarize the result", export_trace=False)
+
+    assert trace.metrics_snapshot["plan_cache_total|result=hit"] == 1
+    calc = next(c for c in trace.tool_calls if c.tool_name == "calc")
+    assert calc.result["result"] == 40
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+from threading import Event
+
+from fastapi.testclient import TestClient
+
+from core.types import RunStatus, RunTrace, StepEvent, StepStatus, StopReason, StopReasonType
+from main import OrchestrationEngine
+from service.server import AdmissionController, create_service_app
+
+
+def test_sync_run_then_get_and_events(test_config):
+    app = create_service_app(test_config, engine=OrchestrationEngine(test_config))
+    client = TestClient(app)
+
+    created = client.post("/runs", json={"request": "Calculate 2 + 3", "mode": "sync"})
+    assert created.status_code == 200
+    body = created.json()
+    assert body["status"] == RunStatus.COMPLETED.value
+
+    fetched = client.get(f"/runs/{body['run_id']}")
+    assert fetched.status_code == 200
+    assert fetched.json()["trace"]["run_id"] == body["run_id"]
+
+    events = client.get(f"/runs/{body['run_id']}/events").text
+    assert "event: step" in events
+    done = [line for line in events.splitlines() if line.startswith("data:")][-1]
+    assert json.loads(done[len("data: ") :])["status"] == RunStatus.COMPLETED.value
+
+    assert client.get("/runs/unknown").status_code == 404
+
+
+def test_saturated_service_returns_429_with_retry_after(test_config):
+    release = Event()
+
+    class BlockingEngine:
+        def run(self, raw_goal, context=None, run_id=None, on_start=None, **kwargs):
+            trace = RunTrace(trace_id="t", run_id=run_id, request={"raw_goal": raw_goal}, status=RunStatus.EXECUTING)
+            on_start(trace)
+            release.wait(5)
+            trace.step_events.append(StepEvent(step_id="s1", attempt=1, status=StepStatus.SUCCESS, message="ok"))
+            trace.status = RunStatus.COMPLETED
+            return trace
+
+    config = test_config.model_copy(update={"service_max_in_flight": 1, "service_max_queue": 1})
+    client = TestClient(create_service_app(config, engine=BlockingEngine()))
+
+    first = client.post("/runs", json={"request": "a"})
+    second = client.post("/runs", json={"request": "b"})
+    third = client.post("/runs", json={"request": "c"})
+    assert first.status_code == second.status_code == 202
+    assert third.status_code == 429
+    assert int(third.headers["Retry-After"]) >= 1
+
+    release.set()
+    events = client.get(f"/runs/{first.json()['run_id']}/events").text
+    assert "event: done" in events
+    assert client.get(f"/runs/{second.json()['run_id']}/events").status_code == 200
+    assert client.post("/runs", json={"request": "d"}).status_code == 202
+
+
+def test_admission_controller_counts_queue_and_in_flight():
+    admission = AdmissionController(max_in_flight=2, max_queue=0)
+    assert admission.try_admit() is None
+    assert admission.try_admit() is None
+    assert admission.try_admit() is not None
+    admission.started()
+    admission.finished(0.5)
+    assert admission.try_admit() is None
+    assert admission.snapshot()["rejected"] == 1
+
+
+def test_delete_cancels_a_running_run(test_config, long_term_memory):
+    class CancellableEngine:
+        long_term = long_term_memory
+
+        def run(self, raw_goal, run_id=None, on_start=None, cancel=None, **kwargs):
+            trace = RunTrace(trace_id="t", run_id=run_id, request={"raw_goal": raw_goal}, status=RunStatus.EXECUTING)
+            on_start(trace)
+            cancel.wait(5)
+            trace.status = RunStatus.STOPPED
+            trace.stop_reason = StopReason(type=StopReasonType.CANCELLED, message=cancel.reason)
+            return trace
+
+    client = TestClient(create_service_app(test_config, engine=CancellableEngine()))
+    run_id = client.post("/runs", json={"request": "a", "deadline_s": 30}).json()["run_id"]
+
+    assert client.delete(f"/runs/{run_id}").status_code == 202
+    client.get(f"/runs/{run_id}/events")
+    assert client.get(f"/runs/{run_id}").json()["stop_reason"] == StopReasonType.CANCELLED.value
+    assert client.delete(f"/runs/{run_id}").status_code == 409
+    assert client.delete("/runs/unknown").status_code == 404
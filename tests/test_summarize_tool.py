@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import threading
+
 from core.types import ToolExecutionContext
 from execution.tool_schemas import SummarizeArgs
 from execution.tools.summarize_tool import summarize_tool
+from llm.heuristic_provider import HeuristicProvider
+from llm.provider import LLMProvider
+from llm.summarization import iter_chunks, summarize_text
 from memory.short_term import ShortTermMemory
 
 
@@ -25,3 +30,41 @@ def test_summarize_tool_uses_heuristic_provider_in_no_llm_mode(test_config):
     assert res.ok is True
     assert "Sentence one." in res.summary
 
+
+
+class _RecordingProvider(LLMProvider):
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, int | None]] = []
+        self.lock = threading.Lock()
+
+    def generate_text(self, prompt: str, **kwargs):
+        with self.lock:
+            self.calls.append((kwargs["text"], kwargs.get("max_tokens")))
+        return kwargs["text"].split(".")[0] + "."
+
+    def generate_structured(self, prompt, schema, **kwargs):
+        raise NotImplementedError
+
+
+def test_iter_chunks_prefers_sentence_breaks_and_covers_input():
+    text = " ".join(f"Sentence number {i}." for i in range(200))
+    chunks = list(iter_chunks(text, 100))
+    assert "".join(chunks) == text
+    assert all(len(c) <= 100 for c in chunks)
+    assert all(c.rstrip().endswith(".") for c in chunks)
+
+
+def test_heuristic_summary_stops_after_enough_sentences(test_config):
+    provider = HeuristicProvider(test_config)
+    text = " ".join(f"Fact {i} holds." for i in range(50_000))
+    assert summarize_text(provider, text, 3, chunk_chars=500) == "Fact 0 holds. Fact 1 holds. Fact 2 holds."
+    assert provider.generate_text(text, text=text, max_sentences=2) == "Fact 0 holds. Fact 1 holds."
+
+
+def test_llm_summary_maps_chunks_with_token_budget_then_reduces():
+    provider = _RecordingProvider()
+    text = " ".join(f"Observation {i} was recorded." for i in range(100))
+    summary = summarize_text(provider, text, 2, chunk_chars=300, max_workers=4, chunk_max_tokens=64)
+    assert summary == "Observation 0 was recorded."
+    assert len(provider.calls) > 2
+    assert {budget for _, budget in provider.calls} == {64}
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import uuid
+from pathlib import Path
+
+import pytest
+
+from core.exceptions import ToolExecutionError
+from core.types import BudgetGuard, FailureType, PerceptionResult, Plan, PlanStep, RunStatus, RunTrace, TaskType
+from core.tracing import new_run_id, new_trace_id
+from execution.cassette import CassetteMiss, ToolCassette, cassette_key
+from execution.executor import Executor
+from execution.tool_registry import ToolRegistry
+from execution.tool_schemas import CalcArgs, CalcResult
+
+
+def _cassette_path() -> Path:
+    return Path("runtime") / "cassettes" / f"test_{uuid.uuid4().hex}.json"
+
+
+def _perception() -> PerceptionResult:
+    return PerceptionResult(
+        intent="calc",
+        task_type=TaskType.CALCULATION,
+        entities={"raw_goal": "calculate"},
+        constraints=[],
+        success_criteria=["calculation result available"],
+        initial_state={},
+    )
+
+
+def _plan() -> Plan:
+    return Plan(
+        steps=[
+            PlanStep(
+                step_id="s1",
+                objective="calc",
+                tool_name="calc",
+                tool_args={"expression": "1 + 2"},
+                expected_observation="3",
+                fallback_strategy="retry",
+            )
+        ],
+        max_steps=3,
+        max_retries_per_step=2,
+        budget_guard=BudgetGuard(max_cost_units=10),
+    )
+
+
+def _run(registry, run_context_factory):
+    trace = RunTrace(trace_id=new_trace_id(), run_id=new_run_id(), request={"raw_goal": "calc", "context": {}})
+    run_ctx = run_context_factory(trace)
+    run_ctx.registry = registry
+    Executor().run(_plan(), _perception(), run_ctx)
+    return trace
+
+
+def test_recorded_run_replays_identically_without_calling_tools(run_context_factory):
+    path = _cassette_path()
+    attempts = {"n": 0}
+
+    def flaky_calc(args: CalcArgs, ctx):
+        attempts["n"] += 1
+        if attempts["n"] == 1:
+            raise ToolExecutionError("transient calc failure", failure_type=FailureType.TOOL_ERROR)
+        return CalcResult(ok=True, message="ok", data={}, result=3)
+
+    recording = ToolRegistry()
+    recording.register_defaults()
+    recording.get("calc").handler = flaky_calc
+    recording.use_cassette(ToolCassette(path, "record"))
+    recorded = _run(recording, run_context_factory)
+    recording.cassette.save()
+
+    def never_called(args: CalcArgs, ctx):
+        raise AssertionError("replay must not execute the tool")
+
+    replaying = ToolRegistry()
+    replaying.register_defaults()
+    replaying.get("calc").handler = never_called
+    replaying.use_cassette(ToolCassette(path, "replay"))
+    replayed = _run(replaying, run_context_factory)
+
+    assert recorded.status == replayed.status == RunStatus.COMPLETED
+    assert [c.status for c in replayed.tool_calls] == [c.status for c in recorded.tool_calls]
+    assert [c.error for c in replayed.tool_calls] == [c.error for c in recorded.tool_calls]
+    assert replayed.tool_calls[-1].result == recorded.tool_calls[-1].result
+    assert replaying.cassette.stats["replayed"] == 2
+
+
+def test_exported_trace_loads_as_cassette(registry, run_context_factory):
+    recorded = _run(registry, run_context_factory)
+    path = _cassette_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(recorded.model_dump_json(), encoding="utf-8")
+
+    cassette = ToolCassette(path, "replay", strict=True)
+    assert len(cassette) == 1
+    replaying = ToolRegistry()
+    replaying.register_defaults()
+    replaying.use_cassette(cassette)
+    assert replaying.execute("calc", {"expression": "1 + 2"}, None).result == 3
+    with pytest.raises(CassetteMiss):
+        replaying.execute("calc", {"expression": "2 + 2"}, None)
+
+
+def test_cassette_key_ignores_adaptive_timeouts():
+    base = {"url": "http://127.0.0.1:8001/slow", "timeout_s": 2.0}
+    assert cassette_key("http_get", base) == cassette_key("http_get", {**base, "timeout_s": 0.4})
+    assert cassette_key("http_get", base) != cassette_key("http_get", {**base, "url": "http://127.0.0.1:8001/data"})
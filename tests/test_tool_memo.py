@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from core.metrics import MetricsRegistry
+from core.types import ToolExecutionContext
+from execution.cassette import ToolCassette
+from execution.tool_registry import ToolRegistry
+from execution.tool_schemas import CalcResult, SummarizeResult
+
+
+def _ctx(test_config, long_term_memory):
+    return ToolExecutionContext(
+        trace_id="t",
+        run_id="r",
+        step_id="s1",
+        attempt=1,
+        config=test_config,
+        long_term_memory=long_term_memory,
+        short_term_memory=None,
+        logger=None,
+        metrics=MetricsRegistry(),
+    )
+
+
+def _counting_registry(memo_max_entries=256):
+    registry = ToolRegistry(memo_max_entries=memo_max_entries)
+    registry.register_defaults()
+    calls = []
+
+    def counted(args, ctx):
+        calls.append(args.expression)
+        return CalcResult(ok=True, message="ok", result=len(calls))
+
+    registry.get("calc").handler = counted
+    return registry, calls
+
+
+def test_pure_tool_results_are_memoized_on_validated_args(test_config, long_term_memory):
+    registry, calls = _counting_registry()
+    first = _ctx(test_config, long_term_memory)
+    assert registry.execute("calc", {"expression": "2 + 3"}, first).result == 1
+    assert first.from_cache is False
+
+    second = _ctx(test_config, long_term_memory)
+    assert registry.execute("calc", {"expression": "2 + 3", "bindings": {}}, second).result == 1
+    assert second.from_cache is True
+    assert calls == ["2 + 3"]
+    assert second.metrics.snapshot()["tool_memo_total|result=hit,tool=calc"] == 1
+    assert registry.memo_stats()["calc"] == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_memo_is_a_bounded_lru_per_tool(test_config, long_term_memory):
+    registry, calls = _counting_registry(memo_max_entries=2)
+    for expression in ("1", "2", "1", "3", "1", "2"):
+        registry.execute("calc", {"expression": expression}, _ctx(test_config, long_term_memory))
+
+    # "2" was the least recently used when "3" arrived, so only it was evicted and recomputed.
+    assert calls == ["1", "2", "3", "2"]
+    assert registry.memo_stats()["calc"]["entries"] == 2
+
+
+def test_impure_calls_and_disabled_memo_always_run(test_config, long_term_memory):
+    registry, calls = _counting_registry(memo_max_entries=0)
+    for _ in range(2):
+        registry.execute("calc", {"expression": "1"}, _ctx(test_config, long_term_memory))
+    assert calls == ["1", "1"]
+
+    registry = ToolRegistry()
+    registry.register_defaults()
+    assert registry.get("http_get").pure is False
+    summaries = []
+    original = registry.get("summarize").handler
+    registry.get("summarize").handler = lambda args, ctx: summaries.append(args.text) or original(args, ctx)
+    for _ in range(2):
+        registry.execute("summarize", {"text": ""}, _ctx(test_config, long_term_memory))
+    # An empty text summarizes run state, which the arguments do not capture.
+    assert summaries == ["", ""]
+
+
+def test_summaries_are_only_memoized_for_the_heuristic_provider(test_config, long_term_memory):
+    registry = ToolRegistry()
+    registry.register_defaults()
+    summaries = []
+    registry.get("summarize").handler = lambda args, ctx: summaries.append(args.text) or SummarizeResult(
+        ok=True, message="ok", summary=args.text
+    )
+    llm_config = test_config.model_copy(update={"no_llm_mode": False, "openai_api_key": "k"})
+    for config in (llm_config, llm_config, test_config, test_config):
+        registry.execute("summarize", {"text": "same"}, _ctx(config, long_term_memory))
+    assert summaries == ["same", "same", "same"]
+
+
+def test_memo_steps_aside_while_a_cassette_is_active(test_config, long_term_memory, tmp_path):
+    registry, calls = _counting_registry()
+    registry.use_cassette(ToolCassette(tmp_path / "tools.json", mode="record"))
+    for _ in range(2):
+        registry.execute("calc", {"expression": "1"}, _ctx(test_config, long_term_memory))
+    assert calls == ["1", "1"]
+
+
+def test_engine_trace_marks_memoized_calls(test_config):
+    from main import OrchestrationEngine
+
+    engine = OrchestrationEngine(test_config)
+    engine.run("Calculate 2 + 3 and summarize the result")
+    trace = engine.run("Calculate 2 + 3 and summarize the result")
+
+    calc = next(c for c in trace.tool_calls if c.tool_name == "calc")
+    assert calc.from_cache is True
+    assert trace.metrics_snapshot["tool_memo_total|result=hit,tool=calc"] == 1
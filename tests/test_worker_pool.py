@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import time
+
+from core.types import RunStatus
+from service.workers import RunRequest, WorkerPool
+
+
+def _overrides(test_config) -> dict:
+    return {
+        "sqlite_path": str(test_config.sqlite_path),
+        "log_to_file": False,
+        "no_llm_mode": True,
+    }
+
+
+def test_worker_pool_runs_requests_across_processes(test_config):
+    with WorkerPool(workers=2, config_overrides=_overrides(test_config)) as pool:
+        traces = pool.map([RunRequest(raw_goal=f"Calculate {i} + 2", export_trace=False) for i in range(4)])
+        pids = pool.worker_pids()
+
+    assert [t.status for t in traces] == [RunStatus.COMPLETED] * 4
+    assert [t.request["raw_goal"] for t in traces] == [f"Calculate {i} + 2" for i in range(4)]
+    assert len(set(pids)) == 2
+    assert pool.stats["completed"] == 4
+
+
+def test_worker_pool_restarts_crashed_workers(test_config):
+    with WorkerPool(workers=1, config_overrides=_overrides(test_config)) as pool:
+        first = pool.run("Calculate 1 + 1", export_trace=False, run_id="run_fixed")
+        [pid] = pool.worker_pids()
+        pool._workers[next(iter(pool._workers))].process.kill()
+
+        deadline = time.monotonic() + 10
+        while pool.stats["restarts"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        second = pool.run("Calculate 2 + 2", export_trace=False)
+        restarted = pool.worker_pids()
+
+    assert first.run_id == "run_fixed"
+    assert pool.stats["restarts"] == 1
+    assert second.status == RunStatus.COMPLETED
+    assert len(restarted) == 1 and pid not in restarted
+
+
+def test_worker_dying_right_before_dispatch_is_replaced(test_config):
+    with WorkerPool(workers=1, config_overrides=_overrides(test_config)) as pool:
+        worker = next(iter(pool._workers.values()))
+        deadline = time.monotonic() + 30
+        while not worker.ready and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        def die_then_send(message):
+            worker.process.kill()
+            worker.process.join()
+            raise BrokenPipeError("worker is gone")
+
+        worker.conn.send = die_then_send
+        trace = pool.run("Calculate 3 + 3", export_trace=False)
+
+    assert trace.status == RunStatus.COMPLETED
+    assert pool.stats["restarts"] == 1
+    assert pool.stats["failed"] == 0